@@ -1,17 +1,105 @@
+import os
+
 from sqlmodel import SQLModel, create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from typing import AsyncGenerator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from typing import AsyncGenerator, Dict, Optional
+
+# SQLite数据库配置（可通过环境变量覆盖）
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./database.db")
+
+# 生产环境推荐的 SQLite PRAGMA
+# - WAL: 写入不阻塞读取（打招呼循环与仪表盘可同时工作）
+# - synchronous=NORMAL: WAL 模式下安全且显著减少 fsync
+# - mmap_size / cache_size: 减少读路径上的系统调用和磁盘 IO
+# - busy_timeout: 遇到锁时等待而不是立即抛出 "database is locked"
+# - temp_store=MEMORY: 排序/临时表放在内存中
+PRODUCTION_PRAGMAS: Dict[str, str] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": str(256 * 1024 * 1024),  # 256MB
+    "cache_size": str(-64 * 1024),        # 负数单位为KB，即64MB
+    "busy_timeout": "5000",               # 毫秒
+    "temp_store": "MEMORY",
+}
+
+# 引擎配置档案，通过环境变量 DB_PROFILE 选择
+ENGINE_PROFILES: Dict[str, Dict] = {
+    # 生产环境：启用PRAGMA，关闭SQL日志
+    "production": {"echo": False, "pragmas": PRODUCTION_PRAGMAS},
+    # 开发环境：启用PRAGMA，输出SQL日志便于调试
+    "development": {"echo": True, "pragmas": PRODUCTION_PRAGMAS},
+    # 兼容模式：SQLite默认设置（回滚日志，无PRAGMA），用于排查问题和基准对比
+    "compat": {"echo": False, "pragmas": {}},
+}
+
+DEFAULT_PROFILE = "production"
+DB_PROFILE = os.getenv("DB_PROFILE", DEFAULT_PROFILE).lower()
+
+
+def _env_flag(name: str) -> Optional[bool]:
+    """读取布尔型环境变量，未设置时返回None"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return None
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _install_pragmas(sync_engine: Engine, pragmas: Dict[str, str]) -> None:
+    """在每个新建的数据库连接上执行PRAGMA"""
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(
+    url: str = DATABASE_URL,
+    profile: str = DB_PROFILE,
+    echo: Optional[bool] = None,
+) -> AsyncEngine:
+    """按配置档案创建异步引擎
+
+    Args:
+        url: 数据库连接URL
+        profile: 配置档案名称（production / development / compat）
+        echo: 是否输出SQL日志，None 则使用档案默认值（可被 DB_ECHO 覆盖）
+
+    Returns:
+        配置好的异步引擎
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"未知的数据库配置档案: {profile}（可选: {', '.join(ENGINE_PROFILES)}）")
+
+    settings = ENGINE_PROFILES[profile]
+    if echo is None:
+        env_echo = _env_flag("DB_ECHO")
+        echo = settings["echo"] if env_echo is None else env_echo
+
+    is_sqlite = url.startswith("sqlite")
+    async_engine = create_async_engine(
+        url,
+        echo=echo,
+        future=True,
+        connect_args={"check_same_thread": False} if is_sqlite else {}  # SQLite需要此配置
+    )
+
+    if is_sqlite:
+        _install_pragmas(async_engine.sync_engine, settings["pragmas"])
+
+    return async_engine
 
-# SQLite数据库配置
-DATABASE_URL = "sqlite+aiosqlite:///./database.db"
 
 # 创建异步引擎
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,  # 开发时启用SQL日志
-    future=True,
-    connect_args={"check_same_thread": False}  # SQLite需要此配置
-)
+engine = build_engine()
 
 # 创建异步会话工厂
 async_session_maker = async_sessionmaker(
@@ -25,8 +113,8 @@ async def init_db():
     """初始化数据库,创建所有表"""
     # 导入所有模型以确保表被创建
     from app.models.candidate import Candidate
-    from app.models.greeting import GreetingRecord
-    from app.models.automation_task import AutomationTask
+    from app.models.greeting import GreetingRecord, GreetingRun, GreetingSeenCandidate
+    from app.models.automation_task import AutomationTask, AutomationTaskCheckpoint
     from app.models.greeting_template import GreetingTemplate
     from app.models.system_config import SystemConfig
     from app.models.log_entry import LogEntry
@@ -35,8 +123,12 @@ async def init_db():
     from app.models.filters import FilterOptions
     from app.models.automation_template import AutomationTemplate
 
+    from app.migrations import run_migrations
+
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        # 在已有数据库上原地执行增量迁移（索引等），无需删除数据库
+        await conn.run_sync(run_migrations)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
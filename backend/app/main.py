@@ -4,7 +4,12 @@ from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from app.database import init_db
+from app.database import async_session_maker, init_db
+from app.services.greeting_runs import backfill_runs, compress_old_runs, recover_interrupted_runs
+from app.services.greeting_service import LOGS_DIR
+from app.services.log_file_sink import log_file_sink
+from app.services.log_writer import log_writer
+from app.services.task_checkpoint import gc_checkpoints, recover_interrupted_tasks
 
 
 @asynccontextmanager
@@ -12,8 +17,20 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时初始化数据库
     await init_db()
+    await log_writer.start()
+    await log_file_sink.start()
+    # 上次异常退出时仍在运行的任务标记为暂停，并清理过期断点
+    async with async_session_maker() as session:
+        await recover_interrupted_tasks(session)
+        await gc_checkpoints(session)
+        # 打招呼运行目录：标记中断的运行，为历史日志文件建立记录，压缩旧日志
+        await recover_interrupted_runs(session)
+        await backfill_runs(session, LOGS_DIR)
+        await compress_old_runs(session)
     yield
-    # 关闭时清理资源
+    # 关闭时清理资源：写完队列中剩余的日志
+    await log_writer.stop()
+    await log_file_sink.stop()
 
 
 app = FastAPI(
@@ -30,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 游标分页的下一页游标
 )
 
 @app.get("/api/health")
@@ -39,7 +57,7 @@ async def health_check():
 
 
 # 导入并注册路由
-from app.routes import automation, candidates, templates, config, logs, greeting, accounts, notification, automation_templates
+from app.routes import automation, candidates, templates, config, logs, greeting, accounts, notification, automation_templates, events
 
 app.include_router(automation.router)
 app.include_router(candidates.router)
@@ -50,6 +68,7 @@ app.include_router(logs.router)
 app.include_router(greeting.router)
 app.include_router(accounts.router)
 app.include_router(notification.router)
+app.include_router(events.router)
 
 # 挂载前端静态文件(必须在所有API路由之后)
 frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
@@ -0,0 +1,320 @@
+"""
+轻量级数据库迁移
+基于 SQLite 的 PRAGMA user_version 记录当前结构版本，启动时按顺序执行未应用的迁移
+
+约定：
+- 迁移只做增量修改（建索引、加列、建触发器等），不删除用户数据
+- 每个迁移都必须是幂等的（IF NOT EXISTS 等），中途失败后重新执行是安全的
+- 新增迁移时追加到 MIGRATIONS 末尾，版本号递增，已发布的迁移不要修改
+- 前置条件暂不满足（如 SQLite 缺少扩展）时抛出 MigrationDeferred：不记为已应用，之后每次启动重试
+"""
+import logging
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationDeferred(Exception):
+    """迁移的前置条件暂不满足，暂缓执行"""
+
+
+class Migration(NamedTuple):
+    """单个迁移"""
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """注册迁移的装饰器"""
+    def decorator(func: Callable[[Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"迁移版本号必须递增: {version}")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+
+def get_schema_version(conn: Connection) -> int:
+    """读取当前数据库结构版本"""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def _set_schema_version(conn: Connection, version: int) -> None:
+    # PRAGMA 不支持参数绑定，版本号来自代码中的整数常量
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def _create_indexes(conn: Connection, indexes: List[tuple]) -> None:
+    """批量创建索引 (索引名, 表名, 列定义)"""
+    for name, table, columns in indexes:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+@migration(1, "为高频查询添加二级索引")
+def _add_hot_path_indexes(conn: Connection) -> None:
+    _create_indexes(conn, [
+        # 打招呼记录：按候选人查重、按日期统计、按任务查询
+        ("ix_greeting_records_candidate_id", "greeting_records", "candidate_id"),
+        ("ix_greeting_records_sent_at", "greeting_records", "sent_at"),
+        ("ix_greeting_records_task_id", "greeting_records", "task_id"),
+        # 运行日志：按时间倒序分页，以及按级别/操作/任务筛选后的分页
+        ("ix_log_entries_created_at", "log_entries", "created_at"),
+        ("ix_log_entries_level_created_at", "log_entries", "level, created_at"),
+        ("ix_log_entries_action_created_at", "log_entries", "action, created_at"),
+        ("ix_log_entries_task_id_created_at", "log_entries", "task_id, created_at"),
+        # 候选人：列表分页、按状态筛选分页、今日新增统计
+        ("ix_candidates_created_at", "candidates", "created_at"),
+        ("ix_candidates_status_created_at", "candidates", "status, created_at"),
+        # 自动化任务：列表分页、按状态筛选分页、模板占用检查
+        ("ix_automation_tasks_created_at", "automation_tasks", "created_at"),
+        ("ix_automation_tasks_status_created_at", "automation_tasks", "status, created_at"),
+        ("ix_automation_tasks_template_status", "automation_tasks", "greeting_template_id, status"),
+        # 问候模板：列表排序 (is_active DESC, updated_at DESC)
+        ("ix_greeting_templates_active_updated", "greeting_templates", "is_active, updated_at"),
+    ])
+
+
+# 候选人全文检索覆盖的列（顺序与 candidates_fts 的列定义一致）
+CANDIDATE_FTS_COLUMNS = ("name", "position", "company", "expected_position", "notes", "tags")
+
+
+@migration(2, "候选人全文检索索引（FTS5 trigram）")
+def _add_candidate_fts(conn: Connection) -> None:
+    # trigram 分词器按 3 个字符切分，对中文无需分词词典；需要 SQLite 3.34+ 且编译了 FTS5
+    try:
+        conn.exec_driver_sql("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts_probe USING fts5(x, tokenize='trigram')")
+        conn.exec_driver_sql("DROP TABLE temp._fts_probe")
+    except Exception as e:
+        # 升级 SQLite 后下次启动时重新执行
+        raise MigrationDeferred(f"当前 SQLite 不支持 FTS5 trigram，候选人搜索将使用 LIKE: {e}")
+
+    cols = ", ".join(CANDIDATE_FTS_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in CANDIDATE_FTS_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in CANDIDATE_FTS_COLUMNS)
+
+    conn.exec_driver_sql(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+            {cols}, content='candidates', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    # 外部内容表通过触发器与 candidates 保持同步
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_ai AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_ad AFTER DELETE ON candidates BEGIN
+            INSERT INTO candidates_fts(candidates_fts, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    # 只在文本列变化时更新索引，状态等字段的更新不触发
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_au AFTER UPDATE OF {cols} ON candidates BEGIN
+            INSERT INTO candidates_fts(candidates_fts, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO candidates_fts(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    # 为已有数据建立索引
+    conn.exec_driver_sql("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')")
+
+
+def _rollup_upsert(bucket: str, metric: str, delta: str) -> str:
+    """生成统计汇总表的累加语句（用于触发器内部）"""
+    return (
+        f"INSERT INTO stats_rollup (bucket, metric, value) VALUES ({bucket}, {metric}, {delta}) "
+        f"ON CONFLICT (bucket, metric) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _create_rollup_triggers(conn: Connection, table: str, prefix: str, rules: List[tuple], watch: str) -> None:
+    """为表创建维护 stats_rollup 的 INSERT / DELETE / UPDATE 触发器
+
+    Args:
+        table: 源表名
+        prefix: 触发器名前缀
+        rules: (bucket表达式, metric表达式, 增量表达式) 列表，表达式中用 {row} 代表 new/old
+        watch: UPDATE 触发器关注的列
+    """
+    def body(row: str, sign: str) -> str:
+        return "\n".join(
+            _rollup_upsert(b.format(row=row), m.format(row=row), f"{sign}({d.format(row=row)})")
+            for b, m, d in rules
+        )
+
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_ai AFTER INSERT ON {table} BEGIN
+            {body("new", "+")}
+        END
+    """)
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_ad AFTER DELETE ON {table} BEGIN
+            {body("old", "-")}
+        END
+    """)
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_au AFTER UPDATE OF {watch} ON {table} BEGIN
+            {body("old", "-")}
+            {body("new", "+")}
+        END
+    """)
+
+
+# 统计汇总的维护规则：bucket 为 'all'（累计）或 'YYYY-MM-DD'（按天）
+# （问候记录的规则已由 v4 的 GREETING_ROLLUP_RULES 替换）
+STATS_ROLLUP_RULES = {
+    "candidates": ("stats_candidates", "status, created_at", [
+        ("'all'", "'candidates.total'", "1"),
+        ("'all'", "'candidates.status.' || {row}.status", "1"),
+        ("date({row}.created_at)", "'candidates.added'", "1"),
+    ]),
+    "greeting_records": ("stats_greetings", "success, sent_at", [
+        ("'all'", "'greetings.total'", "1"),
+        ("'all'", "'greetings.success'", "{row}.success"),
+        ("date({row}.sent_at)", "'greetings.sent'", "1"),
+        ("date({row}.sent_at)", "'greetings.success'", "{row}.success"),
+    ]),
+    "automation_tasks": ("stats_tasks", "status", [
+        ("'all'", "'tasks.total'", "1"),
+        ("'all'", "'tasks.status.' || {row}.status", "1"),
+    ]),
+    "greeting_templates": ("stats_templates", "is_active", [
+        ("'all'", "'templates.total'", "1"),
+        ("'all'", "'templates.active'", "{row}.is_active"),
+    ]),
+}
+
+
+def _rebuild_rollup_rules(conn: Connection, table: str, rules: List[tuple]) -> None:
+    """按规则从源表重算统计汇总（调用前需删除对应的 metric）"""
+    for bucket, metric, delta in rules:
+        bucket, metric, delta = (e.format(row=table) for e in (bucket, metric, delta))
+        conn.exec_driver_sql(f"""
+            INSERT INTO stats_rollup (bucket, metric, value)
+            SELECT {bucket}, {metric}, SUM({delta}) FROM {table} GROUP BY 1, 2
+        """)
+
+
+@migration(3, "统计汇总表（触发器增量维护）")
+def _add_stats_rollup(conn: Connection) -> None:
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS stats_rollup (
+            bucket TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, metric)
+        ) WITHOUT ROWID
+    """)
+    conn.exec_driver_sql("DELETE FROM stats_rollup")
+    for table, (prefix, watch, rules) in STATS_ROLLUP_RULES.items():
+        _create_rollup_triggers(conn, table, prefix, rules, watch)
+        # v3 时的表结构（问候记录还没有 outcome 列），只能按 v3 的规则重算
+        _rebuild_rollup_rules(conn, table, rules)
+
+
+def _table_columns(conn: Connection, table: str) -> set:
+    """表的现有列名"""
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+# 打招呼循环对跳过、失败的候选人也写入问候记录（outcome），问候数只统计实际发出的问候
+# （与 app.models.greeting.SENT_OUTCOMES 一致；自动化任务的记录 outcome 为空）
+_GREETING_SENT = "({row}.outcome IS NULL OR {row}.outcome = 'greeted')"
+
+GREETING_ROLLUP_RULES = [
+    ("'all'", "'greetings.total'", _GREETING_SENT),
+    ("'all'", "'greetings.success'", "{row}.success"),
+    ("date({row}.sent_at)", "'greetings.sent'", _GREETING_SENT),
+    ("date({row}.sent_at)", "'greetings.success'", "{row}.success"),
+]
+
+
+@migration(4, "问候记录关联打招呼运行（run_id、outcome），问候统计只计入实际发送")
+def _add_greeting_record_run(conn: Connection) -> None:
+    columns = _table_columns(conn, "greeting_records")
+    if "run_id" not in columns:
+        conn.exec_driver_sql("ALTER TABLE greeting_records ADD COLUMN run_id INTEGER REFERENCES greeting_runs (id)")
+    if "outcome" not in columns:
+        conn.exec_driver_sql("ALTER TABLE greeting_records ADD COLUMN outcome VARCHAR")
+    _create_indexes(conn, [("ix_greeting_records_run_id", "greeting_records", "run_id")])
+
+    # 用新规则替换 v3 创建的问候统计触发器，并重算问候相关的汇总
+    for suffix in ("ai", "ad", "au"):
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS stats_greetings_{suffix}")
+    _create_rollup_triggers(conn, "greeting_records", "stats_greetings", GREETING_ROLLUP_RULES, "success, sent_at, outcome")
+    conn.exec_driver_sql("DELETE FROM stats_rollup WHERE metric LIKE 'greetings.%'")
+    _rebuild_rollup_rules(conn, "greeting_records", GREETING_ROLLUP_RULES)
+
+
+# 当前生效的统计规则：v4 起问候记录使用 GREETING_ROLLUP_RULES
+CURRENT_ROLLUP_RULES = {
+    table: GREETING_ROLLUP_RULES if table == "greeting_records" else rules
+    for table, (_, _, rules) in STATS_ROLLUP_RULES.items()
+}
+
+
+def rebuild_stats_rollup(conn: Connection) -> None:
+    """按当前规则根据源表全量重算统计汇总（结果与触发器维护的值一致，需在迁移完成后调用）"""
+    conn.exec_driver_sql("DELETE FROM stats_rollup")
+    for table, rules in CURRENT_ROLLUP_RULES.items():
+        _rebuild_rollup_rules(conn, table, rules)
+
+
+def _load_deferred(conn: Connection) -> set:
+    """暂缓执行、等待重试的迁移版本"""
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS schema_deferred_migrations (
+            version INTEGER PRIMARY KEY,
+            reason TEXT
+        )
+    """)
+    return set(conn.exec_driver_sql("SELECT version FROM schema_deferred_migrations").scalars().all())
+
+
+def run_migrations(conn: Connection) -> List[int]:
+    """执行所有未应用的迁移，并重试之前暂缓执行的迁移
+
+    Args:
+        conn: 同步数据库连接（通过 AsyncConnection.run_sync 调用）
+
+    Returns:
+        本次应用的迁移版本号列表
+    """
+    current = get_schema_version(conn)
+    deferred = _load_deferred(conn)
+    applied = []
+
+    for item in MIGRATIONS:
+        if item.version <= current and item.version not in deferred:
+            continue
+
+        logger.info(f"📦 应用数据库迁移 v{item.version}: {item.description}")
+        try:
+            item.apply(conn)
+        except MigrationDeferred as e:
+            # 不影响之后的迁移，结构版本照常推进，暂缓的迁移单独记录
+            logger.warning(f"⚠️ 数据库迁移 v{item.version} 暂缓执行，下次启动时重试: {e}")
+            conn.exec_driver_sql(
+                "INSERT OR REPLACE INTO schema_deferred_migrations (version, reason) VALUES (?, ?)",
+                (item.version, str(e)),
+            )
+        else:
+            if item.version in deferred:
+                conn.exec_driver_sql("DELETE FROM schema_deferred_migrations WHERE version = ?", (item.version,))
+            applied.append(item.version)
+
+        if item.version > current:
+            _set_schema_version(conn, item.version)
+
+    if applied:
+        # 让查询规划器获取新索引的统计信息
+        conn.exec_driver_sql("PRAGMA optimize")
+        logger.info(f"✅ 数据库结构已升级到 v{get_schema_version(conn)}")
+
+    return applied
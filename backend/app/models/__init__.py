@@ -9,15 +9,19 @@ from app.models.candidate import (
     CandidateStatus,
 )
 from app.models.greeting import (
+    GreetingOutcome,
     GreetingRecord,
     GreetingRecordCreate,
     GreetingRecordRead,
+    GreetingRun,
+    GreetingSeenCandidate,
 )
 from app.models.automation_task import (
     AutomationTask,
     AutomationTaskCreate,
     AutomationTaskRead,
     AutomationTaskUpdate,
+    AutomationTaskCheckpoint,
     TaskStatus,
 )
 from app.models.greeting_template import (
@@ -47,14 +51,18 @@ __all__ = [
     "CandidateUpdate",
     "CandidateStatus",
     # GreetingRecord models
+    "GreetingOutcome",
     "GreetingRecord",
     "GreetingRecordCreate",
     "GreetingRecordRead",
+    "GreetingRun",
+    "GreetingSeenCandidate",
     # AutomationTask models
     "AutomationTask",
     "AutomationTaskCreate",
     "AutomationTaskRead",
     "AutomationTaskUpdate",
+    "AutomationTaskCheckpoint",
     "TaskStatus",
     # GreetingTemplate models
     "GreetingTemplate",
@@ -84,3 +84,16 @@ class AutomationTaskUpdate(SQLModel):
     total_success: Optional[int] = None
     total_failed: Optional[int] = None
     error_message: Optional[str] = None
+
+
+class AutomationTaskCheckpoint(SQLModel, table=True):
+    """自动化任务断点（暂停或服务重启后从断点继续执行）"""
+    __tablename__ = "automation_task_checkpoints"
+
+    task_id: int = Field(primary_key=True, foreign_key="automation_tasks.id", description="任务ID")
+    candidates: str = Field(description="搜索结果快照（JSON数组，按处理顺序）")
+    next_index: int = Field(default=0, description="下一个待处理候选人的序号")
+
+    # 时间戳
+    created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
+    updated_at: datetime = Field(default_factory=datetime.now, description="更新时间")
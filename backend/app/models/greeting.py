@@ -4,6 +4,22 @@
 from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import datetime
+from enum import Enum
+
+
+class GreetingOutcome(str, Enum):
+    """打招呼循环中候选人的处理结果"""
+    GREETED = "greeted"                      # 已打招呼
+    SKIPPED_MISMATCH = "skipped_mismatch"    # 期望职位不匹配，未打招呼
+    ALREADY_CONTACTED = "already_contacted"  # 之前已沟通过
+    FAILED = "failed"                        # 点击或打招呼失败，未发出问候
+
+
+# 实际发出了问候的处理结果（自动化任务的记录 outcome 为空，均为实际发送）
+SENT_OUTCOMES = (GreetingOutcome.GREETED,)
+
+# 已与候选人建立沟通、之后不再联系的处理结果
+CONTACTED_OUTCOMES = (GreetingOutcome.GREETED, GreetingOutcome.ALREADY_CONTACTED)
 
 
 class GreetingRecordBase(SQLModel):
@@ -11,6 +27,7 @@ class GreetingRecordBase(SQLModel):
     # 关联信息
     candidate_id: int = Field(foreign_key="candidates.id", description="求职者ID")
     task_id: Optional[int] = Field(default=None, foreign_key="automation_tasks.id", description="任务ID")
+    run_id: Optional[int] = Field(default=None, foreign_key="greeting_runs.id", description="打招呼运行ID")
 
     # 消息内容
     message: str = Field(description="打招呼消息内容")
@@ -19,6 +36,10 @@ class GreetingRecordBase(SQLModel):
     # 执行结果
     success: bool = Field(default=True, description="是否成功")
     error_message: Optional[str] = Field(default=None, description="错误信息")
+    outcome: Optional[str] = Field(
+        default=None,
+        description="打招呼循环的处理结果（GreetingOutcome 的值），自动化任务的记录为空",
+    )
 
 
 class GreetingRecord(GreetingRecordBase, table=True):
@@ -40,3 +61,47 @@ class GreetingRecordRead(GreetingRecordBase):
     """读取打招呼记录的响应模型"""
     id: int
     sent_at: datetime
+
+
+class GreetingSeenCandidate(SQLModel, table=True):
+    """打招呼循环处理过的候选人（按招聘职位记录，同一职位再次运行时直接跳过）"""
+    __tablename__ = "greeting_seen_candidates"
+
+    job_key: str = Field(primary_key=True, description="招聘职位标识（未指定职位时为空字符串）")
+    geek_id: str = Field(primary_key=True, description="候选人 geekId（卡片 data-geekid）")
+    name: Optional[str] = Field(default=None, description="候选人姓名")
+    outcome: str = Field(description="处理结果（GreetingOutcome 的值，CONTACTED_OUTCOMES 之一）")
+
+    # 时间戳
+    seen_at: datetime = Field(default_factory=datetime.now, index=True, description="最近处理时间")
+
+
+class GreetingRun(SQLModel, table=True):
+    """打招呼任务运行记录（每次运行一条，浏览历史时只查询本表，不解析日志文件）"""
+    __tablename__ = "greeting_runs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: str = Field(default="running", index=True, description="运行状态: running/completed/error/cancelled/limit_reached")
+
+    # 计数
+    target_count: int = Field(default=0, description="目标打招呼数量")
+    success_count: int = Field(default=0, description="成功数量")
+    failed_count: int = Field(default=0, description="失败数量")
+    skipped_count: int = Field(default=0, description="跳过数量")
+    total_processed: int = Field(default=0, description="处理的候选人数")
+    elapsed_time: Optional[float] = Field(default=None, description="耗时（秒）")
+    limit_reached: bool = Field(default=False, description="是否触发打招呼限制")
+    error_message: Optional[str] = Field(default=None, description="错误信息")
+
+    # 筛选条件
+    expected_positions: str = Field(default="[]", description="期望职位关键词（JSON 列表）")
+    job_key: str = Field(default="", description="招聘职位标识")
+
+    # 日志文件
+    log_file: Optional[str] = Field(default=None, description="日志文件路径（压缩后为 .gz 文件）")
+    log_compressed: bool = Field(default=False, description="日志文件是否已 gzip 压缩")
+    metrics: Optional[str] = Field(default=None, description="各阶段耗时及计数（JSON）")
+
+    # 时间戳
+    created_at: datetime = Field(default_factory=datetime.now, index=True, description="开始时间")
+    ended_at: Optional[datetime] = Field(default=None, description="结束时间")
@@ -9,7 +9,7 @@ from datetime import datetime
 class GreetingTemplateBase(SQLModel):
     """打招呼模板基础模型"""
     name: str = Field(description="模板名称")
-    content: str = Field(description="模板内容，支持变量：{name}, {position}, {company}")
+    content: str = Field(description="模板内容，支持变量：{name}, {position}, {company} 等，{company|默认值} 指定默认值")
     is_active: bool = Field(default=True, description="是否启用")
     usage_count: int = Field(default=0, description="使用次数")
 
@@ -1,13 +1,13 @@
 """
 自动化任务 API 路由
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlmodel import select
 from datetime import datetime
 
-from app.database import get_session
+from app.database import async_session_maker, get_session
 from app.models.automation_task import (
     AutomationTask,
     AutomationTaskCreate,
@@ -19,9 +19,25 @@ from app.models.filters import FilterOptions
 from app.models.system_config import SystemConfig
 from app.models.user_account import UserAccount
 from app.services.boss_automation import BossAutomation
+from app.services.candidate_service import (
+    bulk_upsert_candidates,
+    load_contact_map,
+    normalize_scraped_candidate,
+)
+from app.services.event_bus import event_bus
 from app.services.logging_service import LoggingService
+from app.services.task_checkpoint import (
+    advance_checkpoint,
+    create_checkpoint,
+    delete_checkpoint,
+    load_checkpoint,
+    snapshot_candidates,
+)
+from app.services.task_control import ProgressFlusher, TaskControl, task_controls
 from app.models.log_entry import LogAction, LogLevel
 from app.utils.filters_applier import FiltersApplier
+from app.utils.pagination import apply_keyset, split_page
+from app.utils.template_renderer import render_batch
 
 router = APIRouter(prefix="/api/automation", tags=["automation"])
 
@@ -30,6 +46,9 @@ _automation_service: Optional[BossAutomation] = None
 _current_task_id: Optional[int] = None
 _headless: bool = True  # 默认隐藏浏览器
 
+# 未指定问候模板时发送的消息
+DEFAULT_GREETING_MESSAGE = "你好，我对你的简历很感兴趣，期待与你进一步沟通。"
+
 
 async def get_automation_service(headless: Optional[bool] = None) -> BossAutomation:
     """获取或创建自动化服务实例
@@ -49,64 +68,129 @@ async def get_automation_service(headless: Optional[bool] = None) -> BossAutomat
     return _automation_service
 
 
-async def run_automation_task(task_id: int, session: AsyncSession):
+def publish_task_event(task: AutomationTask, topic: str = "task.updated", progress: Optional[Dict] = None):
+    """推送任务的状态和计数（页面据此更新任务列表，不再轮询）
+
+    Args:
+        progress: 尚未写入任务对象的最新进度字段（运行中按批写入）
+    """
+    event_bus.publish(topic, {
+        "id": task.id,
+        "status": task.status.value,
+        "progress": task.progress,
+        "total_found": task.total_found,
+        "total_contacted": task.total_contacted,
+        "total_success": task.total_success,
+        "total_failed": task.total_failed,
+        "error_message": task.error_message,
+        "started_at": task.started_at.isoformat() if task.started_at else None,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+        **(progress or {}),
+    })
+
+
+async def run_automation_task(task_id: int, session_maker: async_sessionmaker = async_session_maker):
     """
     在后台运行自动化任务
 
+    后台任务使用自己的会话，不复用请求的会话（请求结束时会被关闭）。
+    会话只在每次提交前后短暂占用连接，长时间的浏览器操作期间不持有事务和写锁。
+
     Args:
         task_id: 任务 ID
-        session: 数据库会话
+        session_maker: 会话工厂
     """
     global _current_task_id
 
+    control = task_controls.register(task_id)
+
     try:
-        # 获取任务
-        result = await session.execute(
-            select(AutomationTask).where(AutomationTask.id == task_id)
-        )
-        task = result.scalar_one_or_none()
+        async with session_maker() as session:
+            await _execute_automation_task(task_id, session, control)
 
-        if not task:
-            return
+    except Exception as e:
+        # 更新任务为失败状态（使用新的会话，原会话可能已处于失败的事务中）
+        async with session_maker() as session:
+            result = await session.execute(
+                select(AutomationTask).where(AutomationTask.id == task_id)
+            )
+            task = result.scalar_one_or_none()
+            if task:
+                task.status = TaskStatus.FAILED
+                task.error_message = str(e)
+                session.add(task)
+                await delete_checkpoint(session, task_id)
+                await session.commit()
+                publish_task_event(task)
 
-        # 更新任务状态
-        task.status = TaskStatus.RUNNING
-        task.started_at = datetime.now()
-        session.add(task)
-        await session.commit()
+    finally:
+        task_controls.unregister(task_id)
+        _current_task_id = None
 
-        _current_task_id = task_id
 
-        # 获取自动化服务
-        automation = await get_automation_service()
+async def _execute_automation_task(task_id: int, session: AsyncSession, control: TaskControl):
+    """执行自动化任务的主流程"""
+    global _current_task_id
 
-        # 检查并登录
-        if not automation.is_logged_in:
-            is_logged_in = await automation.check_and_login()
-            if not is_logged_in:
-                task.status = TaskStatus.FAILED
-                task.error_message = "登录失败"
-                session.add(task)
-                await session.commit()
-                return
-
-        # 获取问候模板（如果指定）
-        template = None
-        if task.greeting_template_id is not None:
-            template_result = await session.execute(
-                select(GreetingTemplate).where(
-                    GreetingTemplate.id == task.greeting_template_id
-                )
+    # 获取任务
+    result = await session.execute(
+        select(AutomationTask).where(AutomationTask.id == task_id)
+    )
+    task = result.scalar_one_or_none()
+
+    if not task:
+        return
+
+    # 更新任务状态（从断点继续时保留首次开始时间）
+    task.status = TaskStatus.RUNNING
+    task.started_at = task.started_at or datetime.now()
+    task.error_message = None
+    session.add(task)
+    await session.commit()
+    publish_task_event(task)
+
+    _current_task_id = task_id
+
+    # 获取自动化服务
+    automation = await get_automation_service()
+
+    # 检查并登录
+    if not automation.is_logged_in:
+        is_logged_in = await automation.check_and_login()
+        if not is_logged_in:
+            task.status = TaskStatus.FAILED
+            task.error_message = "登录失败"
+            session.add(task)
+            await session.commit()
+            publish_task_event(task)
+            return
+
+    # 获取问候模板（如果指定）
+    template = None
+    if task.greeting_template_id is not None:
+        template_result = await session.execute(
+            select(GreetingTemplate).where(
+                GreetingTemplate.id == task.greeting_template_id
             )
-            template = template_result.scalar_one_or_none()
+        )
+        template = template_result.scalar_one_or_none()
 
-            if not template:
-                task.status = TaskStatus.FAILED
-                task.error_message = "问候模板不存在"
-                session.add(task)
-                await session.commit()
-                return
+        if not template:
+            task.status = TaskStatus.FAILED
+            task.error_message = "问候模板不存在"
+            session.add(task)
+            await session.commit()
+            publish_task_event(task)
+            return
 
+    checkpoint = await load_checkpoint(session, task.id)
+    if checkpoint:
+        # 从断点继续：使用上次的搜索结果，跳过已处理的候选人
+        candidates = snapshot_candidates(checkpoint)
+        start_index = checkpoint.next_index
+        success_count = task.total_success
+        failed_count = task.total_failed
+    else:
         # 解析筛选条件
         import json
         filters = json.loads(task.filters) if task.filters else {}
@@ -122,62 +206,55 @@ async def run_automation_task(task_id: int, session: AsyncSession):
 
         task.total_found = len(candidates)
         session.add(task)
-        await session.commit()
-
-        # 向候选人发送问候
-        from app.models.candidate import Candidate, CandidateStatus
-        from app.models.greeting import GreetingRecord
 
+        # 新发现的候选人一次性批量写入，与断点在同一事务中提交（断点中的候选人必定已入库）
+        await bulk_upsert_candidates(
+            session,
+            [row for row in map(normalize_scraped_candidate, candidates) if row],
+            commit=False,
+        )
+        checkpoint = create_checkpoint(session, task.id, candidates)
+        await session.commit()
+        publish_task_event(task)
+        start_index = 0
         success_count = 0
         failed_count = 0
 
-        for idx, candidate_data in enumerate(candidates):
-            # 检查任务是否被暂停或取消
-            await session.refresh(task)
-            if task.status in [TaskStatus.PAUSED, TaskStatus.CANCELLED]:
+    # 向候选人发送问候
+    from app.models.candidate import CandidateStatus
+    from app.models.greeting import GreetingRecord
+
+    # 一次查询得到每个待处理候选人是否联系过
+    contact_map = await load_contact_map(session, (c['boss_id'] for c in candidates[start_index:]))
+
+    # 一次性为所有待联系的候选人渲染消息
+    messages = {}
+    if template:
+        pending = [c for c, contacted in contact_map.values() if not contacted]
+        messages = dict(zip((c.boss_id for c in pending), render_batch(template, pending)))
+
+    # 问候记录随发送立即提交，任务进度按批写入，循环结束（含异常）时保证最后一次写入
+    progress = ProgressFlusher(session, task.id)
+    try:
+        for idx in range(start_index, len(candidates)):
+            candidate_data = candidates[idx]
+            # 断点记录的是下一个待处理的序号，之前的候选人都已处理
+            advance_checkpoint(session, checkpoint, idx)
+
+            # 检查任务是否被暂停或取消（由路由直接通知）
+            if control.stop_requested:
+                task.status = control.requested_status
                 break
 
-            # 检查是否已存在该候选人
-            result = await session.execute(
-                select(Candidate).where(Candidate.boss_id == candidate_data['boss_id'])
-            )
-            existing_candidate = result.scalar_one_or_none()
-
-            if existing_candidate:
-                # 检查是否已经联系过
-                greeting_result = await session.execute(
-                    select(GreetingRecord).where(
-                        GreetingRecord.candidate_id == existing_candidate.id
-                    )
-                )
-                if greeting_result.scalar_one_or_none():
-                    continue  # 跳过已联系的候选人
-                candidate = existing_candidate
-            else:
-                # 创建新候选人记录
-                candidate = Candidate(
-                    boss_id=candidate_data['boss_id'],
-                    name=candidate_data['name'],
-                    position=candidate_data['position'],
-                    company=candidate_data.get('company'),
-                    status=CandidateStatus.NEW,
-                    profile_url=candidate_data.get('profile_url'),
-                    active_time=candidate_data.get('active_time')
-                )
-                session.add(candidate)
-                await session.commit()
-                await session.refresh(candidate)
-
-            # 生成个性化消息
-            if template:
-                message = template.content
-                message = message.replace('{name}', candidate.name)
-                message = message.replace('{position}', candidate.position)
-                if candidate.company:
-                    message = message.replace('{company}', candidate.company)
-            else:
-                # 使用默认消息
-                message = f"你好，我对你的简历很感兴趣，期待与你进一步沟通。"
+            known = contact_map.get(candidate_data['boss_id'])
+            if not known:
+                continue  # 缺少 boss_id 或姓名，无法记录
+            candidate, already_contacted = known
+            if already_contacted:
+                continue  # 跳过已联系的候选人
+
+            # 个性化消息（未指定模板时使用默认消息）
+            message = messages.get(candidate.boss_id, DEFAULT_GREETING_MESSAGE)
 
             # 发送问候
             send_success = await automation.send_greeting(
@@ -197,6 +274,8 @@ async def run_automation_task(task_id: int, session: AsyncSession):
                 error_message=None if send_success else "发送失败"
             )
             session.add(greeting_record)
+            # 搜索结果中重复出现的同一候选人不再发送
+            contact_map[candidate.boss_id] = (candidate, True)
 
             # 更新候选人状态
             if send_success:
@@ -207,45 +286,49 @@ async def run_automation_task(task_id: int, session: AsyncSession):
 
             session.add(candidate)
 
-            # 更新任务进度
-            task.progress = int((idx + 1) / len(candidates) * 100)
-            task.total_contacted = idx + 1
-            task.total_success = success_count
-            task.total_failed = failed_count
-            session.add(task)
-
+            # 已发出的问候无法撤回：问候记录和断点立即提交，避免恢复后重复发送
+            advance_checkpoint(session, checkpoint, idx + 1)
             await session.commit()
 
+            # 更新任务进度（不修改任务对象，按批写入）
+            await progress.step(
+                progress=int((idx + 1) / len(candidates) * 100),
+                total_contacted=idx + 1,
+                total_success=success_count,
+                total_failed=failed_count,
+            )
+            publish_task_event(task, progress=progress.values)
+
             # 检查是否出现问题
             issue = await automation.check_for_issues()
             if issue:
                 task.status = TaskStatus.FAILED
                 task.error_message = issue
                 session.add(task)
-                await session.commit()
                 break
+        else:
+            advance_checkpoint(session, checkpoint, len(candidates))
+    finally:
+        await progress.flush()
+        # 进度已写入数据库，同步到任务对象
+        for field, value in progress.values.items():
+            setattr(task, field, value)
 
-        # 任务完成
-        if task.status == TaskStatus.RUNNING:
+    # 任务完成（暂停 / 取消请求可能在最后一个候选人之后才到达，以请求为准）
+    if task.status == TaskStatus.RUNNING:
+        if control.stop_requested:
+            task.status = control.requested_status
+        else:
             task.status = TaskStatus.COMPLETED
             task.completed_at = datetime.now()
-            session.add(task)
-            await session.commit()
+    session.add(task)
 
-    except Exception as e:
-        # 更新任务为失败状态
-        result = await session.execute(
-            select(AutomationTask).where(AutomationTask.id == task_id)
-        )
-        task = result.scalar_one_or_none()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error_message = str(e)
-            session.add(task)
-            await session.commit()
+    # 只有暂停的任务需要保留断点
+    if task.status != TaskStatus.PAUSED:
+        await delete_checkpoint(session, task.id)
+    await session.commit()
+    publish_task_event(task)
 
-    finally:
-        _current_task_id = None
 
 
 @router.post("/tasks", response_model=AutomationTask)
@@ -281,6 +364,7 @@ async def create_task(
     session.add(task)
     await session.commit()
     await session.refresh(task)
+    publish_task_event(task, "task.created")
 
     # 记录日志
     logging_service = LoggingService(session)
@@ -302,21 +386,34 @@ async def create_task(
 
 @router.get("/tasks", response_model=List[AutomationTask])
 async def get_tasks(
+    response: Response,
     status: Optional[TaskStatus] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
-    """获取任务列表"""
+    """获取任务列表
+
+    传入 cursor 时使用游标分页（下一页游标见响应头 X-Next-Cursor），否则回退到 offset 分页
+    """
     query = select(AutomationTask)
 
     if status:
         query = query.where(AutomationTask.status == status)
 
-    query = query.order_by(AutomationTask.created_at.desc()).offset(offset).limit(limit)
+    try:
+        query = apply_keyset(query, AutomationTask, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not cursor and offset:
+        query = query.offset(offset)
 
     result = await session.execute(query)
-    tasks = result.scalars().all()
+    tasks, next_cursor = split_page(result.scalars().all(), limit)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return tasks
 
@@ -375,8 +472,8 @@ async def start_task(
         task_name=task.name,
     )
 
-    # 在后台运行任务
-    background_tasks.add_task(run_automation_task, task_id, session)
+    # 在后台运行任务（任务自行创建数据库会话）
+    background_tasks.add_task(run_automation_task, task_id)
 
     return {"message": "任务已启动", "task_id": task_id}
 
@@ -404,6 +501,10 @@ async def pause_task(
     task.status = TaskStatus.PAUSED
     session.add(task)
     await session.commit()
+    publish_task_event(task)
+
+    # 通知后台任务在当前候选人处理完后停止
+    task_controls.signal(task_id, TaskStatus.PAUSED)
 
     return {"message": "任务已暂停", "task_id": task_id}
 
@@ -427,6 +528,7 @@ async def delete_task(
 
     await session.delete(task)
     await session.commit()
+    event_bus.publish("task.deleted", {"id": task_id})
 
     return {"message": "任务已删除", "task_id": task_id}
 
@@ -454,6 +556,9 @@ async def cancel_task(
     task.status = TaskStatus.CANCELLED
     session.add(task)
     await session.commit()
+    publish_task_event(task)
+
+    task_controls.signal(task_id, TaskStatus.CANCELLED)
 
     return {"message": "任务已取消", "task_id": task_id}
 
@@ -606,12 +711,14 @@ async def cleanup_service():
 @router.get("/recommend-candidates")
 async def get_recommend_candidates(
     max_results: int = 50,
+    persist: bool = False,
     session: AsyncSession = Depends(get_session)
 ):
     """获取推荐候选人列表
 
     Args:
         max_results: 最大候选人数量（默认 50）
+        persist: 是否将结果批量写入候选人表
 
     Returns:
         推荐候选人列表
@@ -625,6 +732,16 @@ async def get_recommend_candidates(
         # 获取推荐候选人
         candidates = await automation.get_recommended_candidates(max_results=max_results)
 
+        # 批量写入候选人表
+        persisted = None
+        if persist:
+            rows = [row for row in map(normalize_scraped_candidate, candidates) if row]
+            upsert_result = await bulk_upsert_candidates(session, rows)
+            persisted = {
+                "inserted": upsert_result["inserted"],
+                "updated": upsert_result["updated"]
+            }
+
         # 记录日志
         logging_service = LoggingService(session)
         await logging_service.log(
@@ -633,14 +750,16 @@ async def get_recommend_candidates(
             level=LogLevel.INFO,
             details={
                 "max_results": max_results,
-                "actual_results": len(candidates)
+                "actual_results": len(candidates),
+                "persisted": persisted
             }
         )
 
         return {
             "success": True,
             "count": len(candidates),
-            "candidates": candidates
+            "candidates": candidates,
+            "persisted": persisted
         }
 
     except Exception as e:
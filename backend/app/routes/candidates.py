@@ -2,9 +2,10 @@
 候选人管理 API 路由
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, func
+from sqlalchemy import delete, exists, update
+from sqlmodel import select
 from datetime import datetime
 
 from app.database import get_session
@@ -14,7 +15,11 @@ from app.models.candidate import (
     CandidateUpdate,
     CandidateStatus
 )
-from app.models.greeting import GreetingRecord
+from app.models.greeting import SENT_OUTCOMES, GreetingRecord
+from app.services.candidate_search import apply_candidate_search
+from app.services.candidate_service import bulk_upsert_candidates, greeting_outcome_in
+from app.services.candidate_stats import candidate_stats_cache
+from app.utils.pagination import apply_keyset, split_page
 
 router = APIRouter(prefix="/api/candidates", tags=["candidates"])
 
@@ -49,13 +54,19 @@ async def create_candidate(
 
 @router.get("", response_model=List[Candidate])
 async def get_candidates(
+    response: Response,
     status: Optional[CandidateStatus] = None,
-    search: Optional[str] = Query(None, description="搜索关键词（姓名、职位、公司）"),
+    search: Optional[str] = Query(None, description="搜索关键词（姓名、职位、公司、期望职位、备注、标签），多个关键词用空格分隔"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="分页偏移（兼容旧版，建议使用 cursor）"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor 的值）"),
     session: AsyncSession = Depends(get_session)
 ):
-    """获取候选人列表"""
+    """获取候选人列表
+
+    下一页游标通过响应头 X-Next-Cursor 返回，没有更多数据时不返回该响应头。
+    关键词搜索命中全文索引时按相关度排序，此时只支持 offset 分页，传入 cursor 返回 400。
+    """
     query = select(Candidate)
 
     # 状态筛选
@@ -63,54 +74,36 @@ async def get_candidates(
         query = query.where(Candidate.status == status)
 
     # 关键词搜索
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (Candidate.name.like(search_pattern)) |
-            (Candidate.position.like(search_pattern)) |
-            (Candidate.company.like(search_pattern))
-        )
-
-    # 分页
-    query = query.order_by(Candidate.created_at.desc()).offset(offset).limit(limit)
+    if search and search.strip():
+        query, ranked = await apply_candidate_search(session, query, search)
+        if ranked:
+            # 游标按 id 定位，与相关度排序不一致，不能忽略后返回第一页
+            if cursor:
+                raise HTTPException(status_code=400, detail="按相关度排序的搜索结果不支持游标分页，请使用 offset")
+            result = await session.execute(query.offset(offset).limit(limit))
+            return result.scalars().all()
+
+    # 分页：有游标时使用游标分页，否则回退到偏移分页
+    try:
+        query = apply_keyset(query, Candidate, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not cursor and offset:
+        query = query.offset(offset)
 
     result = await session.execute(query)
-    candidates = result.scalars().all()
+    candidates, next_cursor = split_page(result.scalars().all(), limit)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return candidates
 
 
 @router.get("/stats")
 async def get_candidate_stats(session: AsyncSession = Depends(get_session)):
-    """获取候选人统计信息"""
-    # 按状态统计
-    status_stats = {}
-    for status in CandidateStatus:
-        result = await session.execute(
-            select(func.count(Candidate.id)).where(Candidate.status == status)
-        )
-        count = result.scalar()
-        status_stats[status.value] = count
-
-    # 总数
-    total_result = await session.execute(select(func.count(Candidate.id)))
-    total = total_result.scalar()
-
-    # 今日新增
-    from datetime import date
-    today = date.today()
-    today_result = await session.execute(
-        select(func.count(Candidate.id)).where(
-            func.date(Candidate.created_at) == today
-        )
-    )
-    today_count = today_result.scalar()
-
-    return {
-        "total": total,
-        "today_added": today_count,
-        "by_status": status_stats
-    }
+    """获取候选人统计信息（进程内缓存，候选人数据变更后自动失效）"""
+    return await candidate_stats_cache.get(session)
 
 
 @router.get("/{candidate_id}", response_model=Candidate)
@@ -173,18 +166,25 @@ async def delete_candidate(
     if not candidate:
         raise HTTPException(status_code=404, detail="候选人不存在")
 
-    # 检查是否有关联的问候记录
+    # 检查是否有实际发出的问候记录
     greeting_result = await session.execute(
-        select(GreetingRecord).where(GreetingRecord.candidate_id == candidate_id)
+        select(GreetingRecord.id)
+        .where(GreetingRecord.candidate_id == candidate_id, greeting_outcome_in(SENT_OUTCOMES))
+        .limit(1)
     )
-    greeting_records = greeting_result.scalars().all()
 
-    if greeting_records:
+    if greeting_result.first():
         raise HTTPException(
             status_code=400,
             detail="该候选人有关联的问候记录，无法删除"
         )
 
+    # 打招呼循环中跳过、失败（未发出问候）的记录随候选人一起删除
+    await session.execute(
+        delete(GreetingRecord)
+        .where(GreetingRecord.candidate_id == candidate_id, ~greeting_outcome_in(SENT_OUTCOMES))
+        .execution_options(synchronize_session=False)
+    )
     await session.delete(candidate)
     await session.commit()
 
@@ -240,28 +240,41 @@ async def archive_candidate(
     return {"message": "候选人已归档", "candidate_id": candidate_id}
 
 
+@router.post("/batch/upsert")
+async def batch_upsert_candidates(
+    candidates: List[CandidateCreate],
+    session: AsyncSession = Depends(get_session)
+):
+    """批量创建或更新候选人（按 boss_id 去重，已存在的候选人只刷新资料字段）"""
+    result = await bulk_upsert_candidates(session, candidates)
+
+    return {
+        "message": f"已写入 {len(result['ids'])} 个候选人",
+        "inserted_count": result["inserted"],
+        "updated_count": result["updated"],
+        "ids": result["ids"]
+    }
+
+
 @router.post("/batch/update-status")
 async def batch_update_status(
     candidate_ids: List[int],
     status: CandidateStatus,
     session: AsyncSession = Depends(get_session)
 ):
-    """批量更新候选人状态"""
+    """批量更新候选人状态（单条 UPDATE）"""
     result = await session.execute(
-        select(Candidate).where(Candidate.id.in_(candidate_ids))
+        update(Candidate)
+        .where(Candidate.id.in_(candidate_ids))
+        .values(status=status, updated_at=datetime.now())
+        .execution_options(synchronize_session=False)
     )
-    candidates = result.scalars().all()
+    updated_count = result.rowcount
 
-    if not candidates:
+    if not updated_count:
+        await session.rollback()
         raise HTTPException(status_code=404, detail="未找到任何候选人")
 
-    updated_count = 0
-    for candidate in candidates:
-        candidate.status = status
-        candidate.updated_at = datetime.now()
-        session.add(candidate)
-        updated_count += 1
-
     await session.commit()
 
     return {
@@ -275,33 +288,48 @@ async def batch_delete_candidates(
     candidate_ids: List[int],
     session: AsyncSession = Depends(get_session)
 ):
-    """批量删除候选人"""
+    """批量删除候选人
+
+    有实际发出的问候记录的候选人不能删除；只要有一个冲突，整批都不删除
+    """
+    # 一次分组查询找出所有有实际发出的问候记录的候选人
+    conflict_result = await session.execute(
+        select(Candidate.id, Candidate.name)
+        .join(GreetingRecord, GreetingRecord.candidate_id == Candidate.id)
+        .where(Candidate.id.in_(candidate_ids), greeting_outcome_in(SENT_OUTCOMES))
+        .group_by(Candidate.id)
+    )
+    conflicts = conflict_result.all()
+
+    if conflicts:
+        names = "、".join(name for _, name in conflicts[:5])
+        if len(conflicts) > 5:
+            names += f" 等 {len(conflicts)} 人"
+        raise HTTPException(
+            status_code=400,
+            detail=f"候选人 {names} 有关联的问候记录，无法删除"
+        )
+
+    # 打招呼循环中跳过、失败（未发出问候）的记录随候选人一起删除
+    await session.execute(
+        delete(GreetingRecord)
+        .where(GreetingRecord.candidate_id.in_(candidate_ids), ~greeting_outcome_in(SENT_OUTCOMES))
+        .execution_options(synchronize_session=False)
+    )
+
+    # 删除时再次校验，防止检查之后新写入的问候记录被孤立
     result = await session.execute(
-        select(Candidate).where(Candidate.id.in_(candidate_ids))
+        delete(Candidate)
+        .where(Candidate.id.in_(candidate_ids))
+        .where(~exists().where(GreetingRecord.candidate_id == Candidate.id))
+        .execution_options(synchronize_session=False)
     )
-    candidates = result.scalars().all()
+    deleted_count = result.rowcount
 
-    if not candidates:
+    if not deleted_count:
+        await session.rollback()
         raise HTTPException(status_code=404, detail="未找到任何候选人")
 
-    # 检查是否有问候记录
-    for candidate in candidates:
-        greeting_result = await session.execute(
-            select(GreetingRecord).where(
-                GreetingRecord.candidate_id == candidate.id
-            )
-        )
-        if greeting_result.scalars().first():
-            raise HTTPException(
-                status_code=400,
-                detail=f"候选人 {candidate.name} 有关联的问候记录，无法删除"
-            )
-
-    deleted_count = 0
-    for candidate in candidates:
-        await session.delete(candidate)
-        deleted_count += 1
-
     await session.commit()
 
     return {
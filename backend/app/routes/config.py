@@ -242,12 +242,12 @@ async def clear_login_info(session: AsyncSession = Depends(get_session)):
 
 @router.get("/stats")
 async def get_system_stats(session: AsyncSession = Depends(get_session)):
-    """获取系统统计信息"""
-    from app.models.candidate import Candidate
-    from app.models.greeting import GreetingRecord
-    from app.models.automation_task import AutomationTask, TaskStatus
-    from app.models.greeting_template import GreetingTemplate
-    from sqlmodel import func
+    """获取系统统计信息
+
+    计数来自触发器维护的统计汇总表（stats_rollup），一次主键查询即可得到全部指标
+    """
+    from app.models.automation_task import TaskStatus
+    from app.services.stats_service import get_rollup_counters
 
     config = await get_or_create_config(session)
 
@@ -261,75 +261,11 @@ async def get_system_stats(session: AsyncSession = Depends(get_session)):
             session.add(config)
             await session.commit()
 
-    # 候选人统计
-    total_candidates_result = await session.execute(
-        select(func.count(Candidate.id))
-    )
-    total_candidates = total_candidates_result.scalar()
-
-    # 今日新增候选人
-    today = date.today()
-    today_candidates_result = await session.execute(
-        select(func.count(Candidate.id)).where(
-            func.date(Candidate.created_at) == today
-        )
-    )
-    today_candidates = today_candidates_result.scalar()
-
-    # 问候记录统计
-    total_greetings_result = await session.execute(
-        select(func.count(GreetingRecord.id))
-    )
-    total_greetings = total_greetings_result.scalar()
-
-    # 成功的问候
-    success_greetings_result = await session.execute(
-        select(func.count(GreetingRecord.id)).where(
-            GreetingRecord.success == True
-        )
-    )
-    success_greetings = success_greetings_result.scalar()
-
-    # 今日问候
-    today_greetings_result = await session.execute(
-        select(func.count(GreetingRecord.id)).where(
-            func.date(GreetingRecord.sent_at) == today
-        )
-    )
-    today_greetings = today_greetings_result.scalar()
-
-    # 任务统计
-    total_tasks_result = await session.execute(
-        select(func.count(AutomationTask.id))
-    )
-    total_tasks = total_tasks_result.scalar()
-
-    running_tasks_result = await session.execute(
-        select(func.count(AutomationTask.id)).where(
-            AutomationTask.status == TaskStatus.RUNNING
-        )
-    )
-    running_tasks = running_tasks_result.scalar()
+    counters = await get_rollup_counters(session, date.today())
+    totals, today = counters["all"], counters["day"]
 
-    completed_tasks_result = await session.execute(
-        select(func.count(AutomationTask.id)).where(
-            AutomationTask.status == TaskStatus.COMPLETED
-        )
-    )
-    completed_tasks = completed_tasks_result.scalar()
-
-    # 模板统计
-    total_templates_result = await session.execute(
-        select(func.count(GreetingTemplate.id))
-    )
-    total_templates = total_templates_result.scalar()
-
-    active_templates_result = await session.execute(
-        select(func.count(GreetingTemplate.id)).where(
-            GreetingTemplate.is_active == True
-        )
-    )
-    active_templates = active_templates_result.scalar()
+    total_greetings = totals.get("greetings.total", 0)
+    success_greetings = totals.get("greetings.success", 0)
 
     return {
         "config": {
@@ -341,23 +277,23 @@ async def get_system_stats(session: AsyncSession = Depends(get_session)):
             "anti_detection_enabled": config.anti_detection_enabled
         },
         "candidates": {
-            "total": total_candidates,
-            "today_added": today_candidates
+            "total": totals.get("candidates.total", 0),
+            "today_added": today.get("candidates.added", 0)
         },
         "greetings": {
             "total": total_greetings,
             "success": success_greetings,
             "success_rate": round(success_greetings / total_greetings * 100, 2) if total_greetings > 0 else 0,
-            "today": today_greetings
+            "today": today.get("greetings.sent", 0)
         },
         "tasks": {
-            "total": total_tasks,
-            "running": running_tasks,
-            "completed": completed_tasks
+            "total": totals.get("tasks.total", 0),
+            "running": totals.get(f"tasks.status.{TaskStatus.RUNNING.name}", 0),
+            "completed": totals.get(f"tasks.status.{TaskStatus.COMPLETED.name}", 0)
         },
         "templates": {
-            "total": total_templates,
-            "active": active_templates
+            "total": totals.get("templates.total", 0),
+            "active": totals.get("templates.active", 0)
         }
     }
 
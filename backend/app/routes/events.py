@@ -0,0 +1,81 @@
+"""
+事件推送 API 路由（Server-Sent Events）
+"""
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.event_bus import event_bus
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# 没有事件时发送心跳注释的间隔（秒），防止代理断开空闲连接
+HEARTBEAT_INTERVAL = 15.0
+
+# 浏览器断线后重连的等待时间（毫秒）
+RETRY_MS = 3000
+
+
+def _encode(value):
+    """事件数据中的对象（如日志记录）在发送时才转换为字典"""
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if to_dict else str(value)
+
+
+def format_event(event) -> str:
+    """SSE 报文：id 为事件序号，浏览器重连时通过 Last-Event-ID 带回"""
+    data = json.dumps(event.data, ensure_ascii=False, default=_encode)
+    return f"id: {event.seq}\nevent: {event.topic}\ndata: {data}\n\n"
+
+
+@router.get("", summary="订阅任务事件流")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description="逗号分隔的事件前缀，如 greeting,task；默认全部"),
+    last_event_id: Optional[int] = Query(None, description="最后收到的事件序号（浏览器重连时使用 Last-Event-ID 请求头）"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    以 SSE 推送打招呼任务和自动化任务的事件
+
+    事件类型：
+    - greeting.status: 打招呼状态中变化的字段（总是包含 elapsed_time）
+    - greeting.log: 新的一条打招呼日志
+    - task.created / task.updated / task.deleted: 自动化任务的状态和计数
+    - reset: 无法补发断线期间的事件，客户端应重新拉取完整状态
+
+    没有事件时每 15 秒发送一次心跳注释
+    """
+    last_seq = last_event_id
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_seq = int(last_event_id_header)
+
+    subscription = event_bus.subscribe(
+        [t.strip() for t in topics.split(",") if t.strip()] if topics else None,
+        last_seq,
+    )
+
+    async def _stream():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                event = await subscription.get(HEARTBEAT_INTERVAL)
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield format_event(event)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 关闭 nginx 缓冲
+        },
+    )
@@ -1,9 +1,23 @@
 """
 打招呼自动化API路由
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List, Optional
+from app.database import get_session
+from app.models.greeting import GreetingRun
+from app.services.greeting_runs import (
+    GZIP_AFTER_DAYS,
+    compress_old_runs,
+    list_runs,
+    parse_log_line,
+    read_log_page,
+    resolve_log_file,
+)
+from app.services.greeting_seen import clear_seen
 from app.services.greeting_service import greeting_manager
 
 # 导入全局自动化服务
@@ -18,6 +32,9 @@ class StartGreetingRequest(BaseModel):
     """开始打招呼请求"""
     target_count: int = Field(..., ge=1, le=500, description="打招呼数量（1-500）")
     expected_positions: List[str] = Field(default=[], description="期望职位关键词列表（包含匹配）")
+    resume: bool = Field(default=False, description="是否从上次中断的任务快照恢复")
+    job_value: Optional[str] = Field(default=None, description="招聘职位标识（默认为推荐页当前选中的职位）")
+    seen_ttl_days: Optional[int] = Field(default=None, ge=1, description="只跳过最近N天内处理过的候选人（默认不过期）")
 
 
 class GreetingStatusResponse(BaseModel):
@@ -37,6 +54,7 @@ class GreetingStatusResponse(BaseModel):
 
 class LogEntry(BaseModel):
     """日志条目"""
+    seq: int
     timestamp: str
     level: str
     message: str
@@ -45,6 +63,8 @@ class LogEntry(BaseModel):
 class GreetingLogsResponse(BaseModel):
     """日志响应"""
     logs: List[LogEntry]
+    last_seq: int = 0
+    truncated: bool = False
 
 
 @router.post("/start", summary="开始打招呼任务")
@@ -53,10 +73,16 @@ async def start_greeting(request: StartGreetingRequest):
     启动自动打招呼任务
 
     - **target_count**: 打招呼数量（1-500）
+    - **resume**: 从上次中断的任务快照恢复，已处理过的候选人直接跳过，成功数累计计入目标
+    - **job_value**: 招聘职位标识，同一职位之前打过招呼的候选人直接跳过（不点开简历）
+    - **seen_ttl_days**: 之前处理过的候选人只在最近N天内跳过
     """
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"收到打招呼请求: target_count={request.target_count}, expected_positions={request.expected_positions}")
+    logger.info(
+        f"收到打招呼请求: target_count={request.target_count}, "
+        f"expected_positions={request.expected_positions}, resume={request.resume}"
+    )
 
     try:
         # 检查是否已有任务在运行
@@ -82,7 +108,10 @@ async def start_greeting(request: StartGreetingRequest):
         await greeting_manager.start_greeting_task(
             target_count=request.target_count,
             automation_service=automation,
-            expected_positions=request.expected_positions
+            expected_positions=request.expected_positions,
+            resume=request.resume,
+            job_key=request.job_value or automation.selected_job_value or "",
+            seen_ttl_days=request.seen_ttl_days
         )
 
         return {
@@ -112,15 +141,84 @@ async def get_greeting_status():
     return status
 
 
+@router.get("/metrics", summary="获取打招呼循环耗时统计")
+async def get_greeting_metrics():
+    """
+    获取当前（或最近一次）打招呼任务各阶段的耗时统计
+
+    - phases: 各阶段（card_scan、resume_wait、button_lookup、dialog_cleanup、reload 等）的
+      次数、累计/平均耗时、p50/p95/max 和直方图，按累计耗时从高到低排列
+    - counters: 刷新、滚动、点击重试、点击失败等计数
+    - log_file_sink: 日志文件写入器状态
+    """
+    return greeting_manager.get_metrics()
+
+
+@router.get("/snapshot", summary="获取可恢复的任务快照")
+async def get_greeting_snapshot():
+    """
+    获取上次未完成任务的快照摘要（不含已处理候选人列表）
+
+    没有可恢复的快照时 available 为 false
+    """
+    snapshot = greeting_manager.load_snapshot()
+    if snapshot is None:
+        return {"available": False}
+
+    return {
+        "available": True,
+        "status": snapshot.get("status"),
+        "saved_at": snapshot.get("saved_at"),
+        "target_count": snapshot.get("target_count", 0),
+        "success_count": snapshot.get("success_count", 0),
+        "failed_count": snapshot.get("failed_count", 0),
+        "skipped_count": snapshot.get("skipped_count", 0),
+        "processed_count": len(snapshot.get("processed_ids") or []),
+        "expected_positions": snapshot.get("expected_positions") or [],
+    }
+
+
+@router.delete("/seen", summary="清除已处理候选人记录")
+async def clear_greeting_seen(
+    job_value: Optional[str] = Query(default=None, description="只清除该职位的记录（默认所有职位）"),
+    older_than_days: Optional[int] = Query(default=None, ge=1, description="只清除N天前的记录"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    清除打招呼已处理候选人记录，清除后这些候选人会在下次任务中重新被处理
+    """
+    deleted = await clear_seen(session, job_key=job_value, older_than_days=older_than_days)
+    return {
+        "success": True,
+        "deleted": deleted
+    }
+
+
 @router.get("/logs", response_model=GreetingLogsResponse, summary="获取任务日志")
-async def get_greeting_logs(last_n: int = 50):
+async def get_greeting_logs(
+    last_n: int = 50,
+    since_seq: Optional[int] = Query(None, ge=0, description="只返回序号大于该值的日志"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="since_seq 模式下最多返回的条数"),
+):
     """
-    获取最近的任务日志
+    获取任务日志
 
     - **last_n**: 获取最近N条日志（默认50）
+    - **since_seq**: 只返回该序号之后的日志（按序号从小到大），轮询时传入上次响应的 last_seq
+    - **limit**: since_seq 模式下最多返回的条数，未返回完时以最后一条的 seq 继续读取
+
+    truncated 为 true 表示 since_seq 之后的部分日志已被覆盖（或服务重启过），返回的是缓冲中最早的日志
     """
-    logs = greeting_manager.get_logs(last_n=last_n)
-    return {"logs": logs}
+    truncated = False
+    if since_seq is not None:
+        logs, truncated = greeting_manager.get_logs_since(since_seq, limit)
+    else:
+        logs = greeting_manager.get_logs(last_n=last_n)
+    return {
+        "logs": logs,
+        "last_seq": greeting_manager.logs.last_seq,
+        "truncated": truncated,
+    }
 
 
 @router.post("/stop", summary="停止任务")
@@ -186,3 +284,80 @@ async def force_reset_greeting():
     except Exception as e:
         logger.error(f"❌ 强制重置失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"强制重置失败: {str(e)}")
+
+
+@router.get("/runs", response_model=List[GreetingRun], summary="获取运行历史")
+async def get_greeting_runs(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    按开始时间倒序列出打招呼任务的运行记录（只查询运行目录，不读取日志文件）
+
+    - **status**: 按运行状态筛选（running/completed/error/cancelled/limit_reached/interrupted）
+    - **cursor**: 下一页游标，见响应头 X-Next-Cursor
+    """
+    try:
+        runs, next_cursor = await list_runs(session, cursor, limit, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return runs
+
+
+@router.get("/runs/{run_id}", response_model=GreetingRun, summary="获取运行记录")
+async def get_greeting_run(run_id: int, session: AsyncSession = Depends(get_session)):
+    run = await session.get(GreetingRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="运行记录不存在")
+    return run
+
+
+@router.get("/runs/{run_id}/logs", summary="分页读取运行日志")
+async def get_greeting_run_logs(
+    run_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[int] = Query(None, ge=0, description="上一页返回的 next_before"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    从日志文件末尾向前分页读取（已压缩的日志透明解压），只解析返回的行
+
+    - **limit**: 每页行数
+    - **before**: 读取该偏移之前的日志，首页不传；next_before 为 null 表示已到文件开头
+    """
+    run = await session.get(GreetingRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="运行记录不存在")
+
+    path = resolve_log_file(run)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="日志文件不存在")
+
+    lines, next_before = await asyncio.to_thread(read_log_page, path, limit, before)
+    return {
+        "run_id": run_id,
+        "logs": [parse_log_line(line) for line in lines if line.strip()],
+        "next_before": next_before,
+        "compressed": path.suffix == ".gz",
+    }
+
+
+@router.post("/runs/compress", summary="压缩旧的运行日志")
+async def compress_greeting_runs(
+    older_than_days: int = Query(GZIP_AFTER_DAYS, ge=0, description="压缩结束超过N天的运行日志"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    将结束较久的运行日志压缩为 .gz（服务启动时也会自动执行）
+    """
+    compressed = await compress_old_runs(session, older_than_days)
+    return {
+        "success": True,
+        "compressed": compressed
+    }
@@ -1,12 +1,13 @@
 """
 日志相关 API 路由
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.database import get_session
 from app.services.logging_service import LoggingService
+from app.services.log_writer import log_writer
 from app.models.log_entry import (
     LogEntry,
     LogEntryRead,
@@ -21,7 +22,8 @@ router = APIRouter(prefix="/api/logs", tags=["logs"])
 @router.get("", response_model=dict)
 async def get_logs(
     limit: int = Query(default=100, ge=1, le=500, description="每页数量"),
-    offset: int = Query(default=0, ge=0, description="偏移量"),
+    offset: int = Query(default=0, ge=0, description="偏移量（兼容旧版，建议使用 cursor）"),
+    cursor: Optional[str] = Query(default=None, description="分页游标（上一页返回的 next_cursor）"),
     level: Optional[LogLevel] = Query(default=None, description="筛选日志级别"),
     action: Optional[LogAction] = Query(default=None, description="筛选操作类型"),
     task_id: Optional[int] = Query(default=None, description="筛选任务ID"),
@@ -31,13 +33,17 @@ async def get_logs(
     获取日志列表（支持分页和筛选）
     """
     logging_service = LoggingService(session)
-    logs, total = await logging_service.get_logs(
-        limit=limit,
-        offset=offset,
-        level=level,
-        action=action,
-        task_id=task_id,
-    )
+    try:
+        logs, total, total_exact, next_cursor = await logging_service.get_logs(
+            limit=limit,
+            offset=offset,
+            level=level,
+            action=action,
+            task_id=task_id,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "logs": [
@@ -56,8 +62,10 @@ async def get_logs(
             for log in logs
         ],
         "total": total,
+        "total_exact": total_exact,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
     }
 
 
@@ -67,10 +75,10 @@ async def create_log(
     session: AsyncSession = Depends(get_session),
 ):
     """
-    创建日志条目
+    创建日志条目（立即写入，返回创建的条目）
     """
     logging_service = LoggingService(session)
-    log_entry = await logging_service.log(
+    log_entry = await logging_service.write(
         action=log_data.action,
         message=log_data.message,
         level=log_data.level,
@@ -83,6 +91,14 @@ async def create_log(
     return log_entry
 
 
+@router.get("/writer/metrics", response_model=dict)
+async def get_log_writer_metrics():
+    """
+    获取日志写入器的队列深度和批量写入耗时
+    """
+    return log_writer.get_metrics()
+
+
 @router.delete("/old", response_model=dict)
 async def clear_old_logs(
     days: int = Query(default=30, ge=1, le=365, description="保留多少天的日志"),
@@ -4,6 +4,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, exists
 from sqlmodel import select
 from datetime import datetime
 
@@ -14,16 +15,27 @@ from app.models.greeting_template import (
     GreetingTemplateUpdate
 )
 from app.models.automation_task import AutomationTask, TaskStatus
+from app.utils.template_renderer import TemplateError, get_renderer, validate_template
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
 
+def _validate_content(content: str):
+    """校验模板变量，无效时返回 400"""
+    try:
+        validate_template(content)
+    except TemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("", response_model=GreetingTemplate)
 async def create_template(
     template_data: GreetingTemplateCreate,
     session: AsyncSession = Depends(get_session)
 ):
     """创建问候模板"""
+    _validate_content(template_data.content)
+
     template = GreetingTemplate(
         **template_data.model_dump(),
         usage_count=0,
@@ -111,6 +123,9 @@ async def update_template(
 
     # 更新字段
     update_data = template_data.model_dump(exclude_unset=True)
+    if update_data.get("content") is not None:
+        _validate_content(update_data["content"])
+
     for field, value in update_data.items():
         setattr(template, field, value)
 
@@ -268,11 +283,11 @@ async def preview_template(
         raise HTTPException(status_code=404, detail="模板不存在")
 
     # 生成预览内容
-    preview_content = template.content
-    preview_content = preview_content.replace('{name}', name)
-    preview_content = preview_content.replace('{position}', position)
-    if company:
-        preview_content = preview_content.replace('{company}', company)
+    preview_content = get_renderer(template)({
+        "name": name,
+        "position": position,
+        "company": company
+    })
 
     return {
         "template_id": template_id,
@@ -292,33 +307,44 @@ async def batch_delete_templates(
     template_ids: List[int],
     session: AsyncSession = Depends(get_session)
 ):
-    """批量删除模板"""
-    result = await session.execute(
-        select(GreetingTemplate).where(GreetingTemplate.id.in_(template_ids))
+    """批量删除模板
+
+    被待执行或运行中任务使用的模板不能删除；只要有一个冲突，整批都不删除
+    """
+    in_use = (
+        (AutomationTask.greeting_template_id == GreetingTemplate.id) &
+        (AutomationTask.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING]))
     )
-    templates = result.scalars().all()
 
-    if not templates:
-        raise HTTPException(status_code=404, detail="未找到任何模板")
+    # 一次分组查询找出所有正在使用的模板
+    conflict_result = await session.execute(
+        select(GreetingTemplate.id, GreetingTemplate.name)
+        .join(AutomationTask, in_use)
+        .where(GreetingTemplate.id.in_(template_ids))
+        .group_by(GreetingTemplate.id)
+    )
+    conflicts = conflict_result.all()
 
-    # 检查是否有正在使用的模板
-    for template in templates:
-        task_result = await session.execute(
-            select(AutomationTask).where(
-                (AutomationTask.greeting_template_id == template.id) &
-                (AutomationTask.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING]))
-            )
+    if conflicts:
+        names = "、".join(name for _, name in conflicts[:5])
+        if len(conflicts) > 5:
+            names += f" 等 {len(conflicts)} 个"
+        raise HTTPException(
+            status_code=400,
+            detail=f"模板 {names} 正在被任务使用，无法删除"
         )
-        if task_result.scalars().first():
-            raise HTTPException(
-                status_code=400,
-                detail=f"模板 {template.name} 正在被任务使用，无法删除"
-            )
-
-    deleted_count = 0
-    for template in templates:
-        await session.delete(template)
-        deleted_count += 1
+
+    result = await session.execute(
+        delete(GreetingTemplate)
+        .where(GreetingTemplate.id.in_(template_ids))
+        .where(~exists().where(in_use))
+        .execution_options(synchronize_session=False)
+    )
+    deleted_count = result.rowcount
+
+    if not deleted_count:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="未找到任何模板")
 
     await session.commit()
 
@@ -26,6 +26,8 @@ class BossAutomation:
         self.page: Optional[Page] = None
         self.is_logged_in: bool = False
         self.current_com_id: Optional[int] = com_id
+        # 推荐页当前选中的招聘职位（select_job_position 成功后记录）
+        self.selected_job_value: Optional[str] = None
 
         # 配置项
         self.base_url = "https://www.zhipin.com"
@@ -1303,6 +1305,7 @@ class BossAutomation:
             await AntiDetection.random_sleep(2, 3)
 
             logger.info("✅ 职位选择成功")
+            self.selected_job_value = job_value
             return {
                 'success': True,
                 'message': '职位选择成功',
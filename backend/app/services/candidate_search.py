@@ -0,0 +1,108 @@
+"""
+候选人搜索服务
+优先使用 FTS5 trigram 全文索引（candidates_fts）按相关度排序，
+少于 3 个字符的关键词（如两个字的中文姓名）无法走 trigram 索引，回退到 LIKE 匹配
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import literal_column, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.migrations import CANDIDATE_FTS_COLUMNS
+from app.models.candidate import Candidate
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "candidates_fts"
+
+# trigram 分词器能够索引的最短关键词长度
+MIN_FTS_TERM_LENGTH = 3
+
+# bm25 列权重（顺序与 CANDIDATE_FTS_COLUMNS 一致）：姓名和职位命中优先
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 5.0, 1.0, 1.0)
+
+# 全文索引是否可用（首次查询时检测，进程内缓存）
+_fts_available: Optional[bool] = None
+
+
+async def is_fts_available(session: AsyncSession) -> bool:
+    """检测候选人全文索引是否已创建"""
+    global _fts_available
+
+    if _fts_available is None:
+        result = await session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        )
+        _fts_available = result.scalar() is not None
+        if not _fts_available:
+            logger.warning("⚠️ 未找到候选人全文索引，搜索将使用 LIKE 匹配")
+
+    return _fts_available
+
+
+def split_search_terms(search: str) -> Tuple[List[str], List[str]]:
+    """按空白拆分关键词
+
+    Returns:
+        (可走全文索引的关键词, 需要 LIKE 匹配的短关键词)
+    """
+    fts_terms, like_terms = [], []
+    for term in search.split():
+        if len(term) >= MIN_FTS_TERM_LENGTH:
+            fts_terms.append(term)
+        else:
+            like_terms.append(term)
+    return fts_terms, like_terms
+
+
+def build_match_expression(terms: List[str]) -> str:
+    """构造 FTS5 MATCH 表达式：每个关键词作为短语，多个关键词之间为 AND"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_condition(term: str):
+    """关键词在任一文本列中出现"""
+    return or_(*[
+        getattr(Candidate, column).contains(term, autoescape=True)
+        for column in CANDIDATE_FTS_COLUMNS
+    ])
+
+
+async def apply_candidate_search(session: AsyncSession, query, search: str):
+    """为候选人查询添加关键词搜索条件
+
+    Args:
+        session: 数据库会话
+        query: select(Candidate) 查询
+        search: 搜索关键词（空白分隔的多个关键词为 AND 关系）
+
+    Returns:
+        (查询, 是否已按相关度排序)
+    """
+    fts_terms, like_terms = split_search_terms(search)
+
+    if not fts_terms or not await is_fts_available(session):
+        for term in fts_terms + like_terms:
+            query = query.where(_like_condition(term))
+        return query, False
+
+    weights = ", ".join(str(w) for w in FTS_COLUMN_WEIGHTS)
+    matches = (
+        select(
+            literal_column("rowid").label("candidate_id"),
+            literal_column(f"bm25({FTS_TABLE}, {weights})").label("score"),
+        )
+        .select_from(text(FTS_TABLE))
+        .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=build_match_expression(fts_terms)))
+        .subquery("fts_matches")
+    )
+
+    query = query.join(matches, matches.c.candidate_id == Candidate.id)
+    for term in like_terms:
+        query = query.where(_like_condition(term))
+
+    # bm25 分数越小越相关
+    return query.order_by(matches.c.score, Candidate.id.desc()), True
@@ -0,0 +1,183 @@
+"""
+候选人写入服务
+按批次生成单条 INSERT ... ON CONFLICT(boss_id) DO UPDATE 语句批量写入候选人，
+重复抓取到的候选人只刷新资料字段，不覆盖状态、备注等人工维护的数据
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candidate import Candidate, CandidateCreate, CandidateStatus
+from app.models.greeting import CONTACTED_OUTCOMES, GreetingOutcome, GreetingRecord
+
+logger = logging.getLogger(__name__)
+
+# 每条 INSERT 语句包含的行数（约 15 列 × 500 行，远低于 SQLite 32766 个绑定参数的上限）
+UPSERT_BATCH_SIZE = 500
+
+# 候选人已存在时刷新的资料字段；新值为空（NULL 或空字符串）时保留原值
+PROFILE_FIELDS = (
+    "name",
+    "avatar",
+    "position",
+    "company",
+    "work_experience",
+    "education",
+    "expected_position",
+    "expected_salary",
+    "expected_location",
+    "active_time",
+    "profile_url",
+)
+
+# 仅在新建时写入的字段（连同 status）
+INSERT_ONLY_FIELDS = ("tags", "notes", "last_contacted_at")
+
+
+def normalize_scraped_candidate(data: Dict) -> Optional[Dict]:
+    """将抓取到的候选人字典（API / DOM 解析结果）转换为 candidates 表字段
+
+    Returns:
+        字段字典；缺少 boss_id 或姓名时返回 None
+    """
+    if not data or not data.get("boss_id") or not data.get("name"):
+        return None
+
+    active_time = data.get("active_time")
+    return {
+        "boss_id": data["boss_id"],
+        "name": data["name"],
+        "avatar": data.get("avatar") or None,
+        "position": data.get("position") or "",
+        "company": data.get("company") or None,
+        "work_experience": data.get("work_experience") or None,
+        "education": data.get("education") or None,
+        "expected_position": data.get("expected_position") or None,
+        "expected_salary": data.get("expected_salary") or data.get("salary") or None,
+        "expected_location": data.get("expected_location") or data.get("location") or None,
+        # 页面上的活跃时间是“刚刚活跃”这类描述文字，无法存入时间列
+        "active_time": active_time if isinstance(active_time, datetime) else None,
+        "profile_url": data.get("profile_url") or None,
+    }
+
+
+def _to_row(item: Union[CandidateCreate, Dict], now: datetime) -> Dict:
+    data = item.model_dump() if isinstance(item, CandidateCreate) else dict(item)
+    row = {"boss_id": data["boss_id"]}
+    for field in PROFILE_FIELDS:
+        row[field] = data.get(field)
+    row["position"] = row["position"] or ""
+    row["status"] = data.get("status") or CandidateStatus.NEW
+    for field in INSERT_ONLY_FIELDS:
+        row[field] = data.get(field)
+    row["created_at"] = now
+    row["updated_at"] = now
+    return row
+
+
+async def bulk_upsert_candidates(
+    session: AsyncSession,
+    items: Iterable[Union[CandidateCreate, Dict]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+    commit: bool = True,
+) -> Dict:
+    """批量插入或更新候选人（以 boss_id 去重）
+
+    Args:
+        session: 数据库会话
+        items: CandidateCreate 或包含 candidates 表字段的字典
+        batch_size: 每条语句包含的行数
+        commit: 是否在写入完成后提交
+
+    Returns:
+        {"ids": {boss_id: id}, "inserted": 新建数量, "updated": 更新数量}
+    """
+    now = datetime.now()
+
+    # 同一批数据中重复的 boss_id 以最后一条为准
+    rows: Dict[str, Dict] = {}
+    for item in items:
+        row = _to_row(item, now)
+        rows[row["boss_id"]] = row
+    pending: List[Dict] = list(rows.values())
+
+    ids: Dict[str, int] = {}
+    inserted = 0
+
+    # 语句只编译一次，executemany 时由 SQLAlchemy 的 insertmanyvalues 按批渲染为单条多行 INSERT
+    stmt = insert(Candidate)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Candidate.boss_id],
+        set_={
+            **{
+                field: func.coalesce(
+                    func.nullif(getattr(stmt.excluded, field), ""),
+                    getattr(Candidate, field),
+                )
+                for field in PROFILE_FIELDS
+            },
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(
+        Candidate.id,
+        Candidate.boss_id,
+        # 新建行的创建时间与更新时间相同，已存在的行保留原创建时间
+        Candidate.created_at == Candidate.updated_at,
+    ).execution_options(insertmanyvalues_page_size=batch_size)
+
+    for start in range(0, len(pending), batch_size):
+        result = await session.execute(stmt, pending[start:start + batch_size])
+        for candidate_id, boss_id, is_new in result.all():
+            ids[boss_id] = candidate_id
+            inserted += 1 if is_new else 0
+
+    if commit:
+        await session.commit()
+
+    logger.info(f"💾 批量写入候选人 {len(ids)} 个（新建 {inserted}，更新 {len(ids) - inserted}）")
+
+    return {
+        "ids": ids,
+        "inserted": inserted,
+        "updated": len(ids) - inserted,
+    }
+
+
+def greeting_outcome_in(outcomes: Iterable[GreetingOutcome]):
+    """问候记录的处理结果属于 outcomes 的筛选条件（自动化任务的记录 outcome 为空，视为已发送）"""
+    return or_(
+        GreetingRecord.outcome.is_(None),
+        GreetingRecord.outcome.in_([outcome.value for outcome in outcomes]),
+    )
+
+
+async def load_contact_map(
+    session: AsyncSession,
+    boss_ids: Iterable[str],
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> Dict[str, Tuple[Candidate, bool]]:
+    """一次性查出一批 boss_id 对应的候选人及其是否已有问候记录
+
+    Returns:
+        {boss_id: (候选人, 是否已联系过)}，不存在的候选人不在结果中
+    """
+    pending = list(dict.fromkeys(b for b in boss_ids if b))
+    # 打招呼循环中跳过或失败（未发出问候）的记录不算联系过
+    contacted = exists().where(
+        GreetingRecord.candidate_id == Candidate.id,
+        greeting_outcome_in(CONTACTED_OUTCOMES),
+    )
+
+    contact_map: Dict[str, Tuple[Candidate, bool]] = {}
+    for start in range(0, len(pending), batch_size):
+        result = await session.execute(
+            select(Candidate, contacted).where(Candidate.boss_id.in_(pending[start:start + batch_size]))
+        )
+        for candidate, already_contacted in result.all():
+            contact_map[candidate.boss_id] = (candidate, bool(already_contacted))
+
+    return contact_map
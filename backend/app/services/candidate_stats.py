@@ -0,0 +1,116 @@
+"""
+候选人统计服务
+一次 GROUP BY 查询得到按状态计数、总数和今日新增，结果缓存在进程内，
+通过 SQLAlchemy 会话事件在候选人数据提交后自动失效
+"""
+import logging
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+from sqlalchemy import case, event, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from app.models.candidate import Candidate, CandidateStatus
+
+logger = logging.getLogger(__name__)
+
+# 会话中标记“本事务修改过候选人”的键
+_DIRTY_KEY = "candidate_stats_dirty"
+
+
+async def compute_candidate_stats(session: AsyncSession, today: Optional[date] = None) -> Dict:
+    """单次分组查询统计候选人（走 (status, created_at) 索引）"""
+    today = today or date.today()
+    today_start = datetime.combine(today, time.min)
+
+    result = await session.execute(
+        select(
+            Candidate.status,
+            func.count(Candidate.id),
+            func.sum(case((Candidate.created_at >= today_start, 1), else_=0)),
+        ).group_by(Candidate.status)
+    )
+
+    by_status = {status.value: 0 for status in CandidateStatus}
+    total = 0
+    today_added = 0
+    for status, count, added in result.all():
+        by_status[CandidateStatus(status).value] = count
+        total += count
+        today_added += added or 0
+
+    return {
+        "total": total,
+        "today_added": today_added,
+        "by_status": by_status,
+    }
+
+
+class CandidateStatsCache:
+    """候选人统计的进程内缓存"""
+
+    def __init__(self):
+        self._stats: Optional[Dict] = None
+        self._day: Optional[date] = None
+        # 每次失效递增，防止并发读取把失效前查到的旧结果写回缓存
+        self._generation: int = 0
+
+    def invalidate(self):
+        """使缓存失效"""
+        self._generation += 1
+        self._stats = None
+
+    async def get(self, session: AsyncSession) -> Dict:
+        """获取统计结果，缓存有效时不访问数据库"""
+        today = date.today()
+        if self._stats is not None and self._day == today:
+            return _copy(self._stats)
+
+        generation = self._generation
+        stats = await compute_candidate_stats(session, today)
+        if generation == self._generation:
+            self._stats, self._day = stats, today
+
+        return _copy(stats)
+
+
+def _copy(stats: Dict) -> Dict:
+    return {**stats, "by_status": dict(stats["by_status"])}
+
+
+# 全局单例
+candidate_stats_cache = CandidateStatsCache()
+
+
+def _is_candidate(obj) -> bool:
+    return isinstance(obj, Candidate)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_candidate_flush(session, flush_context):
+    """ORM 对象方式的增删改"""
+    if any(_is_candidate(obj) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_candidate_statements(orm_execute_state):
+    """insert()/update()/delete() 语句方式的批量写入"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Candidate:
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        candidate_stats_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
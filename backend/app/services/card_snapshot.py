@@ -0,0 +1,219 @@
+"""
+推荐列表卡片快照
+一次 frame.evaluate 取回卡片的序号、geekId、姓名和期望职位，
+打招呼循环据此选择下一个候选人，不再逐张卡片调用 count()/inner_text()/evaluate()
+
+CardCursor 记住上一个处理过的卡片（geekId + DOM 序号），下一次只从它之后取一小段卡片，
+列表滚动加载变长或虚拟滚动移除前面的节点后仍能按 geekId 找回位置；只有页面刷新后才从头扫描
+"""
+import json
+from typing import Iterable, List, NamedTuple, Optional
+
+# 推荐列表卡片选择器
+CARD_SELECTOR = "ul.card-list > li"
+
+# 游标每次取回的卡片数
+CARD_WINDOW_SIZE = 20
+
+# 在页面中执行的快照脚本（期望职位解析与 get_candidates_info_final.py 相同：取 join-text-wrap 的文本节点）
+CARD_SNAPSHOT_JS = """
+({selector, anchorId, anchorIndex, limit}) => {
+    function extractJoinTextParts(element) {
+        if (!element) return [];
+        const parts = [];
+        for (const child of element.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                const text = child.textContent.trim();
+                if (text) {
+                    parts.push(text);
+                }
+            }
+        }
+        return parts;
+    }
+
+    function geekIdOf(el) {
+        const cardInner = el.querySelector('.card-inner');
+        return cardInner ? (cardInner.getAttribute('data-geekid') || cardInner.getAttribute('data-geek')) : null;
+    }
+
+    const items = document.querySelectorAll(selector);
+
+    // 定位锚点：先看原序号处是否仍是锚点卡片，列表变化时再按 geekId 查找
+    let start = 0;
+    let anchored = false;
+    if (anchorIndex >= 0) {
+        let pos = -1;
+        if (!anchorId) {
+            pos = anchorIndex < items.length ? anchorIndex : -1;
+        } else if (anchorIndex < items.length && geekIdOf(items[anchorIndex]) === anchorId) {
+            pos = anchorIndex;
+        } else {
+            for (let i = 0; i < items.length; i++) {
+                if (geekIdOf(items[i]) === anchorId) {
+                    pos = i;
+                    break;
+                }
+            }
+        }
+        if (pos >= 0) {
+            start = pos + 1;
+            anchored = true;
+        }
+    }
+
+    const end = limit ? Math.min(items.length, start + limit) : items.length;
+    const rows = [];
+    for (let index = start; index < end; index++) {
+        const el = items[index];
+        const nameEl = el.querySelector('.name');
+        // parts[0] 是城市，parts[1] 是职位
+        const parts = extractJoinTextParts(el.querySelector('.row-flex .content .join-text-wrap'));
+        rows.push([
+            index,
+            geekIdOf(el),
+            nameEl ? nameEl.innerText.trim() : null,
+            parts.length > 1 ? parts[1] : null,
+        ]);
+    }
+    return {start, end, total: items.length, anchored, rows};
+}
+"""
+
+
+class CardInfo(NamedTuple):
+    """卡片快照中的一项"""
+    index: int
+    geek_id: Optional[str]
+    name: Optional[str]
+    expected_position: Optional[str]
+
+    @property
+    def key(self) -> str:
+        """候选人标识：优先使用 geekId，卡片没有 geekId 时退回 名字+期望职位"""
+        return self.geek_id or f"{self.name}|{self.expected_position or ''}"
+
+
+class CardWindow(NamedTuple):
+    """一次快照取回的连续卡片"""
+    start: int
+    end: int  # 最后一张卡片的序号 + 1
+    total: int  # 当前列表中的卡片总数
+    anchored: bool  # 是否从锚点之后开始（否则为从头扫描）
+    cards: List[CardInfo]
+
+
+async def snapshot_cards(
+    frame,
+    anchor_geek_id: Optional[str] = None,
+    anchor_index: int = -1,
+    limit: Optional[int] = None,
+    selector: str = CARD_SELECTOR,
+) -> CardWindow:
+    """一次往返取回锚点之后的卡片（没有锚点或锚点已不在列表中时从头开始，没有姓名的卡片被忽略）
+
+    Args:
+        frame: recommendFrame
+        anchor_geek_id: 锚点卡片的 geekId
+        anchor_index: 锚点卡片的 DOM 序号，-1 表示没有锚点
+        limit: 最多取回的卡片数，None 表示取到列表末尾
+    """
+    result = await frame.evaluate(CARD_SNAPSHOT_JS, {
+        "selector": selector,
+        "anchorId": anchor_geek_id,
+        "anchorIndex": anchor_index,
+        "limit": limit or 0,
+    })
+    return CardWindow(
+        start=result["start"],
+        end=result["end"],
+        total=result["total"],
+        anchored=result["anchored"],
+        cards=[
+            CardInfo(index, geek_id or None, name, expected_position or None)
+            for index, geek_id, name, expected_position in result["rows"]
+            if name
+        ],
+    )
+
+
+def pick_next_card(cards: Iterable[CardInfo], processed_ids, seen_ids=()) -> Optional[CardInfo]:
+    """按列表顺序选出第一张未处理的卡片
+
+    Args:
+        processed_ids: 本次任务已处理的候选人标识
+        seen_ids: 之前的任务中已处理过的 geekId
+    """
+    for card in cards:
+        if card.key not in processed_ids and card.geek_id not in seen_ids:
+            return card
+    return None
+
+
+def card_locator(frame, card: CardInfo, selector: str = CARD_SELECTOR):
+    """定位快照中的卡片：有 geekId 时按属性定位，列表在快照之后变化也不会点错人"""
+    if card.geek_id:
+        value = json.dumps(card.geek_id)
+        return frame.locator(
+            f"{selector}:has(.card-inner[data-geekid={value}], .card-inner[data-geek={value}])"
+        ).first
+    return frame.locator(selector).nth(card.index)
+
+
+class CardCursor:
+    """推荐列表游标：从上一个处理过的卡片之后继续选卡"""
+
+    def __init__(self, window: int = CARD_WINDOW_SIZE):
+        self.window = window
+        self.anchor_geek_id: Optional[str] = None
+        self.anchor_index: int = -1
+
+        # 统计：快照次数、从头扫描次数、取回的卡片数
+        self.snapshots = 0
+        self.full_scans = 0
+        self.cards_scanned = 0
+        # 因之前的任务处理过而跳过的 geekId
+        self.seen_skipped_ids = set()
+
+    def reset(self):
+        """页面刷新后列表重新渲染，下一次从头扫描"""
+        self.anchor_geek_id = None
+        self.anchor_index = -1
+
+    def advance(self, card: CardInfo):
+        """把锚点移到刚选中的卡片"""
+        self.anchor_geek_id = card.geek_id
+        self.anchor_index = card.index
+
+    async def next_card(self, frame, processed_ids, seen_ids=()) -> Optional[CardInfo]:
+        """返回锚点之后第一张未处理的卡片（seen_ids 中的卡片直接跳过）
+
+        到达列表末尾时返回 None，锚点停在最后一张卡片上，滚动加载更多后从那里继续
+        """
+        while True:
+            snapshot = await snapshot_cards(frame, self.anchor_geek_id, self.anchor_index, self.window)
+            self.snapshots += 1
+            if not snapshot.anchored:
+                self.full_scans += 1
+            self.cards_scanned += snapshot.end - snapshot.start
+
+            card = pick_next_card(snapshot.cards, processed_ids, seen_ids)
+            if seen_ids:
+                stop = card.index if card is not None else snapshot.end
+                self.seen_skipped_ids.update(
+                    c.geek_id for c in snapshot.cards
+                    if c.index < stop and c.geek_id in seen_ids
+                )
+            if card is not None:
+                return card
+
+            # 这一段都处理过了，锚点移到段尾
+            if snapshot.end > snapshot.start:
+                last = snapshot.cards[-1] if snapshot.cards else None
+                if last is not None and last.index == snapshot.end - 1:
+                    self.advance(last)
+                else:
+                    self.anchor_geek_id, self.anchor_index = None, snapshot.end - 1
+
+            if snapshot.end >= snapshot.total:
+                return None
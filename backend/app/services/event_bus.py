@@ -0,0 +1,139 @@
+"""
+进程内事件总线
+打招呼任务和自动化任务把状态变化、新日志发布到这里，/api/events 以 SSE 推送给所有打开的页面，
+页面不再轮询完整的状态和最近 100 条日志
+
+每个事件带全局递增的序号，最近的事件保存在环形缓冲中；客户端断线重连时带上最后收到的序号，
+从缓冲中补发之后的事件，序号已被挤出缓冲（或服务重启）时收到 reset 事件，由客户端重新拉取完整状态
+"""
+import asyncio
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+# 环形缓冲保留的事件数（用于断线重连补发）
+EVENT_BUFFER_SIZE = 1000
+
+# 每个订阅者的队列容量，消费过慢写满后清空队列并发送 reset
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# 客户端需要重新拉取完整状态
+RESET_TOPIC = "reset"
+
+
+class Event(NamedTuple):
+    """一条事件"""
+    seq: int
+    topic: str  # 如 greeting.status、greeting.log、task.updated
+    data: Any
+
+
+def _matches(topic: str, topics: Optional[Set[str]]) -> bool:
+    """topics 为事件名前缀（如 greeting 匹配 greeting.status），None 表示订阅全部"""
+    return topics is None or topic.split(".", 1)[0] in topics or topic in topics
+
+
+class Subscription:
+    """一个订阅者（对应一个 SSE 连接）"""
+
+    def __init__(self, bus: "EventBus", topics: Optional[Set[str]]):
+        self.bus = bus
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # 因消费过慢被重置的次数
+        self.overflows = 0
+
+    def _push(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 丢弃积压的事件，让客户端重新拉取完整状态
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflows += 1
+            self.queue.put_nowait(self.bus._reset_event())
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """等待下一条事件，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus._subscribers.discard(self)
+
+
+class EventBus:
+    """发布 / 订阅（只在事件循环线程中使用）"""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE):
+        self.seq = 0
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+
+    def publish(self, topic: str, data: Any = None) -> int:
+        """发布事件，不等待订阅者（订阅者队列写满时该订阅者收到 reset）
+
+        Returns:
+            事件序号
+        """
+        self.seq += 1
+        event = Event(self.seq, topic, data)
+        self._buffer.append(event)
+        self.published += 1
+
+        for subscription in list(self._subscribers):
+            if _matches(topic, subscription.topics):
+                subscription._push(event)
+        return self.seq
+
+    def subscribe(
+        self,
+        topics: Optional[Iterable[str]] = None,
+        last_seq: Optional[int] = None,
+    ) -> Subscription:
+        """订阅事件
+
+        Args:
+            topics: 事件名前缀列表，None 表示全部
+            last_seq: 客户端最后收到的序号，补发之后的事件；None 表示只接收新事件
+        """
+        subscription = Subscription(self, set(topics) if topics else None)
+
+        if last_seq is not None and last_seq != self.seq:
+            replay = self.events_since(last_seq)
+            if replay is None:
+                subscription._push(self._reset_event())
+            else:
+                for event in replay:
+                    if _matches(event.topic, subscription.topics):
+                        subscription._push(event)
+
+        self._subscribers.add(subscription)
+        return subscription
+
+    def events_since(self, last_seq: int) -> Optional[List[Event]]:
+        """缓冲中序号大于 last_seq 的事件；中间有事件已被挤出缓冲或序号不属于本进程时返回 None"""
+        if last_seq > self.seq:
+            return None  # 服务重启过，序号重新开始
+        oldest = self._buffer[0].seq if self._buffer else self.seq + 1
+        if last_seq < oldest - 1:
+            return None
+        return [event for event in self._buffer if event.seq > last_seq]
+
+    def _reset_event(self) -> Event:
+        # 使用当前序号，客户端重新拉取状态后从这里继续
+        return Event(self.seq, RESET_TOPIC, None)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "seq": self.seq,
+            "published": self.published,
+            "buffered": len(self._buffer),
+            "subscribers": len(self._subscribers),
+        }
+
+
+# 全局单例
+event_bus = EventBus()
@@ -0,0 +1,167 @@
+"""
+打招呼循环处理结果落库
+每个候选人的处理结果（已打招呼、职位不匹配、之前已沟通过、失败）先在内存中缓冲，
+按条数或时间间隔在一个事务内批量写入：候选人 upsert、状态更新、带运行 ID 的问候记录、已处理集合
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.greeting import CONTACTED_OUTCOMES, SENT_OUTCOMES, GreetingOutcome, GreetingRecord
+from app.services.candidate_service import bulk_upsert_candidates
+from app.services.greeting_seen import mark_seen
+
+logger = logging.getLogger(__name__)
+
+# 累计多少条结果时写入一次
+OUTCOME_FLUSH_EVERY = 10
+
+# 距上次写入超过多少秒时写入
+OUTCOME_FLUSH_INTERVAL = 5.0
+
+# 推荐页打招呼按钮发送的是平台上设置的招呼语，记录中不保存具体内容
+GREETING_BUTTON_MESSAGE = "推荐页打招呼（平台默认招呼语）"
+
+
+class OutcomeEntry(NamedTuple):
+    """单个候选人的处理结果"""
+    geek_id: str
+    name: Optional[str]
+    expected_position: Optional[str]
+    outcome: GreetingOutcome
+    error: Optional[str]
+    at: datetime
+
+
+async def persist_outcomes(
+    session: AsyncSession,
+    run_id: Optional[int],
+    job_key: str,
+    entries: List[OutcomeEntry],
+) -> int:
+    """在一个事务内写入一批处理结果
+
+    Args:
+        run_id: 打招呼运行 ID（运行记录创建失败时为 None）
+        job_key: 招聘职位标识
+        entries: 处理结果，缺少 geekId 的条目忽略
+
+    Returns:
+        写入的问候记录数
+    """
+    entries = [e for e in entries if e.geek_id]
+    if not entries:
+        return 0
+
+    result = await bulk_upsert_candidates(
+        session,
+        [
+            {
+                "boss_id": e.geek_id,
+                "name": e.name or "",
+                "expected_position": e.expected_position,
+                # 只对新建的候选人生效，已存在的候选人在下面按条件更新
+                "status": CandidateStatus.CONTACTED if e.outcome in CONTACTED_OUTCOMES else CandidateStatus.NEW,
+                "last_contacted_at": e.at if e.outcome in SENT_OUTCOMES else None,
+            }
+            for e in entries
+        ],
+        commit=False,
+    )
+    ids = result["ids"]
+    now = datetime.now()
+
+    # 联系过的候选人：状态改为已沟通，并加入已处理集合
+    contacted_ids = [ids[e.geek_id] for e in entries if e.outcome in CONTACTED_OUTCOMES]
+    if contacted_ids:
+        # 已回复、有意向等后续状态不回退
+        await session.execute(
+            update(Candidate)
+            .where(Candidate.id.in_(contacted_ids), Candidate.status == CandidateStatus.NEW)
+            .values(status=CandidateStatus.CONTACTED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    greeted = {ids[e.geek_id]: e.at for e in entries if e.outcome in SENT_OUTCOMES}
+    if greeted:
+        # 每个候选人使用各自的打招呼时间
+        await session.execute(
+            update(Candidate)
+            .where(Candidate.id.in_(list(greeted)))
+            .values(last_contacted_at=case(greeted, value=Candidate.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    session.add_all([
+        GreetingRecord(
+            candidate_id=ids[e.geek_id],
+            run_id=run_id,
+            outcome=e.outcome.value,
+            # 只有已打招呼的候选人收到了消息
+            message=GREETING_BUTTON_MESSAGE if e.outcome in SENT_OUTCOMES else "",
+            success=e.outcome in SENT_OUTCOMES,
+            error_message=e.error,
+            sent_at=e.at,
+        )
+        for e in entries
+    ])
+
+    await mark_seen(
+        session,
+        job_key,
+        [(e.geek_id, e.name, e.outcome) for e in entries if e.outcome in CONTACTED_OUTCOMES],
+        commit=False,
+    )
+    await session.commit()
+    return len(entries)
+
+
+class OutcomeBuffer:
+    """缓冲打招呼循环的处理结果，按条数或时间间隔批量写入（不在每个候选人之后提交）"""
+
+    def __init__(
+        self,
+        session_maker: Callable,
+        run_id: Optional[int],
+        job_key: str,
+        every: int = OUTCOME_FLUSH_EVERY,
+        interval: float = OUTCOME_FLUSH_INTERVAL,
+    ):
+        self.session_maker = session_maker
+        self.run_id = run_id
+        self.job_key = job_key
+        self.every = every
+        self.interval = interval
+        self.pending: List[OutcomeEntry] = []
+        self.written = 0
+        self._last_flush = time.monotonic()
+
+    async def add(self, card, outcome: GreetingOutcome, error: Optional[str] = None):
+        """记录一个候选人（卡片快照）的处理结果，达到阈值时写入"""
+        if card is None or not card.geek_id:
+            return
+        self.pending.append(OutcomeEntry(
+            card.geek_id, card.name, card.expected_position, outcome, error, datetime.now(),
+        ))
+        if len(self.pending) >= self.every or time.monotonic() - self._last_flush >= self.interval:
+            await self.flush()
+
+    async def flush(self):
+        """写入缓冲中的结果；失败时保留，下次写入时重试"""
+        self._last_flush = time.monotonic()
+        if not self.pending:
+            return
+
+        entries = self.pending
+        self.pending = []
+        try:
+            async with self.session_maker() as session:
+                self.written += await persist_outcomes(session, self.run_id, self.job_key, entries)
+        except Exception as e:
+            self.pending = entries + self.pending
+            logger.error(f"写入打招呼处理结果失败（{len(entries)} 条，稍后重试）: {e}")
@@ -0,0 +1,396 @@
+"""
+打招呼任务运行目录
+每次运行在 greeting_runs 表中记录一行（开始时写入，结束时补全摘要），浏览历史只查询本表；
+查看某次运行的日志时从文件末尾按块向前读取一页，不解析整个文件；
+按大小轮转出的 .1、.2 ... 文件与当前文件按写入顺序视为同一个日志；
+结束较久的运行日志（连同轮转文件）合并压缩为一个 .gz，读取时透明解压
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.greeting import GreetingRun
+from app.services.log_file_sink import log_segments
+from app.utils.pagination import apply_keyset, split_page
+
+logger = logging.getLogger(__name__)
+
+# 结束超过多少天的运行日志压缩为 .gz
+GZIP_AFTER_DAYS = 7
+
+# 从文件末尾向前读取的块大小
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# 旧版日志中摘要前的分隔行
+LEGACY_SUMMARY_SEPARATOR = "=" * 50
+
+# 没有正常结束（进程退出）的运行状态
+STATUS_INTERRUPTED = "interrupted"
+
+# 从任务摘要写入运行记录的字段
+RUN_SUMMARY_FIELDS = (
+    "status",
+    "target_count",
+    "success_count",
+    "failed_count",
+    "skipped_count",
+    "total_processed",
+    "elapsed_time",
+    "limit_reached",
+    "error_message",
+)
+
+
+async def start_run(
+    session: AsyncSession,
+    target_count: int,
+    expected_positions: Iterable[str],
+    job_key: str,
+    log_file: Optional[Path],
+    run_id: Optional[int] = None,
+) -> int:
+    """记录一次运行开始（从快照恢复时沿用原运行记录）
+
+    Returns:
+        运行记录 ID
+    """
+    run = await session.get(GreetingRun, run_id) if run_id else None
+    if run is None:
+        run = GreetingRun(created_at=datetime.now())
+
+    run.status = "running"
+    run.target_count = target_count
+    run.expected_positions = json.dumps(list(expected_positions), ensure_ascii=False)
+    run.job_key = job_key
+    # 恢复的运行继续写入未压缩的日志文件
+    run.log_file = str(log_file) if log_file else None
+    run.log_compressed = False
+    run.ended_at = None
+    session.add(run)
+    await session.commit()
+    return run.id
+
+
+async def finish_run(session: AsyncSession, run_id: int, summary: Dict):
+    """用任务摘要补全运行记录"""
+    run = await session.get(GreetingRun, run_id)
+    if run is None:
+        return
+
+    for field in RUN_SUMMARY_FIELDS:
+        if field in summary:
+            setattr(run, field, summary[field])
+    metrics = {key: summary[key] for key in ("phases", "counters") if key in summary}
+    run.metrics = json.dumps(metrics, ensure_ascii=False) if metrics else None
+    run.ended_at = datetime.now()
+    session.add(run)
+    await session.commit()
+
+
+async def list_runs(
+    session: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    status: Optional[str] = None,
+) -> Tuple[List[GreetingRun], Optional[str]]:
+    """按开始时间倒序分页列出运行记录
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    query = select(GreetingRun)
+    if status:
+        query = query.where(GreetingRun.status == status)
+    result = await session.execute(apply_keyset(query, GreetingRun, cursor, limit))
+    return split_page(result.scalars().all(), limit)
+
+
+def resolve_log_file(run: GreetingRun) -> Optional[Path]:
+    """运行记录的日志文件（压缩完成但记录未更新时使用 .gz 文件）"""
+    if not run.log_file:
+        return None
+    path = Path(run.log_file)
+    if not path.exists() and path.suffix != ".gz":
+        compressed = path.with_name(path.name + ".gz")
+        if compressed.exists():
+            return compressed
+    return path
+
+
+class _SegmentReader:
+    """把轮转文件和当前文件按写入顺序拼接为一个可按偏移读取的字节流"""
+
+    def __init__(self, paths: List[Path]):
+        # (文件, 在拼接流中的起始偏移, 结束偏移)
+        self.files: List[Tuple] = []
+        self.size = 0
+        try:
+            for path in paths:
+                f = open(path, "rb")
+                start = self.size
+                self.size += f.seek(0, os.SEEK_END)
+                self.files.append((f, start, self.size))
+        except Exception:
+            self.close()
+            raise
+
+    def read(self, pos: int, n: int) -> bytes:
+        """读取拼接后 [pos, pos + n) 范围内的字节"""
+        end = pos + n
+        parts = []
+        for f, start, stop in self.files:
+            if stop <= pos or start >= end:
+                continue
+            f.seek(max(pos, start) - start)
+            parts.append(f.read(min(end, stop) - max(pos, start)))
+        return b"".join(parts)
+
+    def close(self):
+        for f, _, _ in self.files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log_page(path: Path, limit: int, before: Optional[int] = None) -> Tuple[List[str], Optional[int]]:
+    """读取日志文件中 before 偏移之前的最后 limit 行（在线程中调用）
+
+    Args:
+        path: 日志文件，.gz 文件透明解压（偏移为解压后的字节偏移）；
+            未压缩时连同轮转文件一起读取（偏移为按写入顺序拼接后的字节偏移）
+        limit: 最多返回的行数
+        before: 上一页返回的偏移，None 表示从文件末尾开始
+
+    Returns:
+        (按文件顺序的行, 更早一页的偏移；已到文件开头时为 None)
+    """
+    if path.suffix == ".gz":
+        return _read_gzip_page(path, limit, before)
+
+    segments = log_segments(path)
+    if not segments:
+        raise FileNotFoundError(path)
+
+    with _SegmentReader(segments) as f:
+        size = f.size
+        end = size if before is None else min(before, size)
+
+        # 从 end 向前按块读取，直到凑够 limit 个完整行或到达文件开头
+        chunks: List[bytes] = []
+        newlines = 0
+        pos = end
+        while pos > 0 and newlines <= limit:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            chunk = f.read(pos, step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+
+    data = b"".join(reversed(chunks))
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    if not data:
+        return [], None
+
+    lines = data.split(b"\n")
+    if pos > 0:
+        lines = lines[1:]  # 第一段可能是不完整的行
+    page = lines[-limit:]
+    start = pos + len(data) - len(b"\n".join(page))
+    return [line.decode("utf-8", errors="replace") for line in page], (start or None)
+
+
+def _read_gzip_page(path: Path, limit: int, before: Optional[int]) -> Tuple[List[str], Optional[int]]:
+    """gzip 文件只能顺序解压：流式读取并只保留窗口内的 limit 行
+
+    每一页都从文件开头解压到 before，向前翻页的代价与文件大小成正比（整份翻完为 O(页数 × 文件)）；
+    压缩的只是结束较久、很少查看的日志，按需接受这一代价
+    """
+    window: deque = deque(maxlen=limit)
+    offset = 0
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if before is not None and offset >= before:
+                break
+            window.append((offset, line.rstrip(b"\n")))
+            offset += len(line)
+
+    if not window:
+        return [], None
+    start = window[0][0]
+    return [line.decode("utf-8", errors="replace") for _, line in window], (start or None)
+
+
+def parse_log_line(line: str) -> Dict:
+    """解析一行日志（JSON），无法解析的行（如旧版多行摘要）作为原始文本返回"""
+    try:
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            return entry
+    except ValueError:
+        pass
+    return {"raw": line}
+
+
+def _gzip_file(path: Path) -> Optional[Path]:
+    """把日志文件连同轮转文件按写入顺序合并压缩为一个 .gz，先写临时文件再替换，完成后删除原文件
+
+    .gz 已存在时（运行压缩后又被恢复、继续写入了新日志），保留原有内容，新日志作为追加的 gzip 成员，
+    解压时多个成员按顺序拼接
+    """
+    segments = log_segments(path)
+    if not segments:
+        return None
+    target = path.with_name(path.name + ".gz")
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        if target.exists():
+            with open(target, "rb") as existing:
+                shutil.copyfileobj(existing, raw)
+        with gzip.open(raw, "wb") as dst:
+            for segment in segments:
+                with open(segment, "rb") as src:
+                    shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)
+    for segment in segments:
+        segment.unlink()
+    return target
+
+
+async def compress_old_runs(session: AsyncSession, older_than_days: int = GZIP_AFTER_DAYS) -> int:
+    """压缩结束超过 N 天的运行日志
+
+    Returns:
+        压缩的文件数
+    """
+    result = await session.execute(
+        select(GreetingRun).where(
+            GreetingRun.log_compressed == False,  # noqa: E712
+            GreetingRun.log_file.is_not(None),
+            GreetingRun.ended_at < datetime.now() - timedelta(days=older_than_days),
+        )
+    )
+
+    compressed = 0
+    for run in result.scalars().all():
+        path = Path(run.log_file)
+        try:
+            target = await asyncio.to_thread(_gzip_file, path)
+        except Exception as e:
+            logger.error(f"压缩日志文件 {path} 失败: {e}")
+            continue
+        if target is None:
+            # 上次压缩完成后未来得及更新记录
+            target = path.with_name(path.name + ".gz")
+            if not target.exists():
+                continue
+        run.log_file = str(target)
+        run.log_compressed = True
+        session.add(run)
+        compressed += 1
+
+    await session.commit()
+    if compressed:
+        logger.info(f"🗜️ 已压缩 {compressed} 个打招呼日志文件")
+    return compressed
+
+
+async def recover_interrupted_runs(session: AsyncSession) -> int:
+    """服务启动时将上次进程退出时仍在运行的记录标记为中断
+
+    Returns:
+        标记的记录数
+    """
+    result = await session.execute(
+        update(GreetingRun)
+        .where(GreetingRun.status == "running")
+        .values(status=STATUS_INTERRUPTED, ended_at=datetime.now())
+    )
+    await session.commit()
+    return result.rowcount
+
+
+def _read_file_summary(path: Path) -> Tuple[Optional[datetime], Optional[Dict]]:
+    """从日志文件末尾读取任务摘要（兼容旧版分隔行 + 多行 JSON），并从文件名解析开始时间"""
+    started_at = None
+    stem = path.name.split(".", 1)[0]
+    try:
+        started_at = datetime.strptime(stem, "greeting_%Y%m%d_%H%M%S")
+    except ValueError:
+        pass
+
+    lines, _ = read_log_page(path, 500)
+    summary = None
+    if LEGACY_SUMMARY_SEPARATOR in lines:
+        index = len(lines) - 1 - lines[::-1].index(LEGACY_SUMMARY_SEPARATOR)
+        try:
+            summary = json.loads("\n".join(lines[index + 1:]))
+        except ValueError:
+            pass
+    elif lines:
+        entry = parse_log_line(lines[-1])
+        if entry.get("type") == "SUMMARY":
+            summary = entry
+    return started_at, summary
+
+
+async def backfill_runs(session: AsyncSession, logs_dir: Path) -> int:
+    """为运行目录建立之前没有记录的日志文件（每个文件只读取末尾一次）
+
+    Returns:
+        新增的记录数
+    """
+    result = await session.execute(select(GreetingRun.log_file).where(GreetingRun.log_file.is_not(None)))
+    # 压缩前后的路径只差 .gz 后缀，按去掉后缀的路径比较
+    known = {path.removesuffix(".gz") for path in result.scalars().all()}
+
+    files = sorted(
+        path for pattern in ("greeting_*.log", "greeting_*.log.gz")
+        for path in logs_dir.glob(pattern)
+        if str(path).removesuffix(".gz") not in known
+    )
+
+    added = 0
+    for path in files:
+        try:
+            started_at, summary = await asyncio.to_thread(_read_file_summary, path)
+            mtime = datetime.fromtimestamp(path.stat().st_mtime)
+        except Exception as e:
+            logger.error(f"读取日志文件 {path} 失败: {e}")
+            continue
+
+        summary = summary or {}
+        run = GreetingRun(
+            created_at=started_at or mtime,
+            ended_at=datetime.fromisoformat(summary["timestamp"]) if summary.get("timestamp") else mtime,
+            expected_positions=json.dumps(summary.get("expected_positions") or [], ensure_ascii=False),
+            log_file=str(path),
+            log_compressed=path.suffix == ".gz",
+        )
+        for field in RUN_SUMMARY_FIELDS:
+            if field in summary:
+                setattr(run, field, summary[field])
+        if "status" not in summary:
+            run.status = STATUS_INTERRUPTED
+        session.add(run)
+        added += 1
+
+    await session.commit()
+    if added:
+        logger.info(f"📚 已为 {added} 个历史打招呼日志文件建立运行记录")
+    return added
@@ -0,0 +1,95 @@
+"""
+打招呼已处理候选人集合
+按 (招聘职位, geekId) 持久化打过招呼或之前已沟通过的候选人，
+同一职位再次运行时直接从卡片快照中跳过，不再点开简历面板
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.greeting import GreetingOutcome, GreetingSeenCandidate
+
+logger = logging.getLogger(__name__)
+
+
+async def load_seen(session: AsyncSession, job_key: str, ttl_days: Optional[int] = None) -> Set[str]:
+    """读取某个职位已处理过的 geekId
+
+    Args:
+        job_key: 招聘职位标识
+        ttl_days: 只返回最近 N 天内处理过的候选人，None 表示不过期
+    """
+    stmt = select(GreetingSeenCandidate.geek_id).where(GreetingSeenCandidate.job_key == job_key)
+    if ttl_days is not None:
+        stmt = stmt.where(GreetingSeenCandidate.seen_at >= datetime.now() - timedelta(days=ttl_days))
+    result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+
+async def mark_seen(
+    session: AsyncSession,
+    job_key: str,
+    entries: Iterable[Tuple[str, Optional[str], GreetingOutcome]],
+    commit: bool = True,
+) -> int:
+    """记录处理过的候选人（已存在时刷新处理时间和结果）
+
+    Args:
+        entries: (geekId, 姓名, 处理结果) 列表
+
+    Returns:
+        写入的条数
+    """
+    now = datetime.now()
+    rows = [
+        {"job_key": job_key, "geek_id": geek_id, "name": name, "outcome": outcome.value, "seen_at": now}
+        for geek_id, name, outcome in entries
+        if geek_id
+    ]
+    if not rows:
+        return 0
+
+    stmt = insert(GreetingSeenCandidate)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GreetingSeenCandidate.job_key, GreetingSeenCandidate.geek_id],
+        set_={
+            "name": stmt.excluded.name,
+            "outcome": stmt.excluded.outcome,
+            "seen_at": stmt.excluded.seen_at,
+        },
+    )
+    await session.execute(stmt, rows)
+    if commit:
+        await session.commit()
+    return len(rows)
+
+
+async def clear_seen(
+    session: AsyncSession,
+    job_key: Optional[str] = None,
+    older_than_days: Optional[int] = None,
+) -> int:
+    """删除已处理记录
+
+    Args:
+        job_key: 只删除该职位的记录，None 表示所有职位
+        older_than_days: 只删除 N 天前的记录，None 表示全部
+
+    Returns:
+        删除的条数
+    """
+    stmt = delete(GreetingSeenCandidate)
+    if job_key is not None:
+        stmt = stmt.where(GreetingSeenCandidate.job_key == job_key)
+    if older_than_days is not None:
+        stmt = stmt.where(GreetingSeenCandidate.seen_at < datetime.now() - timedelta(days=older_than_days))
+    result = await session.execute(stmt.execution_options(synchronize_session=False))
+    await session.commit()
+
+    if result.rowcount:
+        logger.info(f"🧹 已删除 {result.rowcount} 条打招呼已处理记录")
+    return result.rowcount
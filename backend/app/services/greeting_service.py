@@ -7,17 +7,42 @@ import logging
 import random
 import os
 import json
-from typing import Optional, Dict, List
+import time
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
-from collections import deque
 from pathlib import Path
 
+from app.services.card_snapshot import CardCursor, card_locator
+from app.services.event_bus import event_bus
+from app.services.log_file_sink import log_file_sink
+from app.utils.log_ring import LogRing
+from app.utils.phase_timer import PhaseTimer
+from app.services.greeting_runs import finish_run, start_run
+from app.services.greeting_outcomes import OutcomeBuffer
+from app.services.greeting_seen import load_seen
+from app.models.greeting import GreetingOutcome
+
 logger = logging.getLogger(__name__)
 
 # 日志目录
 LOGS_DIR = Path(__file__).parent.parent.parent / "logs" / "greeting"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+# 任务状态快照文件（进程崩溃或任务被重置后可从快照恢复）
+SNAPSHOT_PATH = LOGS_DIR / "greeting_snapshot.json"
+
+# 内存中保留的日志条数
+LOG_RING_SIZE = 500
+
+# 快照格式版本
+SNAPSHOT_VERSION = 2
+
+# 每处理多少个候选人写一次快照
+SNAPSHOT_EVERY = 5
+
+# 距上次快照超过多少秒时写快照
+SNAPSHOT_INTERVAL = 10.0
+
 
 def random_delay(min_seconds: float = 1.0, max_seconds: float = 3.0) -> float:
     """生成随机延迟时间（秒）
@@ -32,6 +57,16 @@ def random_delay(min_seconds: float = 1.0, max_seconds: float = 3.0) -> float:
     return random.uniform(min_seconds, max_seconds)
 
 
+def _write_snapshot(path: Path, state: Dict):
+    """先写临时文件并 fsync，再用 os.replace 原子替换，崩溃时不会留下半个文件"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 class GreetingTaskManager:
     """打招呼任务管理器（单例）"""
 
@@ -45,7 +80,7 @@ class GreetingTaskManager:
         self.skipped_count: int = 0
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
-        self.logs: deque = deque(maxlen=500)  # 增加到500条日志
+        self.logs: LogRing = LogRing(LOG_RING_SIZE)
         self.error_message: Optional[str] = None
         self.limit_reached: bool = False  # 是否触发打招呼限制
 
@@ -58,14 +93,38 @@ class GreetingTaskManager:
         # 日志文件路径（每次任务创建新文件）
         self.log_file_path: Optional[Path] = None
 
+        # 运行记录 ID（greeting_runs 表），随快照持久化
+        self.run_id: Optional[int] = None
+
+        # 已处理候选人ID集合（geekId，卡片没有 geekId 时为 名字+期望职位），随快照持久化
+        self.processed_ids: set = set()
+
+        # 招聘职位标识及该职位之前的任务中已处理过的 geekId（持久化在 greeting_seen_candidates 表）
+        self.job_key: str = ""
+        self.seen_ttl_days: Optional[int] = None
+        self.seen_ids: set = set()
+
+        # 数据库会话工厂（默认使用 app.database.async_session_maker）
+        self.session_maker = None
+
+        # 打招呼循环各阶段耗时及重试、刷新等计数
+        self.timer: PhaseTimer = PhaseTimer()
+
+        # 快照文件路径及写入节流状态
+        self.snapshot_path: Path = SNAPSHOT_PATH
+        self._snapshot_pending: int = 0
+        self._last_snapshot: float = time.monotonic()
+
+        # 上次推送到事件总线的状态（只推送变化的字段）
+        self._published_status: Dict = {}
+
     def add_log(self, level: str, message: str):
         """添加日志（同时保存到内存和文件）"""
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "level": level,
-            "message": message
-        }
-        self.logs.append(log_entry)
+        record = self.logs.append(level, message)
+
+        # 推送状态变化和新日志（计数总是在写日志前更新；日志在发送给订阅者时才格式化）
+        self._publish_status()
+        event_bus.publish("greeting.log", record)
 
         # 同时输出到标准日志
         if level == "INFO":
@@ -75,13 +134,9 @@ class GreetingTaskManager:
         elif level == "ERROR":
             logger.error(message)
 
-        # 写入日志文件（持久化）
+        # 写入日志文件（持久化）：交给后台写入器缓冲写入，不阻塞当前协程
         if self.log_file_path:
-            try:
-                with open(self.log_file_path, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-            except Exception as e:
-                logger.error(f"写入日志文件失败: {e}")
+            log_file_sink.write(self.log_file_path, json.dumps(record.to_dict(), ensure_ascii=False))
 
     def get_status(self) -> Dict:
         """获取当前状态"""
@@ -104,9 +159,31 @@ class GreetingTaskManager:
             "error_message": self.error_message
         }
 
+    def _publish_status(self):
+        """推送与上次相比变化的状态字段（附带 elapsed_time），没有变化时不推送"""
+        status = self.get_status()
+        delta = {
+            key: value for key, value in status.items()
+            if key != "elapsed_time" and self._published_status.get(key, ...) != value
+        }
+        if not delta:
+            return
+        delta["elapsed_time"] = status["elapsed_time"]
+        self._published_status = status
+        event_bus.publish("greeting.status", delta)
+
     def get_logs(self, last_n: int = 50) -> List[Dict]:
         """获取最近的日志"""
-        return list(self.logs)[-last_n:]
+        return [record.to_dict() for record in self.logs.tail(last_n)]
+
+    def get_logs_since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[Dict], bool]:
+        """获取序号大于 seq 的日志，只访问新增的条目
+
+        Returns:
+            (日志列表, 是否有日志已被覆盖而无法返回)
+        """
+        records, truncated = self.logs.since(seq, limit)
+        return [record.to_dict() for record in records], truncated
 
     def reset(self):
         """重置状态（日志文件保留，不删除）"""
@@ -127,43 +204,210 @@ class GreetingTaskManager:
         if self.automation:
             self.automation = None
 
-    async def start_greeting_task(self, target_count: int, automation_service=None, expected_positions: List[str] = None):
+    async def start_greeting_task(
+        self,
+        target_count: int,
+        automation_service=None,
+        expected_positions: List[str] = None,
+        resume: bool = False,
+        job_key: str = "",
+        seen_ttl_days: Optional[int] = None,
+    ):
         """启动打招呼任务
 
         Args:
             target_count: 目标打招呼数量
             automation_service: 已初始化的BossAutomation实例（复用已打开的浏览器）
             expected_positions: 期望职位关键词列表（包含匹配）
+            resume: 是否从上次的快照恢复（跳过已处理的候选人，沿用计数）
+            job_key: 招聘职位标识，同一职位之前处理过的候选人直接跳过
+            seen_ttl_days: 只跳过最近 N 天内处理过的候选人，None 表示不过期
         """
         if self.status == "running":
             raise RuntimeError("任务已在运行中")
 
+        snapshot = self.load_snapshot() if resume else None
+        if resume and snapshot is None:
+            raise RuntimeError("没有可恢复的任务快照")
+
         # 重置状态
         self.reset()
+        self._reset_progress()
         self.status = "running"
         self.target_count = target_count
         self.start_time = datetime.now()
 
-        # 创建日志文件（按时间戳命名）
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file_path = LOGS_DIR / f"greeting_{timestamp}.log"
+        if snapshot:
+            self.restore_snapshot(snapshot)
+        if job_key:
+            self.job_key = job_key
+        self.seen_ttl_days = seen_ttl_days
+
+        # 创建日志文件（按时间戳命名），恢复时继续写入原日志文件
+        if self.log_file_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.log_file_path = LOGS_DIR / f"greeting_{timestamp}.log"
         logger.info(f"📝 日志文件: {self.log_file_path}")
 
-        # 保存期望职位列表
+        # 保存期望职位列表（恢复任务时请求中指定了期望职位则以请求为准）
         if expected_positions:
             self.expected_positions = expected_positions
-            self.add_log("INFO", f"🎯 启用职位匹配筛选，关键词: {', '.join(expected_positions)}")
+        if self.expected_positions:
+            self.add_log("INFO", f"🎯 启用职位匹配筛选，关键词: {', '.join(self.expected_positions)}")
 
+        await self._open_run()
+
+        if snapshot:
+            self.add_log(
+                "INFO",
+                f"♻️ 从快照恢复任务：已处理 {len(self.processed_ids)} 个候选人，"
+                f"已成功 {self.success_count} 个，已处理的候选人将直接跳过"
+            )
         self.add_log("INFO", f"🚀 开始打招呼任务，目标数量: {target_count}")
 
         # 保存自动化服务引用（复用已有浏览器）
         self.automation = automation_service
 
+        # 写入初始快照
+        await self.save_snapshot(force=True)
+
         # 创建后台任务
         self.task = asyncio.create_task(self._run_greeting_task(target_count))
 
+    def _reset_progress(self):
+        """清空上一次任务的进度（计数、已处理集合、筛选条件）"""
+        self.current_index = 0
+        self.success_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+        self.error_message = None
+        self.limit_reached = False
+        self.expected_positions = []
+        self.processed_ids = set()
+        self.job_key = ""
+        self.seen_ids = set()
+        self.timer = PhaseTimer()
+        self.log_file_path = None
+        self.run_id = None
+        self._snapshot_pending = 0
+
+    def _snapshot_state(self) -> Dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": datetime.now().isoformat(),
+            "status": self.status,
+            "target_count": self.target_count,
+            "current_index": self.current_index,
+            "success_count": self.success_count,
+            "failed_count": self.failed_count,
+            "skipped_count": self.skipped_count,
+            "limit_reached": self.limit_reached,
+            "expected_positions": list(self.expected_positions),
+            "job_key": self.job_key,
+            "processed_ids": sorted(self.processed_ids),
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "log_file_path": str(self.log_file_path) if self.log_file_path else None,
+            "run_id": self.run_id,
+        }
+
+    async def save_snapshot(self, force: bool = False):
+        """写入任务状态快照
+
+        每处理 SNAPSHOT_EVERY 个候选人或间隔 SNAPSHOT_INTERVAL 秒写一次；
+        状态在调用时取出，文件写入和 fsync 在线程中执行，不阻塞事件循环
+
+        Args:
+            force: 忽略节流立即写入
+        """
+        self._snapshot_pending += 1
+        if not force and self._snapshot_pending < SNAPSHOT_EVERY \
+                and time.monotonic() - self._last_snapshot < SNAPSHOT_INTERVAL:
+            return
+
+        try:
+            await asyncio.to_thread(_write_snapshot, self.snapshot_path, self._snapshot_state())
+        except Exception as e:
+            logger.error(f"写入任务快照失败: {e}")
+            return
+
+        self._snapshot_pending = 0
+        self._last_snapshot = time.monotonic()
+
+    def load_snapshot(self) -> Optional[Dict]:
+        """读取任务快照，不存在或内容无效时返回 None"""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"任务快照无效，已忽略: {e}")
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        return snapshot
+
+    def restore_snapshot(self, snapshot: Dict):
+        """从快照恢复已处理集合、计数和期望职位（不访问浏览器）"""
+        self.processed_ids = set(snapshot.get("processed_ids") or [])
+        self.current_index = len(self.processed_ids)
+        self.success_count = snapshot.get("success_count", 0)
+        self.failed_count = snapshot.get("failed_count", 0)
+        self.skipped_count = snapshot.get("skipped_count", 0)
+        self.expected_positions = list(snapshot.get("expected_positions") or [])
+        self.job_key = snapshot.get("job_key") or ""
+        log_file_path = snapshot.get("log_file_path")
+        self.log_file_path = Path(log_file_path) if log_file_path else None
+        self.run_id = snapshot.get("run_id")
+
+    def clear_snapshot(self):
+        """删除任务快照"""
+        try:
+            self.snapshot_path.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"删除任务快照失败: {e}")
+
+    def _get_session_maker(self):
+        if self.session_maker is None:
+            from app.database import async_session_maker
+            return async_session_maker
+        return self.session_maker
+
+    async def _load_seen_ids(self):
+        """读取当前职位之前处理过的候选人（失败时不影响任务，只是不跳过）"""
+        try:
+            async with self._get_session_maker()() as session:
+                self.seen_ids = await load_seen(session, self.job_key, self.seen_ttl_days)
+        except Exception as e:
+            self.seen_ids = set()
+            logger.error(f"读取已处理候选人失败: {e}")
+            return
+
+        if self.seen_ids:
+            self.add_log("INFO", f"🔁 当前职位之前已处理过 {len(self.seen_ids)} 个候选人，将直接跳过")
+
+    async def _human_delay(self, min_seconds: float, max_seconds: float) -> float:
+        """随机延迟，模拟人类操作节奏（计入 human_delay 阶段）"""
+        delay = random_delay(min_seconds, max_seconds)
+        with self.timer.phase("human_delay"):
+            await asyncio.sleep(delay)
+        return delay
+
+    def get_metrics(self) -> Dict:
+        """打招呼循环各阶段耗时（p50/p95/max 及直方图）和计数"""
+        return {
+            "status": self.status,
+            **self.timer.summary(),
+            "log_file_sink": log_file_sink.get_metrics(),
+        }
+
     async def _run_greeting_task(self, target_count: int):
         """执行打招呼任务（后台运行）"""
+        # 每个候选人的处理结果写入候选人和问候记录（按批提交）
+        outcomes = OutcomeBuffer(self._get_session_maker(), self.run_id, self.job_key)
         try:
             if not self.automation:
                 raise RuntimeError("自动化服务未初始化，请先在向导中初始化浏览器")
@@ -188,36 +432,25 @@ class GreetingTaskManager:
 
             # 逐个处理候选人，直到成功打招呼达到目标数量
             # 使用已处理集合追踪（解决虚拟滚动问题）
-            processed_ids = set()  # 已处理候选人ID集合（名字+期望职位）
+            # 恢复任务时集合中已包含上次处理过的候选人，遇到时直接跳过
+            processed_ids = self.processed_ids  # 已处理候选人ID集合（geekId）
             no_new_candidate_count = 0  # 连续无新候选人计数
+            cursor = CardCursor()  # 从上一个处理过的卡片之后继续选卡
+            timer = self.timer
+            await self._load_seen_ids()
             # 动态设置最大尝试次数：目标数量的3倍，最少100，最多1000
             max_attempts = min(max(target_count * 3, 100), 1000)
             self.add_log("INFO", f"📊 目标成功数: {target_count}, 最多尝试: {max_attempts} 个候选人")
 
             while self.success_count < target_count and len(processed_ids) < max_attempts:
+                target = None
                 try:
-                    # 获取当前可见的所有候选人卡片
-                    cards = await recommend_frame.locator('ul.card-list > li').all()
-
-                    # 找第一个未处理的候选人
-                    card = None
-                    candidate_name = None
-                    candidate_id = None
-                    for c in cards:
-                        try:
-                            name_el = c.locator('.name').first
-                            if await name_el.count() > 0:
-                                name = await name_el.inner_text()
-                                # 提取期望职位用于组合ID（避免重名冲突）
-                                expected_pos = await self._extract_expected_position(c)
-                                cid = f"{name}|{expected_pos or ''}"
-                                if cid not in processed_ids:
-                                    card = c
-                                    candidate_name = name
-                                    candidate_id = cid
-                                    break
-                        except:
-                            continue
+                    # 从游标位置取回一段卡片快照，找第一个未处理的候选人
+                    with timer.phase("card_scan"):
+                        target = await cursor.next_card(recommend_frame, processed_ids, self.seen_ids)
+                    card = card_locator(recommend_frame, target) if target else None
+                    candidate_name = target.name if target else None
+                    candidate_id = target.key if target else None
 
                     # 如果没找到未处理的候选人，滚动加载更多
                     if card is None:
@@ -227,8 +460,10 @@ class GreetingTaskManager:
                             self.add_log("INFO", "🔄 刷新页面后继续执行任务...")
 
                             # 刷新页面
-                            await self.automation.page.reload()
-                            await asyncio.sleep(3)  # 等待页面加载
+                            timer.incr("reloads")
+                            with timer.phase("reload"):
+                                await self.automation.page.reload()
+                                await asyncio.sleep(3)  # 等待页面加载
 
                             # 重新获取 recommendFrame
                             recommend_frame = None
@@ -242,31 +477,37 @@ class GreetingTaskManager:
                                 break
 
                             self.add_log("INFO", "✅ 页面刷新成功，继续执行任务")
+                            cursor.reset()  # 列表重新渲染，从头扫描
                             no_new_candidate_count = 0  # 重置计数
                             await asyncio.sleep(2)  # 额外等待确保页面稳定
                             continue
 
                         self.add_log("INFO", "📜 滚动加载更多候选人...")
-                        await recommend_frame.evaluate("""
-                            window.scrollTo({ top: document.documentElement.scrollHeight, behavior: 'smooth' });
-                        """)
-                        await asyncio.sleep(2)
+                        timer.incr("scrolls")
+                        with timer.phase("scroll"):
+                            await recommend_frame.evaluate("""
+                                window.scrollTo({ top: document.documentElement.scrollHeight, behavior: 'smooth' });
+                            """)
+                            await asyncio.sleep(2)
                         continue
 
                     no_new_candidate_count = 0  # 重置计数
+                    cursor.advance(target)
                     processed_ids.add(candidate_id)  # 标记为已处理
                     self.current_index = len(processed_ids)
+                    await self.save_snapshot()
 
                     self.add_log("INFO", f"📍 处理候选人 #{len(processed_ids)} {candidate_name} (已成功: {self.success_count}/{target_count})")
 
                     # 职位匹配筛选（如果启用）
                     if self.expected_positions:
-                        # 从候选人ID中提取期望职位（已在查找时提取）
-                        expected_pos = candidate_id.split('|')[1] if '|' in candidate_id else None
+                        # 期望职位已在卡片快照中提取
+                        expected_pos = target.expected_position
 
                         if not expected_pos:
                             # 候选人没有期望职位信息，跳过
                             self.skipped_count += 1
+                            await outcomes.add(target, GreetingOutcome.SKIPPED_MISMATCH)
                             self.add_log("WARNING", f"⏭️  {candidate_name}: 无期望职位信息，已跳过")
                             continue
 
@@ -274,6 +515,7 @@ class GreetingTaskManager:
                         if not self._match_position(expected_pos, self.expected_positions):
                             # 职位不匹配，跳过
                             self.skipped_count += 1
+                            await outcomes.add(target, GreetingOutcome.SKIPPED_MISMATCH)
                             self.add_log("INFO", f"⏭️  {candidate_name}: 期望职位不匹配({expected_pos})，已跳过")
                             continue
 
@@ -283,14 +525,19 @@ class GreetingTaskManager:
                     self.add_log("INFO", f"🖱️  准备点击候选人: {candidate_name}")
 
                     # 确保没有对话框阻挡
-                    if await self._ensure_no_blocking_dialogs(recommend_frame):
+                    with timer.phase("dialog_cleanup"):
+                        cleared = await self._ensure_no_blocking_dialogs(recommend_frame)
+                        if cleared:
+                            await asyncio.sleep(0.5)  # 额外延迟确保DOM稳定
+                    if cleared:
+                        timer.incr("dialogs_cleared")
                         self.add_log("INFO", "已清理阻挡的对话框")
-                        await asyncio.sleep(0.5)  # 额外延迟确保DOM稳定
 
                     # 点击候选人卡片，带重试机制
                     click_success = False
                     try:
-                        await card.click()
+                        with timer.phase("card_click"):
+                            await card.click()
                         self.add_log("INFO", f"✅ 已点击候选人: {candidate_name}")
                         click_success = True
                     except Exception as e:
@@ -300,13 +547,16 @@ class GreetingTaskManager:
                         # 检测是否是对话框拦截错误
                         if 'intercept' in error_str.lower() or 'covering' in error_str.lower() or 'pointer-events' in error_str.lower():
                             self.add_log("WARNING", "检测到对话框阻挡，尝试清理并重试...")
+                            timer.incr("click_retries")
                             # 再次清理对话框
-                            await self._ensure_no_blocking_dialogs(recommend_frame)
-                            await asyncio.sleep(1.0)
+                            with timer.phase("dialog_cleanup"):
+                                await self._ensure_no_blocking_dialogs(recommend_frame)
+                                await asyncio.sleep(1.0)
 
                             # 重试一次
                             try:
-                                await card.click()
+                                with timer.phase("card_click"):
+                                    await card.click()
                                 self.add_log("INFO", "✅ 重试点击成功")
                                 click_success = True
                             except Exception as retry_error:
@@ -314,22 +564,25 @@ class GreetingTaskManager:
 
                     # 如果点击失败，跳过此候选人
                     if not click_success:
+                        timer.incr("click_failures")
                         self.failed_count += 1
-                        self.add_log("ERROR", f"❌ 跳过候选人 {card_index}（点击失败）")
+                        await outcomes.add(target, GreetingOutcome.FAILED, "点击候选人卡片失败")
+                        self.add_log("ERROR", f"❌ 跳过候选人 {candidate_name}（点击失败）")
                         continue
 
                     # 随机延迟：模拟人类点击后的等待（1-2秒）
-                    delay = random_delay(1.0, 2.0)
-                    await asyncio.sleep(delay)
+                    await self._human_delay(1.0, 2.0)
 
                     # 等待简历面板加载
-                    await recommend_frame.wait_for_selector('.dialog-lib-resume', timeout=10000)
+                    with timer.phase("resume_wait"):
+                        await recommend_frame.wait_for_selector('.dialog-lib-resume', timeout=10000)
                     self.add_log("INFO", "✅ 简历面板已加载")
 
                     # 随机延迟：模拟人类阅读简历的时间（2-4秒）
                     delay = random_delay(2.0, 4.0)
                     self.add_log("INFO", f"📖 阅读简历... ({delay:.1f}秒)")
-                    await asyncio.sleep(delay)
+                    with timer.phase("human_delay"):
+                        await asyncio.sleep(delay)
 
                     # 查找并点击打招呼按钮
                     button_selectors = [
@@ -340,30 +593,30 @@ class GreetingTaskManager:
 
                     button_found = False
                     already_contacted = False
-                    for selector in button_selectors:
-                        try:
-                            button = recommend_frame.locator(selector).first
-                            if await button.count() > 0 and await button.is_visible():
-                                text = await button.inner_text()
-                                self.add_log("INFO", f"找到按钮: '{text}'")
-
-                                # 检查是否为"继续沟通"，如果是则跳过
-                                if '继续沟通' in text:
-                                    self.add_log("INFO", f"⏭️  {candidate_name}: 已打过招呼（按钮显示: {text}），跳过")
-                                    already_contacted = True
-                                    button_found = False
+                    with timer.phase("button_lookup"):
+                        for selector in button_selectors:
+                            try:
+                                button = recommend_frame.locator(selector).first
+                                if await button.count() > 0 and await button.is_visible():
+                                    text = await button.inner_text()
+                                    self.add_log("INFO", f"找到按钮: '{text}'")
+
+                                    # 检查是否为"继续沟通"，如果是则跳过
+                                    if '继续沟通' in text:
+                                        self.add_log("INFO", f"⏭️  {candidate_name}: 已打过招呼（按钮显示: {text}），跳过")
+                                        already_contacted = True
+                                        button_found = False
+                                        break
+
+                                    # 随机延迟：模拟人类决策时间（0.5-1.5秒）
+                                    await self._human_delay(0.5, 1.5)
+
+                                    await button.click()
+                                    self.add_log("INFO", f"✅ 已点击【{text}】按钮")
+                                    button_found = True
                                     break
-
-                                # 随机延迟：模拟人类决策时间（0.5-1.5秒）
-                                delay = random_delay(0.5, 1.5)
-                                await asyncio.sleep(delay)
-
-                                await button.click()
-                                self.add_log("INFO", f"✅ 已点击【{text}】按钮")
-                                button_found = True
-                                break
-                        except:
-                            continue
+                            except:
+                                continue
 
                     if not button_found and not already_contacted:
                         self.add_log("WARNING", "⚠️ 未找到打招呼按钮，可能已经打过招呼")
@@ -375,10 +628,16 @@ class GreetingTaskManager:
                     else:
                         # 正常情况，等待服务器响应（2-3秒）
                         delay = random_delay(2.0, 3.0)
-                    await asyncio.sleep(delay)
+                    with timer.phase("human_delay"):
+                        await asyncio.sleep(delay)
 
                     # 检测是否出现打招呼限制弹窗
-                    if button_found and await self._check_limit_dialog():
+                    if button_found:
+                        with timer.phase("limit_check"):
+                            limit_dialog = await self._check_limit_dialog()
+                    else:
+                        limit_dialog = False
+                    if limit_dialog:
                         self.add_log("WARNING", "⚠️ 检测到打招呼限制弹窗，任务停止")
                         self.limit_reached = True
                         self.status = "limit_reached"
@@ -392,43 +651,42 @@ class GreetingTaskManager:
                     ]
 
                     close_success = False
-                    for selector in close_selectors:
-                        try:
-                            close_btn = recommend_frame.locator(selector).first
-                            if await close_btn.count() > 0 and await close_btn.is_visible():
-                                # 随机延迟：模拟人类找关闭按钮的时间（0.3-0.8秒）
-                                delay = random_delay(0.3, 0.8)
-                                await asyncio.sleep(delay)
-
-                                await close_btn.click()
-                                self.add_log("INFO", "✅ 已点击关闭按钮")
-
-                                # 等待对话框完全消失
-                                try:
-                                    await recommend_frame.locator('.dialog-lib-resume').wait_for(
-                                        state='hidden',
-                                        timeout=2000
-                                    )
-                                    self.add_log("INFO", "✅ 简历面板已完全关闭")
-                                    close_success = True
-                                except:
-                                    # 超时，但认为关闭成功
-                                    self.add_log("INFO", "⏱️ 对话框关闭超时，继续执行")
-                                    close_success = True
+                    with timer.phase("panel_close"):
+                        for selector in close_selectors:
+                            try:
+                                close_btn = recommend_frame.locator(selector).first
+                                if await close_btn.count() > 0 and await close_btn.is_visible():
+                                    # 随机延迟：模拟人类找关闭按钮的时间（0.3-0.8秒）
+                                    await self._human_delay(0.3, 0.8)
+
+                                    await close_btn.click()
+                                    self.add_log("INFO", "✅ 已点击关闭按钮")
+
+                                    # 等待对话框完全消失
+                                    try:
+                                        await recommend_frame.locator('.dialog-lib-resume').wait_for(
+                                            state='hidden',
+                                            timeout=2000
+                                        )
+                                        self.add_log("INFO", "✅ 简历面板已完全关闭")
+                                        close_success = True
+                                    except:
+                                        # 超时，但认为关闭成功
+                                        self.add_log("INFO", "⏱️ 对话框关闭超时，继续执行")
+                                        close_success = True
 
-                                break
-                        except Exception as e:
-                            logger.warning(f"关闭对话框失败: {e}")
-                            continue
+                                    break
+                            except Exception as e:
+                                logger.warning(f"关闭对话框失败: {e}")
+                                continue
 
-                    if not close_success:
-                        self.add_log("WARNING", "⚠️ 未能关闭简历面板")
-                        # 强制等待，给对话框时间关闭
-                        await asyncio.sleep(2.0)
+                        if not close_success:
+                            self.add_log("WARNING", "⚠️ 未能关闭简历面板")
+                            # 强制等待，给对话框时间关闭
+                            await asyncio.sleep(2.0)
 
                     # 随机延迟：模拟人类返回列表后的思考时间（1-2秒）
-                    delay = random_delay(1.0, 2.0)
-                    await asyncio.sleep(delay)
+                    await self._human_delay(1.0, 2.0)
 
                     if button_found:
                         self.success_count += 1
@@ -440,8 +698,18 @@ class GreetingTaskManager:
                         self.failed_count += 1
                         self.add_log("WARNING", f"⚠️ 候选人 {self.current_index} 处理失败")
 
+                    # 已发出的招呼无法撤回，成功后立即落盘，避免恢复后重复打招呼
+                    if button_found:
+                        await self.save_snapshot(force=True)
+                        await outcomes.add(target, GreetingOutcome.GREETED)
+                    elif already_contacted:
+                        await outcomes.add(target, GreetingOutcome.ALREADY_CONTACTED)
+                    else:
+                        await outcomes.add(target, GreetingOutcome.FAILED, "未找到打招呼按钮")
+
                 except Exception as e:
                     self.failed_count += 1
+                    await outcomes.add(target, GreetingOutcome.FAILED, str(e))
                     self.add_log("ERROR", f"❌ 候选人 {self.current_index} 出错: {str(e)}")
                     logger.error(f"处理候选人 {self.current_index} 时出错", exc_info=True)
 
@@ -460,14 +728,20 @@ class GreetingTaskManager:
             self.add_log("INFO", f"❌ 失败: {self.failed_count} 个")
             if self.skipped_count > 0:
                 self.add_log("INFO", f"⏭️  跳过: {self.skipped_count} 个")
+            if cursor.seen_skipped_ids:
+                self.add_log("INFO", f"🔁 跳过之前处理过的候选人: {len(cursor.seen_skipped_ids)} 个")
             self.add_log("INFO", f"📊 共处理: {total_processed} 个候选人")
             self.add_log("INFO", f"⏱️  耗时: {elapsed:.1f}秒")
+            phases = timer.summary(histogram=False)["phases"]
+            if phases:
+                top = ", ".join(f"{name} {stats['total_ms'] / 1000:.1f}秒" for name, stats in list(phases.items())[:4])
+                self.add_log("INFO", f"⏱️  耗时分布: {top}")
 
             # 发送钉钉通知
             await self._send_notification(total_processed, elapsed)
 
             # 保存任务摘要到日志文件
-            self._save_task_summary(total_processed, elapsed)
+            await self._save_task_summary(total_processed, elapsed)
 
         except Exception as e:
             self.status = "error"
@@ -484,57 +758,22 @@ class GreetingTaskManager:
                 self.end_time = datetime.now()
                 logger.warning("⚠️ 任务在finally块中被清理，可能发生了未捕获的异常")
 
+            # 写入剩余的处理结果，并补全运行记录（无论任务如何结束）
+            await outcomes.flush()
+            await self._finish_run()
+
+            # 正常完成后无需恢复；停止、出错、触发限制或被重置时保留快照供下次恢复
+            if self.status == "completed":
+                self.clear_snapshot()
+            else:
+                await self.save_snapshot(force=True)
+
             # 不再自动重置，保留任务状态和日志供用户查看
             # 用户可以直接点击"开始打招呼"按钮开始新任务
             self.add_log("INFO", "💡 任务已结束，可直接点击「开始打招呼」按钮开始新任务")
 
             # 不要关闭浏览器，因为是复用的全局实例
 
-    async def _extract_expected_position(self, card) -> Optional[str]:
-        """
-        从候选人卡片提取期望职位
-        使用JavaScript提取文本节点，跳过HTML分隔符元素
-
-        Args:
-            card: Playwright locator对象，候选人卡片
-
-        Returns:
-            期望职位字符串，如果提取失败则返回None
-        """
-        try:
-            # 使用JavaScript提取文本节点（和get_candidates_info_final.py相同的方法）
-            result = await card.evaluate("""
-                (el) => {
-                    function extractJoinTextParts(element) {
-                        if (!element) return [];
-                        const parts = [];
-                        for (const child of element.childNodes) {
-                            if (child.nodeType === Node.TEXT_NODE) {
-                                const text = child.textContent.trim();
-                                if (text) {
-                                    parts.push(text);
-                                }
-                            }
-                        }
-                        return parts;
-                    }
-
-                    const expectRow = el.querySelector('.row-flex .content .join-text-wrap');
-                    if (!expectRow) return null;
-
-                    const parts = extractJoinTextParts(expectRow);
-                    // parts[0] 是城市，parts[1] 是职位
-                    return parts.length > 1 ? parts[1] : null;
-                }
-            """)
-
-            return result if result else None
-
-        except Exception as e:
-            logger.warning(f"提取期望职位失败: {str(e)}")
-
-        return None
-
     def _match_position(self, candidate_pos: str, expected_list: List[str]) -> bool:
         """
         包含匹配：候选人期望职位包含任一配置关键词即匹配
@@ -682,28 +921,62 @@ class GreetingTaskManager:
             logger.error(f"检测限制弹窗时出错: {e}")
             return False
 
-    def _save_task_summary(self, total_processed: int, elapsed_time: float):
-        """保存任务摘要到日志文件"""
+    def _task_summary(self, total_processed: int, elapsed_time: Optional[float]) -> Dict:
+        return {
+            "type": "SUMMARY",
+            "timestamp": datetime.now().isoformat(),
+            "status": self.status,
+            "target_count": self.target_count,
+            "success_count": self.success_count,
+            "failed_count": self.failed_count,
+            "skipped_count": self.skipped_count,
+            "total_processed": total_processed,
+            "elapsed_time": elapsed_time,
+            "limit_reached": self.limit_reached,
+            "error_message": self.error_message,
+            "expected_positions": self.expected_positions,
+            # 各阶段耗时（p50/p95/max）及重试、刷新等计数
+            **self.timer.summary(histogram=False),
+        }
+
+    async def _open_run(self):
+        """在运行目录中记录本次运行（失败时不影响任务）"""
+        try:
+            async with self._get_session_maker()() as session:
+                self.run_id = await start_run(
+                    session,
+                    target_count=self.target_count,
+                    expected_positions=self.expected_positions,
+                    job_key=self.job_key,
+                    log_file=self.log_file_path,
+                    run_id=self.run_id,
+                )
+        except Exception as e:
+            logger.error(f"记录打招呼运行失败: {e}")
+
+    async def _finish_run(self):
+        """用本次运行的摘要补全运行记录"""
+        if self.run_id is None:
+            return
+
+        elapsed = None
+        if self.start_time:
+            elapsed = ((self.end_time or datetime.now()) - self.start_time).total_seconds()
+        try:
+            async with self._get_session_maker()() as session:
+                await finish_run(session, self.run_id, self._task_summary(len(self.processed_ids), elapsed))
+        except Exception as e:
+            logger.error(f"更新打招呼运行记录失败: {e}")
+
+    async def _save_task_summary(self, total_processed: int, elapsed_time: float):
+        """保存任务摘要到日志文件（单行 JSON，文件整体仍是 JSONL；等待之前的日志和摘要写入磁盘）"""
         if not self.log_file_path:
             return
 
         try:
-            summary = {
-                "type": "SUMMARY",
-                "timestamp": datetime.now().isoformat(),
-                "status": self.status,
-                "target_count": self.target_count,
-                "success_count": self.success_count,
-                "failed_count": self.failed_count,
-                "skipped_count": self.skipped_count,
-                "total_processed": total_processed,
-                "elapsed_time": elapsed_time,
-                "limit_reached": self.limit_reached,
-                "expected_positions": self.expected_positions,
-            }
-            with open(self.log_file_path, "a", encoding="utf-8") as f:
-                f.write("\n" + "=" * 50 + "\n")
-                f.write(json.dumps(summary, ensure_ascii=False, indent=2) + "\n")
+            summary = self._task_summary(total_processed, elapsed_time)
+            log_file_sink.write(self.log_file_path, json.dumps(summary, ensure_ascii=False))
+            await log_file_sink.sync()
             logger.info(f"📝 任务摘要已保存到: {self.log_file_path}")
         except Exception as e:
             logger.error(f"保存任务摘要失败: {e}")
@@ -801,6 +1074,7 @@ class GreetingTaskManager:
         self.start_time = None
         self.end_time = None
         self.task = None
+        self._publish_status()
 
         # 保留统计和日志，以便查看历史
         logger.info("✅ 任务状态已重置")
@@ -0,0 +1,243 @@
+"""
+任务日志文件异步写入器
+调用方把日志行放入队列后立即返回，后台任务攒够 N 行或等待 T 毫秒后
+在线程中一次写入文件，不阻塞驱动浏览器的协程；
+只在写入任务摘要和关闭时 fsync，单个文件超过上限时按大小轮转
+"""
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.batch_queue import BATCH_STOP, run_batches
+
+logger = logging.getLogger(__name__)
+
+# 每批最多写入的行数
+LOG_FILE_BATCH_SIZE = 100
+
+# 批次中第一行最长等待时间（毫秒）
+LOG_FILE_FLUSH_INTERVAL_MS = 500
+
+# 队列容量，写满后丢弃新日志并计数（调用方不等待）
+LOG_FILE_QUEUE_MAX_SIZE = 10000
+
+# 单个日志文件大小上限，超过后轮转为 .1、.2 ...
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+
+# 保留的轮转文件数
+LOG_FILE_BACKUP_COUNT = 5
+
+# 请求 fsync 的标记
+_SYNC = object()
+
+
+def rotated_path(path: Path, index: int) -> Path:
+    """第 index 个轮转文件（.1 为最近轮转出的文件）"""
+    return path.with_name(f"{path.name}.{index}")
+
+
+def log_segments(path: Path) -> List[Path]:
+    """日志文件及其轮转文件，按写入顺序排列（最旧的轮转文件在前，当前文件在最后），只包含存在的文件"""
+    segments = [path] if path.exists() else []
+    index = 1
+    while rotated_path(path, index).exists():
+        segments.insert(0, rotated_path(path, index))
+        index += 1
+    return segments
+
+
+class LogFileSink:
+    """日志文件缓冲写入器"""
+
+    def __init__(
+        self,
+        batch_size: int = LOG_FILE_BATCH_SIZE,
+        flush_interval_ms: int = LOG_FILE_FLUSH_INTERVAL_MS,
+        max_queue_size: int = LOG_FILE_QUEUE_MAX_SIZE,
+        max_bytes: int = LOG_FILE_MAX_BYTES,
+        backup_count: int = LOG_FILE_BACKUP_COUNT,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # 当前打开的文件（只在写入线程中访问）
+        self._file = None
+        self._file_path: Optional[Path] = None
+        self._file_size = 0
+
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.written_lines = 0
+        self.flushes = 0
+        self.syncs = 0
+        self.rotations = 0
+        self.dropped_lines = 0
+        self.failed_lines = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """启动后台写入任务（在应用 lifespan 中调用）"""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._reset_metrics()
+        self._task = asyncio.create_task(self._run())
+        logger.info("📝 任务日志文件写入器已启动")
+
+    async def stop(self):
+        """写完队列中剩余的日志，fsync 后关闭文件"""
+        if not self.running:
+            return
+
+        await self._queue.put(BATCH_STOP)
+        await self._task
+        self._task = None
+        logger.info(f"📝 任务日志文件写入器已停止，共写入 {self.written_lines} 行")
+
+    def write(self, path: Path, line: str):
+        """写入一行日志（line 不含换行符），不等待磁盘 I/O
+
+        写入器未启动时（如脚本、测试中）直接同步追加到文件
+        """
+        if not self.running:
+            self._append_now(path, line)
+            return
+
+        try:
+            self._queue.put_nowait((path, line))
+        except asyncio.QueueFull:
+            self.dropped_lines += 1
+
+    async def sync(self):
+        """等待已提交的日志全部写入并 fsync（写入任务摘要后调用）"""
+        if not self.running:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        await self._queue.put((_SYNC, waiter))
+        await waiter
+
+    def _append_now(self, path: Path, line: str):
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.written_lines += 1
+        except Exception as e:
+            self.failed_lines += 1
+            logger.error(f"写入日志文件失败: {e}")
+
+    async def _run(self):
+        # 有调用方在等待 fsync 时立即写出当前批次
+        await run_batches(
+            self._queue, self.batch_size, self.flush_interval, self._flush,
+            is_barrier=lambda item: item[0] is _SYNC,
+        )
+        await asyncio.to_thread(self._close, True)
+
+    async def _flush(self, batch: List[Tuple[Path, str]], syncs: List[Tuple]):
+        await asyncio.to_thread(self._write_batch, batch, bool(syncs))
+        for _, waiter in syncs:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _write_batch(self, batch: List[Tuple[Path, str]], fsync: bool):
+        """在线程中按文件分组写入一批日志"""
+        groups: Dict[Path, List[str]] = {}
+        for path, line in batch:
+            groups.setdefault(path, []).append(line)
+
+        for path, lines in groups.items():
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            try:
+                self._open(path)
+                if self._file_size and self._file_size + len(data) > self.max_bytes:
+                    self._rotate()
+                self._file.write(data)
+                self._file.flush()
+                self._file_size += len(data)
+                self.written_lines += len(lines)
+            except Exception as e:
+                self.failed_lines += len(lines)
+                logger.error(f"写入日志文件 {path} 失败: {e}")
+
+        if batch:
+            self.flushes += 1
+        if fsync:
+            self._fsync()
+
+    def _open(self, path: Path):
+        if self._file is not None and self._file_path == path:
+            return
+        self._close()
+        self._file = open(path, "ab")
+        self._file_path = path
+        self._file_size = self._file.tell()
+
+    def _rotate(self):
+        """按大小轮转：path -> path.1 -> path.2 ...，超出保留数的最旧文件被删除"""
+        path = self._file_path
+        self._close()
+
+        for i in range(self.backup_count - 1, 0, -1):
+            src = rotated_path(path, i)
+            if src.exists():
+                os.replace(src, rotated_path(path, i + 1))
+        if self.backup_count > 0:
+            os.replace(path, rotated_path(path, 1))
+        else:
+            path.unlink()
+
+        self.rotations += 1
+        self._open(path)
+
+    def _fsync(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.syncs += 1
+        except Exception as e:
+            logger.error(f"同步日志文件失败: {e}")
+
+    def _close(self, fsync: bool = False):
+        if self._file is None:
+            return
+        if fsync:
+            self._fsync()
+        try:
+            self._file.close()
+        finally:
+            self._file = None
+            self._file_path = None
+            self._file_size = 0
+
+    def get_metrics(self) -> Dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+            "written_lines": self.written_lines,
+            "flushes": self.flushes,
+            "syncs": self.syncs,
+            "rotations": self.rotations,
+            "dropped_lines": self.dropped_lines,
+            "failed_lines": self.failed_lines,
+        }
+
+
+# 全局单例
+log_file_sink = LogFileSink()
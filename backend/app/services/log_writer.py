@@ -0,0 +1,127 @@
+"""
+运行日志异步写入器
+调用方把日志放入有界队列后立即返回，后台任务攒够 N 条或等待 T 毫秒后
+用一次 executemany 批量写入并提交（组提交），避免每条日志一次事务提交
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.log_entry import LogEntry
+from app.utils.batch_queue import BATCH_STOP, run_batches
+
+logger = logging.getLogger(__name__)
+
+# 每批最多写入的条数
+LOG_FLUSH_BATCH_SIZE = 200
+
+# 批次中第一条日志最长等待时间（毫秒）
+LOG_FLUSH_INTERVAL_MS = 200
+
+# 队列容量，写满后调用方等待（背压）而不是丢弃日志
+LOG_QUEUE_MAX_SIZE = 10000
+
+
+class LogWriter:
+    """运行日志组提交写入器"""
+
+    def __init__(
+        self,
+        batch_size: int = LOG_FLUSH_BATCH_SIZE,
+        flush_interval_ms: int = LOG_FLUSH_INTERVAL_MS,
+        max_queue_size: int = LOG_QUEUE_MAX_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._engine: Optional[AsyncEngine] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.flushed_batches = 0
+        self.flushed_entries = 0
+        self.failed_entries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, engine: Optional[AsyncEngine] = None):
+        """启动后台写入任务（在应用 lifespan 中调用）"""
+        if self.running:
+            return
+
+        if engine is None:
+            from app.database import engine as default_engine
+            engine = default_engine
+
+        self._engine = engine
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._reset_metrics()
+        self._task = asyncio.create_task(self._run())
+        logger.info("📝 日志写入器已启动")
+
+    async def stop(self):
+        """写完队列中剩余的日志后停止"""
+        if not self.running:
+            return
+
+        await self._queue.put(BATCH_STOP)
+        await self._task
+        self._task = None
+        logger.info(f"📝 日志写入器已停止，共写入 {self.flushed_entries} 条日志")
+
+    async def submit(self, entry: Dict):
+        """将一条日志放入队列（entry 为 log_entries 表的列字典）"""
+        await self._queue.put(entry)
+
+    async def _run(self):
+        await run_batches(self._queue, self.batch_size, self.flush_interval, self._flush)
+
+    async def _flush(self, batch: List[Dict], _barriers: List = ()):
+        start = time.perf_counter()
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(insert(LogEntry.__table__), batch)
+        except Exception as e:
+            self.failed_entries += len(batch)
+            logger.error(f"❌ 批量写入 {len(batch)} 条日志失败: {e}")
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.flushed_batches += 1
+        self.flushed_entries += len(batch)
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.total_flush_ms += elapsed
+
+    def get_metrics(self) -> Dict:
+        """队列深度与写入耗时"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "flushed_batches": self.flushed_batches,
+            "flushed_entries": self.flushed_entries,
+            "failed_entries": self.failed_entries,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushed_batches, 2) if self.flushed_batches else 0.0,
+        }
+
+
+# 全局单例
+log_writer = LogWriter()
@@ -1,11 +1,13 @@
 """
 日志服务 - 记录系统运行日志到数据库
 """
+from sqlalchemy import delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from typing import Optional, List
+from typing import Optional, List, Tuple
+import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.models.log_entry import (
     LogEntry,
@@ -13,6 +15,14 @@ from app.models.log_entry import (
     LogLevel,
     LogAction,
 )
+from app.services.log_writer import log_writer
+from app.utils.pagination import apply_keyset, split_page
+
+# 精确计数的上限：超过后返回上限值并标记为非精确，避免在大表上全量计数
+LOG_COUNT_CAP = 10000
+
+# 清理旧日志时每批删除的行数（每批单独提交，批次之间让出事件循环）
+LOG_DELETE_BATCH_SIZE = 5000
 
 
 class LoggingService:
@@ -36,9 +46,12 @@ class LoggingService:
         task_name: Optional[str] = None,
         user_id: Optional[str] = None,
         user_name: Optional[str] = None,
-    ) -> LogEntry:
+    ) -> None:
         """记录日志
 
+        日志写入器运行时放入队列由后台批量写入，不占用当前会话；
+        未启动时（脚本、测试等）直接写入数据库
+
         Args:
             action: 操作类型
             message: 日志消息
@@ -48,24 +61,58 @@ class LoggingService:
             task_name: 任务名称
             user_id: 用户ID
             user_name: 用户名
-
-        Returns:
-            创建的日志条目
         """
+        entry = self._build_entry(action, message, level, details, task_id, task_name, user_id, user_name)
+
+        if log_writer.running:
+            await log_writer.submit(entry)
+        else:
+            await self._insert(entry)
+
+    async def write(
+        self,
+        action: LogAction,
+        message: str,
+        level: LogLevel = LogLevel.INFO,
+        details: Optional[dict] = None,
+        task_id: Optional[int] = None,
+        task_name: Optional[str] = None,
+        user_id: Optional[str] = None,
+        user_name: Optional[str] = None,
+    ) -> LogEntry:
+        """立即写入日志并返回创建的日志条目（参数同 log）"""
+        entry = self._build_entry(action, message, level, details, task_id, task_name, user_id, user_name)
+        return await self._insert(entry)
+
+    @staticmethod
+    def _build_entry(
+        action: LogAction,
+        message: str,
+        level: LogLevel,
+        details: Optional[dict],
+        task_id: Optional[int],
+        task_name: Optional[str],
+        user_id: Optional[str],
+        user_name: Optional[str],
+    ) -> dict:
         # 将details字典转换为JSON字符串
         details_json = json.dumps(details, ensure_ascii=False) if details else None
 
-        # 创建日志条目
-        log_entry = LogEntry(
-            level=level,
-            action=action,
-            message=message,
-            details=details_json,
-            task_id=task_id,
-            task_name=task_name,
-            user_id=user_id,
-            user_name=user_name,
-        )
+        # 创建时间在入队时确定，批量写入不影响日志顺序
+        return {
+            "level": level,
+            "action": action,
+            "message": message,
+            "details": details_json,
+            "task_id": task_id,
+            "task_name": task_name,
+            "user_id": user_id,
+            "user_name": user_name,
+            "created_at": datetime.now(),
+        }
+
+    async def _insert(self, entry: dict) -> LogEntry:
+        log_entry = LogEntry(**entry)
 
         # 保存到数据库
         self.session.add(log_entry)
@@ -81,21 +128,26 @@ class LoggingService:
         level: Optional[LogLevel] = None,
         action: Optional[LogAction] = None,
         task_id: Optional[int] = None,
-    ) -> tuple[List[LogEntry], int]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[LogEntry], int, bool, Optional[str]]:
         """获取日志列表
 
         Args:
             limit: 每页数量
-            offset: 偏移量
+            offset: 偏移量（兼容旧版，传入 cursor 时忽略）
             level: 筛选日志级别
             action: 筛选操作类型
             task_id: 筛选任务ID
+            cursor: 分页游标（上一页返回的 next_cursor）
 
         Returns:
-            (日志列表, 总数)
+            (日志列表, 总数, 总数是否精确, 下一页游标)
+
+        Raises:
+            ValueError: 游标格式无效
         """
         # 构建查询
-        query = select(LogEntry).order_by(LogEntry.created_at.desc())
+        query = select(LogEntry)
 
         # 添加筛选条件
         if level:
@@ -106,48 +158,91 @@ class LoggingService:
             query = query.where(LogEntry.task_id == task_id)
 
         # 获取总数
-        count_query = select(LogEntry)
+        total, total_exact = await self.count_logs(level=level, action=action, task_id=task_id)
+
+        # 添加分页：有游标时使用游标分页，否则回退到偏移分页
+        query = apply_keyset(query, LogEntry, cursor, limit)
+        if not cursor and offset:
+            query = query.offset(offset)
+
+        # 执行查询
+        result = await self.session.execute(query)
+        logs, next_cursor = split_page(result.scalars().all(), limit)
+
+        return logs, total, total_exact, next_cursor
+
+    async def count_logs(
+        self,
+        level: Optional[LogLevel] = None,
+        action: Optional[LogAction] = None,
+        task_id: Optional[int] = None,
+        cap: int = LOG_COUNT_CAP,
+    ) -> Tuple[int, bool]:
+        """统计日志数量
+
+        无筛选条件时先用主键范围估算（日志只从最旧的一端清理，id 基本连续），
+        估算值不超过上限时再精确计数；有筛选条件时最多计数到上限。
+
+        Returns:
+            (数量, 是否精确)
+        """
+        conditions = []
         if level:
-            count_query = count_query.where(LogEntry.level == level)
+            conditions.append(LogEntry.level == level)
         if action:
-            count_query = count_query.where(LogEntry.action == action)
+            conditions.append(LogEntry.action == action)
         if task_id:
-            count_query = count_query.where(LogEntry.task_id == task_id)
-
-        result = await self.session.execute(count_query)
-        total = len(result.all())
+            conditions.append(LogEntry.task_id == task_id)
 
-        # 添加分页
-        query = query.limit(limit).offset(offset)
+        if not conditions:
+            result = await self.session.execute(
+                select(func.max(LogEntry.id) - func.min(LogEntry.id) + 1)
+            )
+            estimate = result.scalar() or 0
+            if estimate > cap:
+                return estimate, False
 
-        # 执行查询
-        result = await self.session.execute(query)
-        logs = result.scalars().all()
+        limited = select(LogEntry.id).where(*conditions).limit(cap + 1).subquery()
+        result = await self.session.execute(select(func.count()).select_from(limited))
+        count = result.scalar()
 
-        return list(logs), total
+        if count > cap:
+            return cap, False
+        return count, True
 
-    async def clear_old_logs(self, days: int = 30) -> int:
+    async def clear_old_logs(self, days: int = 30, batch_size: int = LOG_DELETE_BATCH_SIZE) -> int:
         """清理旧日志
 
+        按 created_at 索引分批删除，每批单独提交，避免长时间持有写锁
+
         Args:
             days: 保留多少天的日志（默认30天）
+            batch_size: 每批删除的行数
 
         Returns:
             删除的日志数量
         """
-        from datetime import timedelta
-
         cutoff_date = datetime.now() - timedelta(days=days)
 
-        # 查询要删除的日志
-        query = select(LogEntry).where(LogEntry.created_at < cutoff_date)
-        result = await self.session.execute(query)
-        logs_to_delete = result.scalars().all()
-
-        # 删除日志
-        for log in logs_to_delete:
-            await self.session.delete(log)
-
-        await self.session.commit()
-
-        return len(logs_to_delete)
+        deleted = 0
+        while True:
+            expired = (
+                select(LogEntry.id)
+                .where(LogEntry.created_at < cutoff_date)
+                .limit(batch_size)
+            )
+            result = await self.session.execute(
+                delete(LogEntry)
+                .where(LogEntry.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.commit()
+
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+            # 让出事件循环，其他请求可以在批次之间执行
+            await asyncio.sleep(0)
+
+        return deleted
@@ -0,0 +1,34 @@
+"""
+统计汇总服务
+读取由数据库触发器增量维护的 stats_rollup 表（见 app/migrations.py），
+查询只涉及主键范围内的少量行，耗时与业务表大小无关
+"""
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ALL_BUCKET = "all"
+
+
+async def get_rollup_counters(session: AsyncSession, day: Optional[date] = None) -> Dict[str, Dict[str, int]]:
+    """获取累计计数和指定日期的计数
+
+    Args:
+        session: 数据库会话
+        day: 按天统计的日期，默认今天
+
+    Returns:
+        {"all": {指标: 值}, "day": {指标: 值}}
+    """
+    day = day or date.today()
+    result = await session.execute(
+        text("SELECT bucket, metric, value FROM stats_rollup WHERE bucket IN (:all, :day)"),
+        {"all": ALL_BUCKET, "day": day.isoformat()},
+    )
+
+    counters: Dict[str, Dict[str, int]] = {"all": {}, "day": {}}
+    for bucket, metric, value in result.all():
+        counters["all" if bucket == ALL_BUCKET else "day"][metric] = value
+    return counters
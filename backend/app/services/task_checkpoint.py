@@ -0,0 +1,98 @@
+"""
+自动化任务断点
+保存搜索结果快照和处理位置，任务暂停或服务重启后从断点继续，不重新搜索
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.automation_task import AutomationTask, AutomationTaskCheckpoint, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# 断点保留天数：搜索结果过旧时不再续跑
+CHECKPOINT_TTL_DAYS = 7
+
+# 可以从断点继续的任务状态
+RESUMABLE_STATUSES = (TaskStatus.PAUSED, TaskStatus.RUNNING)
+
+
+async def load_checkpoint(session: AsyncSession, task_id: int) -> Optional[AutomationTaskCheckpoint]:
+    """读取任务断点"""
+    result = await session.execute(
+        select(AutomationTaskCheckpoint).where(AutomationTaskCheckpoint.task_id == task_id)
+    )
+    return result.scalar_one_or_none()
+
+
+def create_checkpoint(session: AsyncSession, task_id: int, candidates: List[Dict]) -> AutomationTaskCheckpoint:
+    """为新的搜索结果创建断点（随会话的下一次提交写入）"""
+    checkpoint = AutomationTaskCheckpoint(
+        task_id=task_id,
+        candidates=json.dumps(candidates, ensure_ascii=False, default=str),
+        next_index=0,
+    )
+    session.add(checkpoint)
+    return checkpoint
+
+
+def snapshot_candidates(checkpoint: AutomationTaskCheckpoint) -> List[Dict]:
+    """断点中的搜索结果"""
+    return json.loads(checkpoint.candidates)
+
+
+def advance_checkpoint(session: AsyncSession, checkpoint: AutomationTaskCheckpoint, next_index: int):
+    """记录处理位置（随会话的下一次提交写入，发送问候后与问候记录一起立即提交）"""
+    checkpoint.next_index = next_index
+    checkpoint.updated_at = datetime.now()
+    session.add(checkpoint)
+
+
+async def delete_checkpoint(session: AsyncSession, task_id: int):
+    """删除任务断点（随会话的下一次提交生效）"""
+    await session.execute(
+        delete(AutomationTaskCheckpoint).where(AutomationTaskCheckpoint.task_id == task_id)
+    )
+
+
+async def gc_checkpoints(session: AsyncSession, ttl_days: int = CHECKPOINT_TTL_DAYS) -> int:
+    """清理过期断点：任务已删除、已结束，或断点超过保留天数
+
+    Returns:
+        清理的断点数量
+    """
+    resumable_tasks = select(AutomationTask.id).where(AutomationTask.status.in_(RESUMABLE_STATUSES))
+    result = await session.execute(
+        delete(AutomationTaskCheckpoint).where(or_(
+            AutomationTaskCheckpoint.task_id.not_in(resumable_tasks),
+            AutomationTaskCheckpoint.updated_at < datetime.now() - timedelta(days=ttl_days),
+        ))
+    )
+    await session.commit()
+
+    if result.rowcount:
+        logger.info(f"🧹 已清理 {result.rowcount} 个过期任务断点")
+    return result.rowcount
+
+
+async def recover_interrupted_tasks(session: AsyncSession) -> int:
+    """服务启动时将上次未正常结束的运行中任务标记为暂停，便于从断点继续
+
+    Returns:
+        恢复的任务数量
+    """
+    result = await session.execute(
+        update(AutomationTask)
+        .where(AutomationTask.status == TaskStatus.RUNNING)
+        .values(status=TaskStatus.PAUSED, error_message="服务重启导致任务中断，可重新启动从断点继续")
+    )
+    await session.commit()
+
+    if result.rowcount:
+        logger.warning(f"⚠️ {result.rowcount} 个任务在上次运行时中断，已标记为暂停")
+    return result.rowcount
@@ -0,0 +1,120 @@
+"""
+自动化任务控制
+- 运行中任务的暂停 / 取消信号：路由直接通知后台任务，后台任务无需每轮查询数据库
+- 进度批量写入：每发送 N 条问候或间隔 T 秒用一条 UPDATE 写入任务进度
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.automation_task import AutomationTask, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# 每发送多少条问候写入一次进度
+PROGRESS_FLUSH_EVERY = 10
+
+# 距上次写入超过多少秒时写入进度
+PROGRESS_FLUSH_INTERVAL = 5.0
+
+
+class TaskControl:
+    """单个运行中任务的控制信号"""
+
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        self.stop_event = asyncio.Event()
+        # 路由请求的目标状态（PAUSED / CANCELLED）
+        self.requested_status: Optional[TaskStatus] = None
+
+    @property
+    def stop_requested(self) -> bool:
+        return self.stop_event.is_set()
+
+    def request_stop(self, status: TaskStatus):
+        """请求任务在处理完当前候选人后停止"""
+        self.requested_status = status
+        self.stop_event.set()
+
+
+class TaskControlRegistry:
+    """按任务 ID 管理控制信号"""
+
+    def __init__(self):
+        self._controls: Dict[int, TaskControl] = {}
+
+    def register(self, task_id: int) -> TaskControl:
+        control = TaskControl(task_id)
+        self._controls[task_id] = control
+        return control
+
+    def unregister(self, task_id: int):
+        self._controls.pop(task_id, None)
+
+    def get(self, task_id: int) -> Optional[TaskControl]:
+        return self._controls.get(task_id)
+
+    def signal(self, task_id: int, status: TaskStatus) -> bool:
+        """通知运行中的任务停止
+
+        Returns:
+            任务是否正在本进程中运行
+        """
+        control = self._controls.get(task_id)
+        if control is None:
+            return False
+        control.request_stop(status)
+        logger.info(f"⏸️ 已通知任务 {task_id} 停止: {status.value}")
+        return True
+
+
+# 全局单例
+task_controls = TaskControlRegistry()
+
+
+class ProgressFlusher:
+    """按条数或时间间隔批量写入任务进度
+
+    进度只累积在本对象中，不修改会话中的任务对象，
+    因此逐条提交问候记录时不会把进度一起写入；达到阈值时用一条 UPDATE 写入并提交
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        task_id: int,
+        every: int = PROGRESS_FLUSH_EVERY,
+        interval: float = PROGRESS_FLUSH_INTERVAL,
+    ):
+        self.session = session
+        self.task_id = task_id
+        self.every = every
+        self.interval = interval
+        # 最新的进度字段（progress、total_contacted 等）
+        self.values: Dict = {}
+        self.pending = 0
+        self._last_flush = time.monotonic()
+
+    async def step(self, **values):
+        """记录一次进度变化，达到阈值时写入"""
+        self.values.update(values)
+        self.pending += 1
+        if self.pending >= self.every or time.monotonic() - self._last_flush >= self.interval:
+            await self.flush()
+
+    async def flush(self):
+        """写入尚未保存的进度"""
+        if self.pending:
+            await self.session.execute(
+                update(AutomationTask)
+                .where(AutomationTask.id == self.task_id)
+                .values(**self.values)
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.commit()
+        self.pending = 0
+        self._last_flush = time.monotonic()
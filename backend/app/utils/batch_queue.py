@@ -0,0 +1,64 @@
+"""
+队列批量消费
+后台写入器从 asyncio 队列中按批取出条目：攒够 N 条或批次中第一条到达后等待 T 秒即写出一批，
+取到停止哨兵时写完已取出的条目后退出
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+# 通知后台任务退出的哨兵
+BATCH_STOP = object()
+
+
+async def run_batches(
+    queue: asyncio.Queue,
+    batch_size: int,
+    flush_interval: float,
+    flush: Callable[[List[Any], List[Any]], Awaitable[None]],
+    is_barrier: Optional[Callable[[Any], bool]] = None,
+) -> None:
+    """循环从队列中取出批次并调用 flush，直到取到 BATCH_STOP
+
+    Args:
+        queue: 条目队列
+        batch_size: 每批最多的条目数
+        flush_interval: 批次中第一条到达后最长等待时间（秒）
+        flush: 写出一批条目，参数为 (条目列表, 屏障列表)
+        is_barrier: 判断条目是否为屏障（如 fsync 请求）；屏障立即结束当前批次，不计入条目列表
+    """
+    loop = asyncio.get_running_loop()
+
+    while True:
+        item = await queue.get()
+        if item is BATCH_STOP:
+            return
+
+        batch: List[Any] = []
+        barriers: List[Any] = []
+        stopping = False
+        deadline = loop.time() + flush_interval
+        while True:
+            if item is BATCH_STOP:
+                stopping = True
+                break
+            if is_barrier is not None and is_barrier(item):
+                barriers.append(item)
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                break
+
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+        await flush(batch, barriers)
+        if stopping:
+            return
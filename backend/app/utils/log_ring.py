@@ -0,0 +1,82 @@
+"""
+带序号的任务日志环形缓冲
+每条日志保存为带 __slots__ 的小对象（序号、时间戳、级别、消息），读取时才格式化为字典和 ISO 时间；
+序号单调递增（清空后也不重置），按序号增量读取只访问新增的条目，不复制整个缓冲
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class LogRecord:
+    """一条日志"""
+
+    __slots__ = ("seq", "ts", "level", "message")
+
+    def __init__(self, seq: int, ts: float, level: str, message: str):
+        self.seq = seq
+        self.ts = ts
+        self.level = level
+        self.message = message
+
+    def to_dict(self) -> Dict:
+        return {
+            "seq": self.seq,
+            "timestamp": datetime.fromtimestamp(self.ts).isoformat(),
+            "level": self.level,
+            "message": self.message,
+        }
+
+
+class LogRing:
+    """固定容量的日志环形缓冲，写满后覆盖最旧的日志"""
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._slots: List[Optional[LogRecord]] = [None] * capacity
+        # 最后一条日志的序号（第一条为 1）
+        self.last_seq = 0
+        # 缓冲中最早一条日志的序号
+        self.first_seq = 1
+
+    def __len__(self) -> int:
+        return self.last_seq - self.first_seq + 1
+
+    def append(self, level: str, message: str, ts: Optional[float] = None) -> LogRecord:
+        self.last_seq += 1
+        record = LogRecord(self.last_seq, ts if ts is not None else time.time(), level, message)
+        self._slots[(self.last_seq - 1) % self.capacity] = record
+        if len(self) > self.capacity:
+            self.first_seq += 1
+        return record
+
+    def _range(self, start_seq: int, end_seq: int) -> List[LogRecord]:
+        """序号在 [start_seq, end_seq] 内的日志（调用方保证都在缓冲中）"""
+        return [self._slots[(seq - 1) % self.capacity] for seq in range(start_seq, end_seq + 1)]
+
+    def tail(self, n: int) -> List[LogRecord]:
+        """最近的 n 条日志"""
+        if n <= 0:
+            return []
+        return self._range(max(self.first_seq, self.last_seq - n + 1), self.last_seq)
+
+    def since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[LogRecord], bool]:
+        """序号大于 seq 的日志（按序号从小到大，最多 limit 条）
+
+        Returns:
+            (日志列表, 是否有日志已被覆盖或清空而无法返回)
+        """
+        truncated = seq + 1 < self.first_seq
+        if seq > self.last_seq:
+            # 序号不属于当前进程（服务重启过），从缓冲开头返回
+            seq, truncated = 0, True
+        start = max(seq + 1, self.first_seq)
+        end = self.last_seq
+        if limit is not None:
+            end = min(end, start + limit - 1)
+        return self._range(start, end), truncated
+
+    def clear(self):
+        """清空日志（序号继续递增，按序号读取的客户端不会漏读）"""
+        self._slots = [None] * self.capacity
+        self.first_seq = self.last_seq + 1
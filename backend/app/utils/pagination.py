@@ -0,0 +1,66 @@
+"""
+游标（Keyset）分页工具
+使用 (created_at, id) 作为排序键，翻页代价与页码深度无关，且插入新数据时结果不会错位
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """将排序键编码为不透明的游标字符串"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标字符串
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def apply_keyset(query, model: Any, cursor: Optional[str], limit: int):
+    """为按 (created_at DESC, id DESC) 排序的查询添加游标条件和分页
+
+    会多取一行用于判断是否还有下一页，配合 split_page 使用。
+
+    Args:
+        query: select 查询
+        model: 包含 created_at 和 id 列的模型
+        cursor: 上一页返回的游标，None 表示第一页
+        limit: 每页数量
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    """截取一页数据并生成下一页游标
+
+    Returns:
+        (当前页数据, 下一页游标；没有更多数据时为 None)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,134 @@
+"""
+分阶段耗时统计
+记录一次只做两次 perf_counter 和几次整数运算：按固定的对数分桶累加直方图，
+并保留最近的样本用于计算 p50 / p95，读取统计时才排序
+
+阶段可以嵌套，外层阶段只记录自身耗时（扣除内层阶段），各阶段耗时相加不会重复计算；
+嵌套关系按调用栈记录，一个计时器只在一个协程中使用
+"""
+import bisect
+import time
+from collections import deque
+from typing import Dict, List
+
+# 直方图分桶上界（毫秒），最后一个桶为 +inf
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# 每个阶段保留用于计算分位数的最近样本数
+PERCENTILE_SAMPLES = 1024
+
+
+def _bucket_label(i: int) -> str:
+    if i < len(HISTOGRAM_BOUNDS_MS):
+        return f"<={HISTOGRAM_BOUNDS_MS[i]}ms"
+    return f">{HISTOGRAM_BOUNDS_MS[-1]}ms"
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class PhaseStats:
+    """单个阶段的耗时统计"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "buckets", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=PERCENTILE_SAMPLES)
+
+    def add(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+        self.samples.append(elapsed_ms)
+
+    def summary(self, histogram: bool = True) -> Dict:
+        ordered = sorted(self.samples)
+        result = {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(_percentile(ordered, 0.5), 1),
+            "p95_ms": round(_percentile(ordered, 0.95), 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+        if histogram:
+            result["histogram"] = {
+                _bucket_label(i): n for i, n in enumerate(self.buckets) if n
+            }
+        return result
+
+
+class _PhaseContext:
+    __slots__ = ("timer", "stats", "start", "child_ms")
+
+    def __init__(self, timer: "PhaseTimer", stats: PhaseStats):
+        self.timer = timer
+        self.stats = stats
+        self.child_ms = 0.0
+
+    def __enter__(self):
+        self.timer._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        stack = self.timer._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_ms += elapsed
+        self.stats.add(elapsed - self.child_ms)
+        return False
+
+
+class PhaseTimer:
+    """按阶段名称累计耗时，并记录重试、刷新等计数
+
+    用法:
+        with timer.phase("resume_wait"):
+            await frame.wait_for_selector(...)
+        timer.incr("retries")
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        # 正在计时的阶段（嵌套时内层在后）
+        self._stack: List[_PhaseContext] = []
+
+    def _stats(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return stats
+
+    def phase(self, name: str) -> _PhaseContext:
+        """计时上下文（异常退出时同样记录耗时）"""
+        return _PhaseContext(self, self._stats(name))
+
+    def record(self, name: str, elapsed_ms: float):
+        """直接记录一次耗时（如已知时长的等待）"""
+        if self._stack:
+            self._stack[-1].child_ms += elapsed_ms
+        self._stats(name).add(elapsed_ms)
+
+    def incr(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self, histogram: bool = True) -> Dict:
+        """各阶段统计（按累计耗时从高到低）和计数"""
+        phases = sorted(self.phases.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "phases": {name: stats.summary(histogram) for name, stats in phases},
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,128 @@
+"""
+候选人搜索基准测试
+对比旧版三列 LIKE '%x%' 与 FTS5 trigram 全文索引在大数据量下的查询延迟
+
+用法:
+    uv run python scripts/bench_candidate_search.py [--rows 100000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+
+import app.models  # noqa: F401
+from app.database import build_engine
+from app.migrations import run_migrations
+from app.models.candidate import Candidate
+from app.services.candidate_search import apply_candidate_search
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN = "伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英"
+POSITIONS = ["Python开发工程师", "Java开发工程师", "前端开发工程师", "产品经理", "数据分析师",
+             "算法工程师", "测试工程师", "运维工程师", "UI设计师", "销售经理", "人力资源专员", "财务会计"]
+COMPANIES = ["字节跳动", "阿里巴巴", "腾讯", "美团", "京东", "百度", "网易", "小米", "快手", "拼多多", None]
+NOTES = [None, "沟通积极", "有大厂经验", "期望远程办公", "擅长数据分析与可视化", "三年以上项目管理经验"]
+# 前几个为高频词（大量命中，LIKE 借助 created_at 索引可提前结束），后几个为低频词或无命中（LIKE 需全表扫描）
+QUERIES = ["Python开发", "字节跳动", "数据分析", "项目管理经验", "geek_99999", "王伟芳", "不存在的关键词"]
+
+
+def _seed(db_path: Path, rows: int):
+    """使用原生 sqlite3 批量写入，触发器同步维护全文索引"""
+    rnd = random.Random(42)
+    now = datetime.now().isoformat(sep=" ")
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO candidates (boss_id, name, position, company, expected_position, notes, tags, "
+        "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'NEW', ?, ?)",
+        (
+            (
+                f"geek_{i}",
+                rnd.choice(SURNAMES) + "".join(rnd.choice(GIVEN) for _ in range(rnd.randint(1, 2))),
+                rnd.choice(POSITIONS),
+                rnd.choice(COMPANIES),
+                rnd.choice(POSITIONS),
+                rnd.choice(NOTES),
+                None,
+                now,
+                now,
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _legacy_query(search: str):
+    """旧版实现：三列 LIKE"""
+    pattern = f"%{search}%"
+    return select(Candidate).where(
+        (Candidate.name.like(pattern)) |
+        (Candidate.position.like(pattern)) |
+        (Candidate.company.like(pattern))
+    ).order_by(Candidate.created_at.desc()).limit(50)
+
+
+async def _time(session_maker, build, repeat: int) -> float:
+    """返回中位数耗时（毫秒）"""
+    samples = []
+    async with session_maker() as session:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query = await build(session)
+            result = await session.execute(query)
+            result.scalars().all()
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="候选人搜索基准测试")
+    parser.add_argument("--rows", type=int, default=100_000, help="候选人数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询重复次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = build_engine(f"sqlite+aiosqlite:///{db_path}", profile="production", echo=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(run_migrations)
+
+        start = time.perf_counter()
+        _seed(db_path, args.rows)
+        print(f"📥 写入 {args.rows} 个候选人（含全文索引维护）: {time.perf_counter() - start:.1f}s")
+
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        print("=" * 70)
+        print(f"{'关键词':<16}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'加速':>10}")
+        print("-" * 70)
+        for keyword in QUERIES:
+            async def legacy(session, kw=keyword):
+                return _legacy_query(kw)
+
+            async def fts(session, kw=keyword):
+                query, _ = await apply_candidate_search(session, select(Candidate), kw)
+                return query.limit(50)
+
+            like_ms = await _time(session_maker, legacy, args.repeat)
+            fts_ms = await _time(session_maker, fts, args.repeat)
+            print(f"{keyword:<16}{like_ms:>12.2f}{fts_ms:>12.2f}{like_ms / fts_ms:>9.1f}x")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+候选人批量写入基准测试
+对比逐条“查询 + 插入 + 提交”（POST /api/candidates 与自动化任务的旧写法）
+与按批次 INSERT ... ON CONFLICT DO UPDATE 的吞吐量
+
+用法:
+    uv run python scripts/bench_candidate_upsert.py [--rows 10000] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+
+import app.models  # noqa: F401
+from app.database import build_engine
+from app.migrations import run_migrations
+from app.models.candidate import Candidate, CandidateCreate
+from app.services.candidate_service import bulk_upsert_candidates
+
+
+def _items(rows: int, prefix: str):
+    return [
+        CandidateCreate(
+            boss_id=f"{prefix}_{i}",
+            name=f"候选人{i}",
+            position="Python开发工程师",
+            company="某科技公司",
+            expected_salary="20-30K",
+        )
+        for i in range(rows)
+    ]
+
+
+async def _legacy(session_maker, items):
+    """逐条查重、插入并提交"""
+    async with session_maker() as session:
+        for item in items:
+            result = await session.execute(select(Candidate).where(Candidate.boss_id == item.boss_id))
+            if result.scalar_one_or_none():
+                continue
+            session.add(Candidate(**item.model_dump(), created_at=datetime.now(), updated_at=datetime.now()))
+            await session.commit()
+
+
+async def _bulk(session_maker, items, batch_size):
+    async with session_maker() as session:
+        await bulk_upsert_candidates(session, items, batch_size=batch_size)
+
+
+async def _setup(db_path: Path):
+    engine = build_engine(f"sqlite+aiosqlite:///{db_path}", profile="production", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(run_migrations)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="候选人批量写入基准测试")
+    parser.add_argument("--rows", type=int, default=10_000, help="候选人数量")
+    parser.add_argument("--batch-size", type=int, default=500, help="每条语句的行数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+
+        engine, session_maker = await _setup(Path(tmp) / "legacy.db")
+        start = time.perf_counter()
+        await _legacy(session_maker, _items(args.rows, "geek"))
+        results.append(("逐条插入", time.perf_counter() - start))
+        await engine.dispose()
+
+        engine, session_maker = await _setup(Path(tmp) / "bulk.db")
+        start = time.perf_counter()
+        await _bulk(session_maker, _items(args.rows, "geek"), args.batch_size)
+        results.append(("批量 upsert（新建）", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        await _bulk(session_maker, _items(args.rows, "geek"), args.batch_size)
+        results.append(("批量 upsert（全部已存在）", time.perf_counter() - start))
+        await engine.dispose()
+
+        print("=" * 60)
+        print(f"{'方式':<24}{'耗时 (s)':>12}{'行/秒':>14}")
+        print("-" * 60)
+        for name, seconds in results:
+            print(f"{name:<24}{seconds:>12.2f}{args.rows / seconds:>14.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
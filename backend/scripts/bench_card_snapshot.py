@@ -0,0 +1,134 @@
+"""
+推荐列表选卡基准测试
+在本地生成的推荐列表页面上模拟打招呼循环选卡，对比
+逐张卡片 count()/inner_text()/evaluate()（旧实现）、一次 evaluate 取回整个列表的快照、
+从锚点之后只取一段卡片的游标三种方式的 Playwright 往返次数、取回卡片数和耗时（只选卡，不点击）
+
+用法:
+    uv run python scripts/bench_card_snapshot.py [--cards 200]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.async_api import async_playwright
+
+from app.services.card_snapshot import CARD_SELECTOR, CardCursor, pick_next_card, snapshot_cards
+
+# 旧实现逐张卡片提取期望职位的脚本
+LEGACY_POSITION_JS = """
+(el) => {
+    const row = el.querySelector('.row-flex .content .join-text-wrap');
+    if (!row) return null;
+    const parts = [];
+    for (const child of row.childNodes) {
+        if (child.nodeType === Node.TEXT_NODE && child.textContent.trim()) {
+            parts.push(child.textContent.trim());
+        }
+    }
+    return parts.length > 1 ? parts[1] : null;
+}
+"""
+
+
+def build_fixture(count: int) -> str:
+    """生成与推荐页结构一致的卡片列表"""
+    cards = []
+    for i in range(count):
+        cards.append(f"""
+        <li>
+          <div class="card-inner" data-geekid="geek{i:05d}">
+            <div class="col-2">
+              <span class="name">候选人{i}</span>
+              <div class="row-flex">
+                <div class="content">
+                  <span class="join-text-wrap">杭州<i class="vline"></i>Python开发{i % 7}</span>
+                </div>
+              </div>
+            </div>
+          </div>
+        </li>""")
+    return f"<html><body><ul class='card-list'>{''.join(cards)}</ul></body></html>"
+
+
+async def legacy_pick(frame, processed_ids, counter):
+    cards = await frame.locator(CARD_SELECTOR).all()
+    counter[0] += 1
+    for c in cards:
+        name_el = c.locator('.name').first
+        counter[0] += 1
+        counter[1] += 1
+        if await name_el.count() > 0:
+            counter[0] += 2
+            name = await name_el.inner_text()
+            expected_pos = await c.evaluate(LEGACY_POSITION_JS)
+            cid = f"{name}|{expected_pos or ''}"
+            if cid not in processed_ids:
+                return cid
+    return None
+
+
+async def snapshot_pick(frame, processed_ids, counter):
+    snapshot = await snapshot_cards(frame)
+    counter[0] += 1
+    counter[1] += snapshot.end - snapshot.start
+    card = pick_next_card(snapshot.cards, processed_ids)
+    return card.key if card else None
+
+
+def cursor_pick_factory():
+    cursor = CardCursor()
+
+    async def cursor_pick(frame, processed_ids, counter):
+        snapshots, scanned = cursor.snapshots, cursor.cards_scanned
+        card = await cursor.next_card(frame, processed_ids)
+        counter[0] += cursor.snapshots - snapshots
+        counter[1] += cursor.cards_scanned - scanned
+        if card is None:
+            return None
+        cursor.advance(card)
+        return card.key
+
+    return cursor_pick
+
+
+async def run(frame, pick, total: int):
+    processed_ids = set()
+    counter = [0, 0]  # 往返次数、取回（检查）的卡片数
+    start = time.perf_counter()
+    for _ in range(total):
+        key = await pick(frame, processed_ids, counter)
+        processed_ids.add(key)
+    return counter[0], counter[1], time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="推荐列表选卡基准测试")
+    parser.add_argument("--cards", type=int, default=200, help="列表中的卡片数（每张卡片处理一次）")
+    args = parser.parse_args()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.set_content(build_fixture(args.cards))
+
+        print(f"卡片数: {args.cards}")
+        strategies = (
+            ("逐卡查询（旧）", legacy_pick),
+            ("整表快照", snapshot_pick),
+            ("游标快照", cursor_pick_factory()),
+        )
+        for label, pick in strategies:
+            round_trips, scanned, elapsed = await run(page.main_frame, pick, args.cards)
+            print(f"{label:<10} 往返 {round_trips:>8} 次  取回卡片 {scanned:>8} 张  耗时 {elapsed:8.2f}s  "
+                  f"平均每个候选人 {round_trips / args.cards:6.1f} 次 / {scanned / args.cards:8.1f} 张")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+SQLite 引擎配置档案基准测试
+对比 compat（SQLite默认设置）与 production（WAL + PRAGMA）在读写混合负载下的吞吐量
+
+用法:
+    uv run python scripts/bench_sqlite_profile.py [--seconds 5] [--writers 2] [--readers 4]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+
+from app.database import build_engine
+from app.models.log_entry import LogEntry, LogAction, LogLevel
+
+
+async def _writer(session_maker, stop_at: float, stats: dict):
+    """模拟 LoggingService.log：每条日志一次提交"""
+    while time.perf_counter() < stop_at:
+        async with session_maker() as session:
+            try:
+                session.add(LogEntry(
+                    level=LogLevel.INFO,
+                    action=LogAction.CANDIDATE_CONTACT,
+                    message="benchmark write",
+                ))
+                await session.commit()
+                stats["writes"] += 1
+            except OperationalError:
+                stats["errors"] += 1
+
+
+async def _reader(session_maker, stop_at: float, stats: dict):
+    """模拟仪表盘轮询：计数 + 最近一页"""
+    while time.perf_counter() < stop_at:
+        async with session_maker() as session:
+            try:
+                await session.execute(select(func.count(LogEntry.id)))
+                result = await session.execute(
+                    select(LogEntry).order_by(LogEntry.id.desc()).limit(50)
+                )
+                result.scalars().all()
+                stats["reads"] += 1
+            except OperationalError:
+                stats["errors"] += 1
+
+
+async def run_profile(profile: str, seconds: float, writers: int, readers: int, seed_rows: int) -> dict:
+    """在独立的临时数据库上运行一轮读写混合负载"""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        engine = build_engine(url, profile=profile, echo=False)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        # 预填充数据，使读取有一定代价
+        async with session_maker() as session:
+            session.add_all([
+                LogEntry(level=LogLevel.INFO, action=LogAction.SYSTEM_INIT, message=f"seed {i}")
+                for i in range(seed_rows)
+            ])
+            await session.commit()
+
+        stats = {"writes": 0, "reads": 0, "errors": 0}
+        stop_at = time.perf_counter() + seconds
+        await asyncio.gather(
+            *[_writer(session_maker, stop_at, stats) for _ in range(writers)],
+            *[_reader(session_maker, stop_at, stats) for _ in range(readers)],
+        )
+        await engine.dispose()
+
+    stats["writes_per_sec"] = stats["writes"] / seconds
+    stats["reads_per_sec"] = stats["reads"] / seconds
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SQLite 引擎配置档案基准测试")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每个档案的运行时长（秒）")
+    parser.add_argument("--writers", type=int, default=2, help="并发写协程数")
+    parser.add_argument("--readers", type=int, default=4, help="并发读协程数")
+    parser.add_argument("--seed", type=int, default=20000, help="预填充行数")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"📊 读写混合基准: {args.writers} 写 / {args.readers} 读, 每档案 {args.seconds}s, 预填充 {args.seed} 行")
+    print("=" * 70)
+
+    results = {}
+    for profile in ("compat", "production"):
+        results[profile] = await run_profile(profile, args.seconds, args.writers, args.readers, args.seed)
+        r = results[profile]
+        print(f"{profile:<12} 写: {r['writes_per_sec']:>8.1f}/s   读: {r['reads_per_sec']:>8.1f}/s   错误: {r['errors']}")
+
+    before, after = results["compat"], results["production"]
+    if before["writes_per_sec"] and before["reads_per_sec"]:
+        print("-" * 70)
+        print(f"写入提升: {after['writes_per_sec'] / before['writes_per_sec']:.2f}x   "
+              f"读取提升: {after['reads_per_sec'] / before['reads_per_sec']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
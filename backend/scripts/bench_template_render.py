@@ -0,0 +1,75 @@
+"""
+问候模板渲染基准测试
+对比逐条链式 str.replace（旧实现）与预解析的渲染函数、批量渲染的耗时
+
+用法:
+    uv run python scripts/bench_template_render.py [--renders 100000]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.candidate import Candidate
+from app.models.greeting_template import GreetingTemplate
+from app.utils.template_renderer import get_renderer, render_batch
+
+CONTENT = "你好{name}，看到你在{company}担任{position}，我们正在招聘相关岗位，期待与你进一步沟通。"
+
+
+def _legacy(template: GreetingTemplate, candidate: Candidate) -> str:
+    """旧实现：每条消息链式替换"""
+    message = template.content
+    message = message.replace('{name}', candidate.name)
+    message = message.replace('{position}', candidate.position)
+    if candidate.company:
+        message = message.replace('{company}', candidate.company)
+    return message
+
+
+def main():
+    parser = argparse.ArgumentParser(description="问候模板渲染基准测试")
+    parser.add_argument("--renders", type=int, default=100_000, help="渲染次数")
+    args = parser.parse_args()
+
+    template = GreetingTemplate(id=1, name="bench", content=CONTENT, updated_at=datetime.now())
+    candidates = [
+        Candidate(boss_id=f"g{i}", name=f"候选人{i}", position="Python开发工程师",
+                  company=None if i % 10 == 0 else "某科技公司")
+        for i in range(args.renders)
+    ]
+
+    results = []
+
+    start = time.perf_counter()
+    for candidate in candidates:
+        _legacy(template, candidate)
+    results.append(("链式 replace", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for candidate in candidates:
+        get_renderer(template)(candidate)
+    results.append(("编译渲染（逐条取缓存）", time.perf_counter() - start))
+
+    render = get_renderer(template)
+    start = time.perf_counter()
+    for candidate in candidates:
+        render(candidate)
+    results.append(("编译渲染（复用渲染函数）", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    render_batch(template, candidates)
+    results.append(("批量渲染", time.perf_counter() - start))
+
+    print("=" * 60)
+    print(f"{'方式':<24}{'总耗时 (ms)':>14}{'单次 (µs)':>14}")
+    print("-" * 60)
+    for name, seconds in results:
+        print(f"{name:<24}{seconds * 1000:>14.1f}{seconds / args.renders * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+测试公共夹具
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401  确保模型已注册到元数据
+from app.database import build_engine
+from app.migrations import run_migrations
+
+
+@pytest.fixture
+def session_maker(tmp_path):
+    """基于临时 SQLite 文件的会话工厂（已建表并执行迁移）"""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", profile="production", echo=False)
+
+    async def _setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(run_migrations)
+
+    asyncio.run(_setup())
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
@@ -0,0 +1,75 @@
+"""
+测试候选人与模板的批量操作
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models.automation_task import AutomationTask, TaskStatus
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.greeting import GreetingRecord
+from app.models.greeting_template import GreetingTemplate
+from app.routes.candidates import batch_delete_candidates, batch_update_status
+from app.routes.templates import batch_delete_templates
+
+
+def test_candidate_batch_update_and_delete(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            candidates = [Candidate(boss_id=f"g{i}", name=f"N{i}", position="P") for i in range(4)]
+            session.add_all(candidates)
+            await session.commit()
+            ids = [c.id for c in candidates]
+            session.add(GreetingRecord(candidate_id=ids[0], message="hi"))
+            await session.commit()
+
+            updated = await batch_update_status(ids + [999], CandidateStatus.ARCHIVED, session=session)
+
+            with pytest.raises(HTTPException) as conflict:
+                await batch_delete_candidates(ids, session=session)
+
+            deleted = await batch_delete_candidates(ids[1:], session=session)
+
+            with pytest.raises(HTTPException) as missing:
+                await batch_delete_candidates([999], session=session)
+
+            session.expire_all()
+            remaining = (await session.execute(select(Candidate))).scalars().all()
+            return updated, conflict.value, deleted, missing.value, remaining
+
+    updated, conflict, deleted, missing, remaining = asyncio.run(_run())
+
+    assert updated["updated_count"] == 4
+    assert conflict.status_code == 400 and "N0" in conflict.detail
+    assert deleted["deleted_count"] == 3
+    assert missing.status_code == 404
+    assert [(c.boss_id, c.status) for c in remaining] == [("g0", CandidateStatus.ARCHIVED)]
+
+
+def test_template_batch_delete(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            templates = [GreetingTemplate(name=f"T{i}", content="你好") for i in range(3)]
+            session.add_all(templates)
+            await session.commit()
+            ids = [t.id for t in templates]
+            session.add_all([
+                AutomationTask(name="a", search_keywords="k", greeting_template_id=ids[0], status=TaskStatus.RUNNING),
+                AutomationTask(name="b", search_keywords="k", greeting_template_id=ids[1], status=TaskStatus.COMPLETED),
+            ])
+            await session.commit()
+
+            with pytest.raises(HTTPException) as conflict:
+                await batch_delete_templates(ids, session=session)
+
+            deleted = await batch_delete_templates(ids[1:], session=session)
+            remaining = (await session.execute(select(GreetingTemplate.name))).scalars().all()
+            return conflict.value, deleted, remaining
+
+    conflict, deleted, remaining = asyncio.run(_run())
+
+    assert conflict.status_code == 400 and "T0" in conflict.detail
+    assert deleted["deleted_count"] == 2
+    assert remaining == ["T0"]
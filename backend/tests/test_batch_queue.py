@@ -0,0 +1,46 @@
+"""
+测试队列批量消费
+"""
+import asyncio
+
+from app.utils.batch_queue import BATCH_STOP, run_batches
+
+
+def test_batches_split_by_size_barrier_and_stop():
+    async def _run():
+        queue = asyncio.Queue()
+        for item in [1, 2, 3, "sync", 4, BATCH_STOP, 5]:
+            queue.put_nowait(item)
+
+        flushed = []
+
+        async def _flush(batch, barriers):
+            flushed.append((batch, barriers))
+
+        await run_batches(queue, 2, 10.0, _flush, is_barrier=lambda item: item == "sync")
+        return flushed, queue.qsize()
+
+    flushed, left = asyncio.run(_run())
+    assert flushed == [([1, 2], []), ([3], ["sync"]), ([4], [])]
+    # 停止哨兵之后的条目不再消费
+    assert left == 1
+
+
+def test_partial_batch_flushed_after_interval():
+    async def _run():
+        queue = asyncio.Queue()
+        flushed = []
+
+        async def _flush(batch, barriers):
+            flushed.append(batch)
+
+        task = asyncio.create_task(run_batches(queue, 100, 0.01, _flush))
+        queue.put_nowait("a")
+        await asyncio.sleep(0.05)
+        # 未攒够一批，超时后也会写出
+        assert flushed == [["a"]]
+        queue.put_nowait(BATCH_STOP)
+        await task
+        return flushed
+
+    assert asyncio.run(_run()) == [["a"]]
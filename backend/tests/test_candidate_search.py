@@ -0,0 +1,104 @@
+"""
+测试候选人全文检索
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlmodel import select
+
+from app.models.candidate import Candidate
+from app.routes.candidates import get_candidates
+from app.services.candidate_search import apply_candidate_search, split_search_terms
+from app.utils.pagination import encode_cursor
+
+
+def _search(session_maker, keyword):
+    async def _run():
+        async with session_maker() as session:
+            query, ranked = await apply_candidate_search(session, select(Candidate), keyword)
+            result = await session.execute(query)
+            return [c.boss_id for c in result.scalars().all()], ranked
+    return asyncio.run(_run())
+
+
+def _seed(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            session.add_all([
+                Candidate(boss_id="a", name="张三丰", position="高级Python开发工程师", company="字节跳动"),
+                Candidate(boss_id="b", name="李四", position="产品经理", expected_position="Python开发工程师"),
+                Candidate(boss_id="c", name="王五", position="运营", notes="擅长数据分析", tags='["python"]'),
+            ])
+            await session.commit()
+    asyncio.run(_run())
+
+
+def test_split_search_terms():
+    assert split_search_terms("张三 Python开发") == (["Python开发"], ["张三"])
+
+
+def test_fts_search_ranked_over_all_columns(session_maker):
+    _seed(session_maker)
+
+    ids, ranked = _search(session_maker, "Python开发")
+    assert ranked
+    assert set(ids) == {"a", "b"}
+
+    # 备注和标签也在索引内，大小写不敏感
+    assert _search(session_maker, "数据分析")[0] == ["c"]
+    assert set(_search(session_maker, "PYTHON")[0]) == {"a", "b", "c"}
+
+
+def test_short_terms_fall_back_to_like(session_maker):
+    _seed(session_maker)
+
+    ids, ranked = _search(session_maker, "李四")
+    assert not ranked
+    assert ids == ["b"]
+
+    # 长短关键词组合：全文索引 + LIKE 同时生效
+    assert _search(session_maker, "Python 张三")[0] == ["a"]
+
+
+def test_fts_index_follows_updates_and_deletes(session_maker):
+    _seed(session_maker)
+
+    async def _mutate():
+        async with session_maker() as session:
+            a = (await session.execute(select(Candidate).where(Candidate.boss_id == "a"))).scalar_one()
+            a.position = "前端工程师"
+            c = (await session.execute(select(Candidate).where(Candidate.boss_id == "c"))).scalar_one()
+            await session.delete(c)
+            await session.commit()
+    asyncio.run(_mutate())
+
+    assert _search(session_maker, "Python开发")[0] == ["b"]
+    assert _search(session_maker, "前端工程")[0] == ["a"]
+    assert _search(session_maker, "数据分析")[0] == []
+
+
+def test_ranked_search_rejects_cursor(session_maker):
+    """相关度排序的结果只能用 offset 翻页，传入游标时返回 400 而不是重复返回第一页"""
+    _seed(session_maker)
+
+    async def _run():
+        async with session_maker() as session:
+            response = Response()
+            first = await get_candidates(
+                response, status=None, search="Python开发", limit=1, offset=0, cursor=None, session=session,
+            )
+            second = await get_candidates(
+                Response(), status=None, search="Python开发", limit=1, offset=1, cursor=None, session=session,
+            )
+            with pytest.raises(HTTPException) as rejected:
+                await get_candidates(
+                    Response(), status=None, search="Python开发", limit=1, offset=0,
+                    cursor=encode_cursor(first[0].created_at, first[0].id), session=session,
+                )
+            return first, second, response, rejected.value
+
+    first, second, response, rejected = asyncio.run(_run())
+    assert {first[0].boss_id, second[0].boss_id} == {"a", "b"}
+    assert "X-Next-Cursor" not in response.headers
+    assert rejected.status_code == 400
@@ -0,0 +1,87 @@
+"""
+测试候选人批量写入
+"""
+import asyncio
+
+from sqlmodel import select
+
+from app.models.candidate import Candidate, CandidateCreate, CandidateStatus
+from app.models.greeting import GreetingRecord
+from app.services.candidate_service import (
+    bulk_upsert_candidates,
+    load_contact_map,
+    normalize_scraped_candidate,
+)
+
+
+def test_bulk_upsert_inserts_and_updates(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            first = await bulk_upsert_candidates(session, [
+                CandidateCreate(boss_id=f"g{i}", name=f"N{i}", position="P", company="C")
+                for i in range(5)
+            ], batch_size=2)
+
+            # 人工修改的状态在重复抓取后应保留
+            await session.execute(
+                Candidate.__table__.update().where(Candidate.boss_id == "g0").values(status="CONTACTED")
+            )
+            await session.commit()
+
+            second = await bulk_upsert_candidates(session, [
+                {"boss_id": "g0", "name": "N0-new", "position": "", "company": None},
+                {"boss_id": "g9", "name": "N9", "position": "P"},
+                {"boss_id": "g9", "name": "N9-dup", "position": "P"},
+            ])
+
+            rows = (await session.execute(select(Candidate).order_by(Candidate.boss_id))).scalars().all()
+            return first, second, {row.boss_id: row for row in rows}
+
+    first, second, rows = asyncio.run(_run())
+
+    assert first["inserted"] == 5 and first["updated"] == 0
+    assert len(first["ids"]) == 5
+
+    assert second["inserted"] == 1 and second["updated"] == 1
+    assert second["ids"]["g0"] == first["ids"]["g0"]
+
+    assert rows["g0"].name == "N0-new"
+    assert rows["g0"].position == "P"
+    assert rows["g0"].company == "C"
+    assert rows["g0"].status == CandidateStatus.CONTACTED
+    assert rows["g9"].name == "N9-dup"
+    assert len(rows) == 6
+
+
+def test_normalize_scraped_candidate():
+    row = normalize_scraped_candidate({
+        "boss_id": "x", "name": "张三", "position": "开发", "salary": "20-30K",
+        "location": "北京", "active_time": "刚刚活跃", "company": "",
+    })
+    assert row["expected_salary"] == "20-30K"
+    assert row["expected_location"] == "北京"
+    assert row["active_time"] is None
+    assert row["company"] is None
+
+    assert normalize_scraped_candidate({"boss_id": None, "name": "x"}) is None
+
+
+def test_load_contact_map(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            result = await bulk_upsert_candidates(session, [
+                {"boss_id": boss_id, "name": boss_id, "position": "P"} for boss_id in ("a", "b", "c")
+            ])
+            session.add_all([
+                GreetingRecord(candidate_id=result["ids"]["a"], message="hi"),
+                GreetingRecord(candidate_id=result["ids"]["a"], message="again"),
+            ])
+            await session.commit()
+            return await load_contact_map(session, ["a", "b", "a", "missing", None], batch_size=2)
+
+    contact_map = asyncio.run(_run())
+
+    assert set(contact_map) == {"a", "b"}
+    assert contact_map["a"][1] is True
+    assert contact_map["b"][1] is False
+    assert contact_map["b"][0].name == "b"
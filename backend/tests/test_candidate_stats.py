@@ -0,0 +1,85 @@
+"""
+测试候选人统计的分组查询与缓存失效
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import update
+
+from app.models.candidate import Candidate, CandidateStatus
+from app.services.candidate_stats import CandidateStatsCache, candidate_stats_cache
+
+
+def test_stats_single_query_and_invalidation(session_maker):
+    yesterday = datetime.now() - timedelta(days=1)
+    cache = candidate_stats_cache
+
+    async def _run():
+        snapshots = []
+        async with session_maker() as session:
+            session.add_all([
+                Candidate(boss_id="a", name="A", position="P"),
+                Candidate(boss_id="b", name="B", position="P", created_at=yesterday, status=CandidateStatus.CONTACTED),
+            ])
+            await session.commit()
+            snapshots.append(await cache.get(session))
+
+            # ORM 对象修改后提交：缓存失效
+            session.add(Candidate(boss_id="c", name="C", position="P"))
+            await session.commit()
+            snapshots.append(await cache.get(session))
+
+            # 批量 UPDATE 语句：缓存失效
+            await session.execute(
+                update(Candidate).where(Candidate.boss_id == "c").values(status=CandidateStatus.REJECTED)
+            )
+            await session.commit()
+            snapshots.append(await cache.get(session))
+
+            # 回滚的修改不影响缓存
+            session.add(Candidate(boss_id="d", name="D", position="P"))
+            await session.flush()
+            await session.rollback()
+            snapshots.append(await cache.get(session))
+        return snapshots
+
+    first, second, third, fourth = asyncio.run(_run())
+
+    assert first["total"] == 2
+    assert first["today_added"] == 1
+    assert first["by_status"]["new"] == 1
+    assert first["by_status"]["contacted"] == 1
+    assert first["by_status"]["rejected"] == 0
+
+    assert second["total"] == 3
+    assert second["today_added"] == 2
+
+    assert third["by_status"]["rejected"] == 1
+    assert third["by_status"]["new"] == 1
+
+    assert fourth == third
+
+
+def test_cache_hit_skips_database(session_maker):
+    cache = CandidateStatsCache()
+
+    async def _run():
+        async with session_maker() as session:
+            first = await cache.get(session)
+            # 绕过 ORM 的写入不会失效缓存，返回的仍是缓存值
+            now = datetime.now()
+            await session.execute(
+                text("INSERT INTO candidates (boss_id, name, position, status, created_at, updated_at) "
+                     "VALUES ('raw', 'R', 'P', 'NEW', :now, :now)"),
+                {"now": now.isoformat(sep=" ")},
+            )
+            cached = await cache.get(session)
+            cache.invalidate()
+            fresh = await cache.get(session)
+        return first, cached, fresh
+
+    first, cached, fresh = asyncio.run(_run())
+    assert first["total"] == 0
+    assert cached["total"] == 0
+    assert fresh["total"] == 1
@@ -0,0 +1,162 @@
+"""
+测试推荐列表卡片快照、选卡与游标
+"""
+import asyncio
+
+from app.services.card_snapshot import CARD_SELECTOR, CardCursor, card_locator, pick_next_card, snapshot_cards
+
+
+class FakeLocator:
+    def __init__(self, selector):
+        self.selector = selector
+        self.nth_index = None
+
+    @property
+    def first(self):
+        return self
+
+    def nth(self, index):
+        self.nth_index = index
+        return self
+
+
+class FakeFrame:
+    """按 CARD_SNAPSHOT_JS 的约定返回卡片的 recommendFrame 替身（记录往返次数）
+
+    items 中每一项为 (geekId, 姓名, 期望职位)，列表顺序即 DOM 顺序
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.round_trips = 0
+
+    async def evaluate(self, script, args):
+        self.round_trips += 1
+        ids = [item[0] for item in self.items]
+        anchor_id, anchor_index = args["anchorId"], args["anchorIndex"]
+
+        start, anchored = 0, False
+        if anchor_index >= 0:
+            if not anchor_id:
+                pos = anchor_index if anchor_index < len(ids) else -1
+            elif anchor_index < len(ids) and ids[anchor_index] == anchor_id:
+                pos = anchor_index
+            else:
+                pos = ids.index(anchor_id) if anchor_id in ids else -1
+            if pos >= 0:
+                start, anchored = pos + 1, True
+
+        end = min(len(ids), start + args["limit"]) if args["limit"] else len(ids)
+        rows = [[i, *self.items[i]] for i in range(start, end)]
+        return {"start": start, "end": end, "total": len(ids), "anchored": anchored, "rows": rows}
+
+    def locator(self, selector):
+        return FakeLocator(selector)
+
+
+ITEMS = [
+    ("g0", "张三", "Java开发"),
+    (None, None, None),
+    ("g2", "李四", ""),
+    ("", "王五", "Go开发"),
+]
+
+
+def _items(start, stop):
+    return [(f"g{i}", f"候选人{i}", "Python开发") for i in range(start, stop)]
+
+
+def test_snapshot_and_pick_in_one_round_trip():
+    frame = FakeFrame(ITEMS)
+    snapshot = asyncio.run(snapshot_cards(frame))
+    cards = snapshot.cards
+
+    assert frame.round_trips == 1
+    assert (snapshot.start, snapshot.end, snapshot.total, snapshot.anchored) == (0, 4, 4, False)
+    assert [card.index for card in cards] == [0, 2, 3]
+    assert cards[1].expected_position is None and cards[2].geek_id is None
+    assert [card.key for card in cards] == ["g0", "g2", "王五|Go开发"]
+
+    processed = {"g0"}
+    assert pick_next_card(cards, processed).name == "李四"
+    assert pick_next_card(cards, processed, seen_ids={"g2"}).name == "王五"
+    processed.update(card.key for card in cards)
+    assert pick_next_card(cards, processed) is None
+
+
+def test_card_locator_prefers_geek_id():
+    frame = FakeFrame(ITEMS)
+    with_id, without_id = asyncio.run(snapshot_cards(frame)).cards[1:]
+
+    by_id = card_locator(frame, with_id)
+    assert 'data-geekid="g2"' in by_id.selector and by_id.nth_index is None
+
+    by_index = card_locator(frame, without_id)
+    assert by_index.selector == CARD_SELECTOR and by_index.nth_index == 3
+
+
+def test_cursor_selection_is_amortised_constant():
+    frame = FakeFrame(_items(0, 600))
+    cursor = CardCursor(window=20)
+    processed = set()
+
+    async def _run(count):
+        for _ in range(count):
+            card = await cursor.next_card(frame, processed)
+            cursor.advance(card)
+            processed.add(card.key)
+
+    asyncio.run(_run(600))
+
+    # 每个候选人一次往返，只取回锚点之后的卡片，只在第一次从头扫描
+    assert frame.round_trips == 600
+    assert cursor.full_scans == 1
+    assert cursor.cards_scanned < 600 * 20
+
+
+def test_cursor_survives_list_growth_and_virtual_scroll():
+    frame = FakeFrame(_items(0, 30))
+    cursor = CardCursor(window=10)
+    processed = set()
+
+    async def _take():
+        card = await cursor.next_card(frame, processed)
+        if card is not None:
+            cursor.advance(card)
+            processed.add(card.key)
+        return card
+
+    async def _run():
+        taken = [await _take() for _ in range(30)]
+        assert await _take() is None
+
+        # 滚动加载：列表变长，从末尾继续
+        frame.items += _items(30, 40)
+        taken.append(await _take())
+
+        # 虚拟滚动：前面的节点被移除，序号整体前移，按 geekId 找回锚点
+        frame.items = frame.items[20:] + _items(40, 45)
+        taken.append(await _take())
+
+        # 页面刷新：从头扫描，已处理过的候选人被跳过
+        cursor.reset()
+        frame.items = _items(0, 50)
+        taken.append(await _take())
+        return taken
+
+    taken = asyncio.run(_run())
+    assert [card.geek_id for card in taken[:30]] == [f"g{i}" for i in range(30)]
+    assert [card.geek_id for card in taken[30:]] == ["g30", "g31", "g32"]
+    assert cursor.full_scans == 2
+
+
+def test_cursor_skips_seen_candidates():
+    frame = FakeFrame(_items(0, 50))
+    cursor = CardCursor(window=20)
+    seen = {f"g{i}" for i in range(45)}
+
+    card = asyncio.run(cursor.next_card(frame, set(), seen))
+
+    assert card.geek_id == "g45"
+    assert frame.round_trips == 3
+    assert len(cursor.seen_skipped_ids) == 45
@@ -0,0 +1,105 @@
+"""
+测试进程内事件总线和打招呼状态增量推送
+"""
+import asyncio
+
+from app.routes.events import format_event
+from app.services.event_bus import RESET_TOPIC, EventBus
+from app.services.greeting_service import GreetingTaskManager
+
+
+def _drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+def test_replay_after_reconnect_and_topic_filter():
+    async def _run():
+        bus = EventBus(buffer_size=10)
+        for i in range(5):
+            bus.publish("greeting.log", {"i": i})
+            bus.publish("task.updated", {"id": i})
+
+        # 重连：只补发最后收到的序号之后、订阅前缀匹配的事件
+        sub = bus.subscribe(["greeting"], last_seq=6)
+        replayed = _drain(sub)
+        assert [e.data["i"] for e in replayed] == [3, 4]
+
+        bus.publish("task.updated", {"id": 9})
+        bus.publish("greeting.status", {"status": "running"})
+        assert [e.topic for e in _drain(sub)] == ["greeting.status"]
+
+        # 没有 last_seq 时只接收新事件
+        fresh = bus.subscribe()
+        assert fresh.queue.empty()
+        sub.close()
+        fresh.close()
+        assert bus.get_metrics()["subscribers"] == 0
+
+    asyncio.run(_run())
+
+
+def test_reset_when_sequence_is_gone():
+    async def _run():
+        bus = EventBus(buffer_size=3)
+        for i in range(6):
+            bus.publish("greeting.log", {"i": i})
+
+        # 序号 1 之后的事件已被挤出缓冲
+        (event,) = _drain(bus.subscribe(last_seq=1))
+        assert event.topic == RESET_TOPIC and event.seq == 6
+
+        # 服务重启后客户端带来的序号比当前大
+        (event,) = _drain(bus.subscribe(last_seq=100))
+        assert event.topic == RESET_TOPIC
+
+        # 最早的缓冲事件之前一个序号仍可完整补发
+        assert [e.seq for e in _drain(bus.subscribe(last_seq=3))] == [4, 5, 6]
+
+    asyncio.run(_run())
+
+
+def test_slow_subscriber_gets_reset(monkeypatch):
+    monkeypatch.setattr("app.services.event_bus.SUBSCRIBER_QUEUE_SIZE", 2)
+
+    async def _run():
+        bus = EventBus()
+        sub = bus.subscribe()
+        for i in range(3):
+            bus.publish("greeting.log", {"i": i})
+        events = _drain(sub)
+        assert [e.topic for e in events] == [RESET_TOPIC]
+        assert events[0].seq == 3
+        assert sub.overflows == 1
+
+    asyncio.run(_run())
+
+
+def test_greeting_manager_publishes_status_deltas(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr("app.services.greeting_service.event_bus", bus)
+
+    async def _run():
+        manager = GreetingTaskManager()
+        sub = bus.subscribe()
+
+        manager.status = "running"
+        manager.target_count = 10
+        manager.add_log("INFO", "开始")
+        manager.success_count = 1
+        manager.add_log("INFO", "成功 1")
+        manager.add_log("INFO", "没有状态变化")
+        return _drain(sub)
+
+    events = asyncio.run(_run())
+    assert [e.topic for e in events] == [
+        "greeting.status", "greeting.log",
+        "greeting.status", "greeting.log",
+        "greeting.log",
+    ]
+    assert events[0].data["status"] == "running"
+    assert events[2].data == {"success_count": 1, "progress": 10.0, "elapsed_time": None}
+    assert events[4].data.message == "没有状态变化"
+    assert format_event(events[4]).startswith('id: 5\nevent: greeting.log\ndata: {"seq": 3, ')
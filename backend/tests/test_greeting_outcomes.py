@@ -0,0 +1,189 @@
+"""
+测试打招呼循环处理结果的批量落库
+"""
+import asyncio
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.greeting import GreetingOutcome, GreetingRecord
+from app.routes.candidates import batch_delete_candidates, delete_candidate
+from app.services.candidate_service import load_contact_map
+from app.services.card_snapshot import CardInfo
+from app.services.greeting_outcomes import OutcomeBuffer, OutcomeEntry, persist_outcomes
+from app.services.greeting_runs import start_run
+from app.services.greeting_seen import load_seen
+from app.services.stats_service import get_rollup_counters
+from tests.test_migrations import _init
+
+
+def _card(geek_id, name=None, expected_position="Python"):
+    return CardInfo(0, geek_id, name or geek_id.upper(), expected_position)
+
+
+def test_outcomes_flush_in_batches(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            run_id = await start_run(session, 2, ["Python"], "job-a", None)
+            # 之前已回复的候选人再次被打招呼时不回退状态
+            session.add(Candidate(boss_id="a", name="A", position="P", status=CandidateStatus.REPLIED))
+            await session.commit()
+
+        buffer = OutcomeBuffer(session_maker, run_id, "job-a", every=3, interval=3600)
+        await buffer.add(_card("a"), GreetingOutcome.GREETED)
+        await buffer.add(_card("b", expected_position="Java"), GreetingOutcome.SKIPPED_MISMATCH)
+        await buffer.add(None, GreetingOutcome.FAILED, "取卡片失败")
+        assert buffer.written == 0 and len(buffer.pending) == 2
+
+        await buffer.add(_card("c"), GreetingOutcome.ALREADY_CONTACTED)
+        assert buffer.written == 3 and not buffer.pending
+        await buffer.add(_card("d"), GreetingOutcome.FAILED, "未找到打招呼按钮")
+        await buffer.add(_card("e"), GreetingOutcome.GREETED)
+        await buffer.flush()
+
+        async with session_maker() as session:
+            candidates = {
+                c.boss_id: c for c in (await session.execute(select(Candidate))).scalars().all()
+            }
+            records = (await session.execute(select(GreetingRecord).order_by(GreetingRecord.id))).scalars().all()
+            contact_map = await load_contact_map(session, candidates)
+            seen = await load_seen(session, "job-a")
+            counters = await get_rollup_counters(session, date.today())
+        return run_id, candidates, records, contact_map, seen, counters
+
+    run_id, candidates, records, contact_map, seen, counters = asyncio.run(_run())
+
+    assert {k: c.status for k, c in candidates.items()} == {
+        "a": CandidateStatus.REPLIED,
+        "b": CandidateStatus.NEW,
+        "c": CandidateStatus.CONTACTED,
+        "d": CandidateStatus.NEW,
+        "e": CandidateStatus.CONTACTED,
+    }
+    assert candidates["a"].last_contacted_at and candidates["e"].last_contacted_at
+    assert candidates["c"].last_contacted_at is None
+    assert candidates["b"].expected_position == "Java"
+
+    assert [(r.outcome, r.success) for r in records] == [
+        ("greeted", True), ("skipped_mismatch", False), ("already_contacted", False),
+        ("failed", False), ("greeted", True),
+    ]
+    assert {r.run_id for r in records} == {run_id}
+    assert records[3].error_message == "未找到打招呼按钮"
+
+    # 跳过、失败（未发出问候）的候选人之后仍可被联系
+    assert {k for k, (_, contacted) in contact_map.items() if contacted} == {"a", "c", "e"}
+    assert seen == {"a", "c", "e"}
+
+    # 统计只计入实际发出的问候
+    assert counters["all"]["greetings.total"] == 2
+    assert counters["all"]["greetings.success"] == 2
+    assert counters["day"]["greetings.sent"] == 2
+
+
+def test_each_candidate_keeps_own_contact_time(session_maker):
+    earlier = datetime(2025, 1, 1, 10, 0)
+    later = earlier + timedelta(minutes=5)
+
+    async def _run():
+        async with session_maker() as session:
+            await persist_outcomes(session, None, "", [
+                OutcomeEntry("a", "A", None, GreetingOutcome.GREETED, None, earlier),
+                OutcomeEntry("b", "B", None, GreetingOutcome.GREETED, None, later),
+            ])
+            # 已存在的候选人再次被打招呼时同样按各自时间更新
+            await persist_outcomes(session, None, "", [
+                OutcomeEntry("a", "A", None, GreetingOutcome.GREETED, None, later),
+                OutcomeEntry("b", "B", None, GreetingOutcome.GREETED, None, earlier),
+            ])
+            result = await session.execute(select(Candidate.boss_id, Candidate.last_contacted_at))
+            return dict(result.all())
+
+    assert asyncio.run(_run()) == {"a": later, "b": earlier}
+
+
+def test_unsent_outcomes_do_not_block_delete(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            await persist_outcomes(session, None, "", [
+                OutcomeEntry("a", "A", None, GreetingOutcome.GREETED, None, datetime.now()),
+                OutcomeEntry("b", "B", None, GreetingOutcome.SKIPPED_MISMATCH, None, datetime.now()),
+                OutcomeEntry("c", "C", None, GreetingOutcome.FAILED, "点击候选人卡片失败", datetime.now()),
+                OutcomeEntry("d", "D", None, GreetingOutcome.ALREADY_CONTACTED, None, datetime.now()),
+            ])
+            ids = dict((await session.execute(select(Candidate.boss_id, Candidate.id))).all())
+
+            with pytest.raises(HTTPException) as conflict:
+                await delete_candidate(ids["a"], session=session)
+            await delete_candidate(ids["b"], session=session)
+            deleted = await batch_delete_candidates([ids["c"], ids["d"]], session=session)
+
+            remaining = (await session.execute(select(GreetingRecord.outcome))).scalars().all()
+            return conflict.value, deleted, remaining
+
+    conflict, deleted, remaining = asyncio.run(_run())
+    assert conflict.status_code == 400
+    assert deleted["deleted_count"] == 2
+    assert remaining == ["greeted"]
+
+
+def test_failed_flush_keeps_entries(session_maker):
+    class _Broken:
+        def __call__(self):
+            raise RuntimeError("数据库不可用")
+
+    async def _run():
+        buffer = OutcomeBuffer(_Broken(), None, "", every=100)
+        await buffer.add(_card("a"), GreetingOutcome.GREETED)
+        await buffer.flush()
+        assert len(buffer.pending) == 1
+
+        buffer.session_maker = session_maker
+        await buffer.flush()
+        async with session_maker() as session:
+            return buffer, (await session.execute(select(GreetingRecord))).scalars().all()
+
+    buffer, records = asyncio.run(_run())
+    assert buffer.written == 1 and not buffer.pending
+    assert records[0].run_id is None and records[0].outcome == "greeted"
+
+
+def test_migration_adds_run_columns_to_existing_table(tmp_path):
+    """v3 的旧表（没有 run_id / outcome 列）升级后重算问候统计"""
+    db_path = tmp_path / "database.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE candidates (id INTEGER PRIMARY KEY, boss_id VARCHAR, name VARCHAR, position VARCHAR);
+        CREATE TABLE greeting_records (
+            id INTEGER PRIMARY KEY, candidate_id INTEGER, task_id INTEGER, message VARCHAR,
+            template_id INTEGER, success BOOLEAN, error_message VARCHAR, sent_at DATETIME
+        );
+        INSERT INTO greeting_records (candidate_id, message, success, sent_at)
+        VALUES (1, 'hi', 1, '2025-01-01 10:00:00'), (1, 'hi', 0, '2025-01-01 11:00:00');
+        PRAGMA user_version = 3;
+    """)
+    conn.execute(
+        "CREATE TABLE stats_rollup (bucket TEXT, metric TEXT, value INTEGER, PRIMARY KEY (bucket, metric))"
+    )
+    conn.commit()
+    conn.close()
+
+    assert _init(db_path) == [4]
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(greeting_records)")}
+    conn.execute(
+        "INSERT INTO greeting_records (candidate_id, message, success, sent_at, outcome) "
+        "VALUES (1, '', 0, '2025-01-01 12:00:00', 'skipped_mismatch')"
+    )
+    rollup = dict(conn.execute("SELECT bucket || ':' || metric, value FROM stats_rollup"))
+    conn.close()
+
+    assert {"run_id", "outcome"} <= columns
+    assert rollup["all:greetings.total"] == 2
+    assert rollup["all:greetings.success"] == 1
+    assert rollup["2025-01-01:greetings.sent"] == 2
@@ -0,0 +1,171 @@
+"""
+测试打招呼任务运行目录和日志分页读取
+"""
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.greeting import GreetingRun
+from app.services.greeting_runs import (
+    _gzip_file,
+    backfill_runs,
+    compress_old_runs,
+    finish_run,
+    list_runs,
+    read_log_page,
+    resolve_log_file,
+    start_run,
+)
+from app.services.log_file_sink import LogFileSink
+
+
+def _write_log(path, n):
+    lines = [json.dumps({"seq": i, "message": f"第 {i} 条" * (i % 7 + 1)}, ensure_ascii=False) for i in range(n)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+
+def _read_backwards(path, limit):
+    pages, before = [], None
+    while True:
+        lines, before = read_log_page(path, limit, before)
+        pages.insert(0, lines)
+        if before is None:
+            return [line for page in pages for line in page]
+
+
+def test_tail_pages_cover_file_in_order(tmp_path, monkeypatch):
+    # 小块读取，覆盖跨块的行
+    monkeypatch.setattr("app.services.greeting_runs.TAIL_BLOCK_SIZE", 97)
+    path = tmp_path / "greeting_20250101_000000.log"
+    lines = _write_log(path, 250)
+
+    last, before = read_log_page(path, 10)
+    assert last == lines[-10:]
+    assert before == len("\n".join(lines[:-10]).encode("utf-8")) + 1
+    assert _read_backwards(path, 33) == lines
+
+    # 压缩后分页结果相同
+    gz = _gzip_file(path)
+    assert not path.exists() and gz.suffix == ".gz"
+    assert read_log_page(gz, 10) == (last, before)
+    assert _read_backwards(gz, 33) == lines
+
+    empty = tmp_path / "empty.log"
+    empty.write_text("")
+    assert read_log_page(empty, 10) == ([], None)
+
+
+def test_rotated_segments_are_read_and_compressed_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.greeting_runs.TAIL_BLOCK_SIZE", 53)
+    path = tmp_path / "greeting_20250101_000000.log"
+    lines = [json.dumps({"seq": i, "message": "x" * (i % 5)}) for i in range(60)]
+
+    sink = LogFileSink(batch_size=4, flush_interval_ms=10, max_bytes=400, backup_count=10)
+
+    async def _write():
+        await sink.start()
+        for line in lines:
+            sink.write(path, line)
+        await sink.stop()
+
+    asyncio.run(_write())
+    assert sink.rotations >= 3
+
+    # 翻页跨越当前文件和各轮转文件
+    assert read_log_page(path, 5)[0] == lines[-5:]
+    assert _read_backwards(path, 7) == lines
+
+    gz = _gzip_file(path)
+    assert [p.name for p in tmp_path.iterdir()] == [gz.name]
+    assert _read_backwards(gz, 7) == lines
+
+
+def test_resumed_run_appends_to_existing_gzip(tmp_path):
+    """压缩后恢复的运行继续写入，再次压缩时保留之前的日志"""
+    path = tmp_path / "greeting_20250101_000000.log"
+    first = _write_log(path, 40)
+    _gzip_file(path)
+
+    second = [json.dumps({"seq": 100 + i}) for i in range(15)]
+    path.write_text("\n".join(second) + "\n", encoding="utf-8")
+    gz = _gzip_file(path)
+
+    assert [p.name for p in tmp_path.iterdir()] == [gz.name]
+    assert _read_backwards(gz, 9) == first + second
+
+
+def test_run_lifecycle_and_compression(session_maker, tmp_path):
+    path = tmp_path / "greeting_20250101_000000.log"
+    _write_log(path, 5)
+
+    async def _run():
+        async with session_maker() as session:
+            run_id = await start_run(session, 10, ["Python"], "job-a", path)
+            other_id = await start_run(session, 3, [], "", None)
+            await finish_run(session, run_id, {
+                "status": "completed", "success_count": 8, "total_processed": 12,
+                "phases": {"card_click": {"count": 12}}, "counters": {},
+            })
+
+            runs, next_cursor = await list_runs(session, limit=1)
+            assert [r.id for r in runs] == [other_id] and next_cursor
+            runs, next_cursor = await list_runs(session, cursor=next_cursor, limit=1)
+            assert [r.id for r in runs] == [run_id] and next_cursor is None
+
+            # 刚结束的运行不压缩
+            assert await compress_old_runs(session) == 0
+            await session.execute(
+                update(GreetingRun).where(GreetingRun.id == run_id)
+                .values(ended_at=datetime.now() - timedelta(days=8))
+            )
+            await session.commit()
+            assert await compress_old_runs(session) == 1
+            return await session.get(GreetingRun, run_id)
+
+    run = asyncio.run(_run())
+    assert run.status == "completed" and run.success_count == 8 and run.target_count == 10
+    assert json.loads(run.expected_positions) == ["Python"]
+    assert json.loads(run.metrics)["phases"]["card_click"]["count"] == 12
+    assert run.log_compressed and run.log_file.endswith(".log.gz")
+    assert resolve_log_file(run).exists() and not path.exists()
+
+
+def test_backfill_reads_summary_from_file_tail(session_maker, tmp_path):
+    # 旧版：分隔行 + 多行 JSON 摘要
+    legacy = tmp_path / "greeting_20250102_080000.log"
+    _write_log(legacy, 3)
+    with open(legacy, "a", encoding="utf-8") as f:
+        summary = {"type": "SUMMARY", "timestamp": "2025-01-02T08:10:00", "status": "completed", "success_count": 2}
+        f.write("\n" + "=" * 50 + "\n" + json.dumps(summary, indent=2) + "\n")
+
+    # 新版：单行摘要，已压缩
+    current = tmp_path / "greeting_20250103_080000.log"
+    _write_log(current, 3)
+    with open(current, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "SUMMARY", "status": "limit_reached", "success_count": 5}) + "\n")
+    _gzip_file(current)
+
+    # 没有摘要（进程中途退出）
+    _write_log(tmp_path / "greeting_20250104_080000.log", 3)
+
+    async def _run():
+        async with session_maker() as session:
+            added = await backfill_runs(session, tmp_path)
+            again = await backfill_runs(session, tmp_path)
+            runs, _ = await list_runs(session)
+            return added, again, runs
+
+    added, again, runs = asyncio.run(_run())
+    assert (added, again) == (3, 0)
+    assert [(r.created_at, r.status, r.success_count, r.log_compressed) for r in runs] == [
+        (datetime(2025, 1, 4, 8), "interrupted", 0, False),
+        (datetime(2025, 1, 3, 8), "limit_reached", 5, True),
+        (datetime(2025, 1, 2, 8), "completed", 2, False),
+    ]
+    assert runs[2].ended_at == datetime(2025, 1, 2, 8, 10)
+    with gzip.open(runs[1].log_file, "rt", encoding="utf-8") as f:
+        assert f.read().count("\n") == 4
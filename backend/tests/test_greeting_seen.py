@@ -0,0 +1,55 @@
+"""
+测试打招呼已处理候选人集合
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.greeting import GreetingOutcome, GreetingSeenCandidate
+from app.services.greeting_seen import clear_seen, load_seen, mark_seen
+
+
+def test_seen_set_is_per_job_and_respects_ttl(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            await mark_seen(session, "job-a", [("g1", "张三", GreetingOutcome.GREETED), ("g2", "李四", GreetingOutcome.ALREADY_CONTACTED)])
+            await mark_seen(session, "job-b", [("g3", "王五", GreetingOutcome.GREETED), (None, "无ID", GreetingOutcome.GREETED)])
+
+            # g1 是 10 天前处理的
+            await session.execute(
+                update(GreetingSeenCandidate)
+                .where(GreetingSeenCandidate.geek_id == "g1")
+                .values(seen_at=datetime.now() - timedelta(days=10))
+            )
+            await session.commit()
+
+            result = (
+                await load_seen(session, "job-a"),
+                await load_seen(session, "job-a", ttl_days=7),
+                await load_seen(session, "job-b"),
+            )
+
+            # 再次处理时刷新处理时间
+            await mark_seen(session, "job-a", [("g1", "张三", GreetingOutcome.ALREADY_CONTACTED)])
+            refreshed = await load_seen(session, "job-a", ttl_days=7)
+            row = await session.get(GreetingSeenCandidate, ("job-a", "g1"))
+            return result, refreshed, row.outcome
+
+    (all_a, recent_a, all_b), refreshed, outcome = asyncio.run(_run())
+    assert all_a == {"g1", "g2"}
+    assert recent_a == {"g2"}
+    assert all_b == {"g3"}
+    assert refreshed == {"g1", "g2"}
+    assert outcome == "already_contacted"
+
+
+def test_clear_seen(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            await mark_seen(session, "job-a", [("g1", "张三", GreetingOutcome.GREETED)])
+            await mark_seen(session, "job-b", [("g2", "李四", GreetingOutcome.GREETED)])
+            deleted = await clear_seen(session, job_key="job-a")
+            return deleted, await load_seen(session, "job-a"), await load_seen(session, "job-b")
+
+    assert asyncio.run(_run()) == (1, set(), {"g2"})
@@ -0,0 +1,95 @@
+"""
+测试打招呼任务快照的原子写入与恢复
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.services import greeting_service
+from app.services.greeting_service import GreetingTaskManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch, session_maker):
+    monkeypatch.setattr(greeting_service, "LOGS_DIR", tmp_path)
+    manager = GreetingTaskManager()
+    manager.snapshot_path = tmp_path / "greeting_snapshot.json"
+    # 运行记录写入临时数据库，不使用项目的默认数据库
+    manager.session_maker = session_maker
+    return manager
+
+
+def test_snapshot_is_throttled_and_atomic(manager):
+    manager.processed_ids = {"张三|Java", "李四|"}
+    manager.success_count = 1
+
+    asyncio.run(manager.save_snapshot())
+    assert not manager.snapshot_path.exists()
+
+    asyncio.run(manager.save_snapshot(force=True))
+    snapshot = json.loads(manager.snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot["processed_ids"] == ["张三|Java", "李四|"]
+    assert snapshot["success_count"] == 1
+    assert list(manager.snapshot_path.parent.glob("*.tmp")) == []
+
+    for _ in range(greeting_service.SNAPSHOT_EVERY - 1):
+        asyncio.run(manager.save_snapshot())
+    manager.processed_ids.add("王五|Go")
+    asyncio.run(manager.save_snapshot())
+    assert len(manager.load_snapshot()["processed_ids"]) == 3
+
+
+def test_invalid_snapshot_is_ignored(manager):
+    manager.snapshot_path.write_text("{not json", encoding="utf-8")
+    assert manager.load_snapshot() is None
+
+
+def test_resume_restores_progress(manager):
+    previous = GreetingTaskManager()
+    previous.snapshot_path = manager.snapshot_path
+    previous.status = "running"
+    previous.processed_ids = {"张三|Java", "李四|Python"}
+    previous.success_count = 2
+    previous.skipped_count = 1
+    previous.expected_positions = ["Java"]
+    previous.log_file_path = manager.snapshot_path.parent / "greeting_old.log"
+    asyncio.run(previous.save_snapshot(force=True))
+
+    async def _run():
+        await manager.start_greeting_task(target_count=5, resume=True)
+        state = (set(manager.processed_ids), manager.success_count, manager.skipped_count,
+                 manager.expected_positions, manager.log_file_path)
+        # 没有浏览器，后台任务立即出错结束，快照保留
+        await manager.task
+        return state
+
+    processed, success, skipped, positions, log_file = asyncio.run(_run())
+    assert processed == {"张三|Java", "李四|Python"}
+    assert (success, skipped) == (2, 1)
+    assert positions == ["Java"]
+    assert log_file == previous.log_file_path
+    assert manager.status == "error"
+    assert manager.load_snapshot()["processed_ids"] == ["张三|Java", "李四|Python"]
+
+
+def test_resume_without_snapshot_fails(manager):
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.start_greeting_task(target_count=5, resume=True))
+
+
+def test_snapshot_written_off_event_loop(manager, monkeypatch):
+    import threading
+
+    threads = []
+    write = greeting_service._write_snapshot
+
+    def _write(path, state):
+        threads.append(threading.current_thread())
+        write(path, state)
+
+    monkeypatch.setattr(greeting_service, "_write_snapshot", _write)
+    asyncio.run(manager.save_snapshot(force=True))
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert manager.load_snapshot() is not None
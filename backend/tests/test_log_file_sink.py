@@ -0,0 +1,56 @@
+"""
+测试任务日志文件异步写入器
+"""
+import asyncio
+
+from app.services.log_file_sink import LogFileSink
+
+
+def test_lines_are_batched_and_synced(tmp_path):
+    path = tmp_path / "greeting.log"
+    sink = LogFileSink(batch_size=50, flush_interval_ms=1000)
+
+    async def _run():
+        await sink.start()
+        for i in range(120):
+            sink.write(path, f"line {i}")
+        # 调用方不等待磁盘 I/O
+        assert sink.written_lines == 0
+        await sink.sync()
+        synced = path.read_text(encoding="utf-8").splitlines()
+        sink.write(path, "last")
+        await sink.stop()
+        return synced
+
+    synced = asyncio.run(_run())
+    assert synced == [f"line {i}" for i in range(120)]
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == "last"
+    assert sink.flushes == 4
+    assert sink.syncs == 2  # 摘要一次 + 关闭一次
+
+
+def test_rotation_by_size(tmp_path):
+    path = tmp_path / "greeting.log"
+    sink = LogFileSink(batch_size=10, flush_interval_ms=10, max_bytes=200, backup_count=2)
+
+    async def _run():
+        await sink.start()
+        for i in range(10):
+            sink.write(path, f"{i:02d}" * 20)  # 每行 41 字节
+            await sink.sync()
+        await sink.stop()
+
+    asyncio.run(_run())
+    assert sink.rotations >= 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["greeting.log", "greeting.log.1", "greeting.log.2"]
+    for p in tmp_path.iterdir():
+        assert p.stat().st_size <= 200
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == "09" * 20
+
+
+def test_writes_directly_when_not_running(tmp_path):
+    path = tmp_path / "greeting.log"
+    sink = LogFileSink()
+    sink.write(path, "a")
+    sink.write(path, "b")
+    assert path.read_text(encoding="utf-8") == "a\nb\n"
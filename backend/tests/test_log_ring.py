@@ -0,0 +1,62 @@
+"""
+测试带序号的任务日志环形缓冲
+"""
+from datetime import datetime
+
+from app.utils.log_ring import LogRing
+
+
+def _seqs(records):
+    return [r.seq for r in records]
+
+
+def test_tail_and_since_after_wraparound():
+    ring = LogRing(capacity=4)
+    for i in range(6):
+        ring.append("INFO", f"m{i}")
+
+    assert len(ring) == 4
+    assert (ring.first_seq, ring.last_seq) == (3, 6)
+    assert [r.message for r in ring.tail(2)] == ["m4", "m5"]
+    assert _seqs(ring.tail(100)) == [3, 4, 5, 6]
+
+    # 只返回新增的条目
+    records, truncated = ring.since(4)
+    assert _seqs(records) == [5, 6] and not truncated
+    assert ring.since(6) == ([], False)
+
+    # 序号 2 之后的部分日志已被覆盖
+    records, truncated = ring.since(1)
+    assert _seqs(records) == [3, 4, 5, 6] and truncated
+
+    # 分页读取
+    records, _ = ring.since(2, limit=3)
+    assert _seqs(records) == [3, 4, 5]
+
+
+def test_clear_keeps_sequence_and_stale_seq_resets():
+    ring = LogRing(capacity=4)
+    ring.append("INFO", "a")
+    ring.append("INFO", "b")
+    ring.clear()
+    assert len(ring) == 0 and ring.tail(10) == []
+
+    ring.append("WARNING", "c")
+    records, truncated = ring.since(2)
+    assert [r.message for r in records] == ["c"] and not truncated
+    assert records[0].seq == 3
+
+    # 服务重启后客户端带来更大的序号
+    records, truncated = ring.since(50)
+    assert _seqs(records) == [3] and truncated
+
+
+def test_record_formats_lazily():
+    ring = LogRing()
+    record = ring.append("ERROR", "出错", ts=datetime(2025, 1, 2, 3, 4, 5).timestamp())
+    assert record.to_dict() == {
+        "seq": 1,
+        "timestamp": "2025-01-02T03:04:05",
+        "level": "ERROR",
+        "message": "出错",
+    }
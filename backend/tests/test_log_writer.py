@@ -0,0 +1,47 @@
+"""
+测试日志组提交写入器
+"""
+import asyncio
+
+from sqlmodel import select
+
+from app.models.log_entry import LogAction, LogEntry
+from app.services.log_writer import LogWriter
+from app.services import logging_service
+from app.services.logging_service import LoggingService
+
+
+def test_writer_batches_and_drains_on_stop(session_maker, monkeypatch):
+    writer = LogWriter(batch_size=100, flush_interval_ms=50)
+    monkeypatch.setattr(logging_service, "log_writer", writer)
+
+    async def _run():
+        await writer.start(session_maker.kw["bind"])
+        async with session_maker() as session:
+            service = LoggingService(session)
+            for i in range(250):
+                await service.log(action=LogAction.SEARCH, message=f"m{i}")
+            queued = writer.get_metrics()["queue_depth"]
+
+            await writer.stop()
+
+            rows = (await session.execute(select(LogEntry).order_by(LogEntry.id))).scalars().all()
+            return queued, rows, writer.get_metrics()
+
+    queued, rows, metrics = asyncio.run(_run())
+
+    assert queued > 0
+    assert [row.message for row in rows] == [f"m{i}" for i in range(250)]
+    assert metrics["running"] is False
+    assert metrics["flushed_entries"] == 250
+    assert metrics["flushed_batches"] >= 3
+    assert metrics["failed_entries"] == 0
+
+
+def test_write_is_immediate(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            entry = await LoggingService(session).write(action=LogAction.SEARCH, message="now")
+            return entry.id
+
+    assert asyncio.run(_run()) is not None
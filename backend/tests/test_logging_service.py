@@ -0,0 +1,53 @@
+"""
+测试日志计数与分批清理
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app.models.log_entry import LogAction, LogEntry, LogLevel
+from app.services.logging_service import LoggingService
+
+
+def _entries(count, created_at, level=LogLevel.INFO):
+    return [
+        LogEntry(level=level, action=LogAction.SEARCH, message=f"m{i}", created_at=created_at)
+        for i in range(count)
+    ]
+
+
+def test_count_logs_capped_and_estimated(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            session.add_all(_entries(8, datetime.now()) + _entries(3, datetime.now(), LogLevel.ERROR))
+            await session.commit()
+            service = LoggingService(session)
+            return (
+                await service.count_logs(),
+                await service.count_logs(level=LogLevel.ERROR),
+                await service.count_logs(cap=5),
+                await service.count_logs(level=LogLevel.INFO, cap=5),
+            )
+
+    exact, filtered, estimated, capped = asyncio.run(_run())
+    assert exact == (11, True)
+    assert filtered == (3, True)
+    assert estimated == (11, False)
+    assert capped == (5, False)
+
+
+def test_clear_old_logs_in_batches(session_maker):
+    old = datetime.now() - timedelta(days=40)
+
+    async def _run():
+        async with session_maker() as session:
+            session.add_all(_entries(25, old) + _entries(4, datetime.now()))
+            await session.commit()
+            deleted = await LoggingService(session).clear_old_logs(days=30, batch_size=10)
+            remaining = (await session.execute(select(LogEntry))).scalars().all()
+            return deleted, remaining
+
+    deleted, remaining = asyncio.run(_run())
+    assert deleted == 25
+    assert len(remaining) == 4
@@ -0,0 +1,99 @@
+"""
+测试数据库迁移
+在临时数据库上验证迁移可以原地执行、重复执行安全
+"""
+import asyncio
+import sqlite3
+
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401  确保模型已注册到元数据
+from app.database import build_engine
+from app.migrations import MIGRATIONS, run_migrations
+
+
+def _init(db_path) -> list:
+    """创建表并执行迁移，返回本次应用的迁移版本"""
+    async def _run():
+        engine = build_engine(f"sqlite+aiosqlite:///{db_path}", profile="production", echo=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            applied = await conn.run_sync(run_migrations)
+        await engine.dispose()
+        return applied
+
+    return asyncio.run(_run())
+
+
+def test_migrations_apply_once(tmp_path):
+    db_path = tmp_path / "database.db"
+
+    applied = _init(db_path)
+    assert applied == [m.version for m in MIGRATIONS]
+
+    # 第二次启动不再重复执行
+    assert _init(db_path) == []
+
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    conn.close()
+
+    assert version == MIGRATIONS[-1].version
+    assert "ix_greeting_records_candidate_id" in indexes
+    assert "ix_log_entries_level_created_at" in indexes
+
+
+def test_migrations_upgrade_existing_database(tmp_path):
+    """旧版本数据库（user_version=0 且已有数据）可以直接升级"""
+    db_path = tmp_path / "database.db"
+    _init(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP INDEX ix_greeting_records_candidate_id")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+    assert _init(db_path) == [m.version for m in MIGRATIONS]
+
+    conn = sqlite3.connect(db_path)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM greeting_records WHERE candidate_id = 1"
+    ).fetchall()
+    conn.close()
+    assert any("ix_greeting_records_candidate_id" in row[-1] for row in plan)
+
+
+def test_deferred_migration_is_retried(tmp_path, monkeypatch):
+    """前置条件不满足的迁移不记为已应用，之后的迁移照常执行，下次启动时重试"""
+    from app import migrations
+    from app.migrations import Migration, MigrationDeferred
+
+    supported = {"fts": False}
+    ran = []
+
+    def _needs_extension(conn):
+        if not supported["fts"]:
+            raise MigrationDeferred("缺少扩展")
+        ran.append(1)
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        Migration(1, "需要扩展", _needs_extension),
+        Migration(2, "普通迁移", lambda conn: ran.append(2)),
+    ])
+    db_path = tmp_path / "database.db"
+
+    assert _init(db_path) == [2]
+    assert _init(db_path) == []
+
+    supported["fts"] = True
+    assert _init(db_path) == [1]
+    assert _init(db_path) == []
+    assert ran == [2, 1]
+
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    pending = conn.execute("SELECT version FROM schema_deferred_migrations").fetchall()
+    conn.close()
+    assert version == 2 and pending == []
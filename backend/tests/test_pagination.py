@@ -0,0 +1,71 @@
+"""
+测试游标分页
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.log_entry import LogEntry, LogAction
+from app.services.logging_service import LoggingService
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
+
+
+def test_cursor_roundtrip():
+    ts = datetime(2025, 11, 3, 18, 8, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_pages_are_stable(session_maker):
+    """相同时间戳的行按 id 区分，翻页过程中插入新行不影响后续页"""
+    base = datetime(2025, 1, 1)
+
+    async def _run():
+        async with session_maker() as session:
+            session.add_all([
+                LogEntry(action=LogAction.SEARCH, message=f"log {i}", created_at=base + timedelta(seconds=i // 3))
+                for i in range(25)
+            ])
+            await session.commit()
+
+            seen = []
+            cursor = None
+            while True:
+                result = await session.execute(apply_keyset(select(LogEntry), LogEntry, cursor, 10))
+                page, cursor = split_page(result.scalars().all(), 10)
+                seen.extend(log.id for log in page)
+
+                # 翻页过程中插入更新的日志
+                session.add(LogEntry(action=LogAction.SEARCH, message="new", created_at=base + timedelta(days=1)))
+                await session.commit()
+
+                if cursor is None:
+                    break
+            return seen
+
+    seen = asyncio.run(_run())
+    assert seen == list(range(25, 0, -1))
+
+
+def test_logging_service_cursor(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            service = LoggingService(session)
+            for i in range(5):
+                await service.log(action=LogAction.SEARCH, message=f"log {i}")
+
+            first, total, exact, cursor = await service.get_logs(limit=3)
+            second, _, _, end = await service.get_logs(limit=3, cursor=cursor)
+            return [l.message for l in first], [l.message for l in second], total, end
+
+    first, second, total, end = asyncio.run(_run())
+    assert total == 5
+    assert first == ["log 4", "log 3", "log 2"]
+    assert second == ["log 1", "log 0"]
+    assert end is None
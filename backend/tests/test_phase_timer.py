@@ -0,0 +1,49 @@
+"""
+测试分阶段耗时统计
+"""
+import time
+
+from app.utils.phase_timer import PhaseTimer
+
+
+def test_percentiles_and_histogram():
+    timer = PhaseTimer()
+    for ms in range(1, 101):
+        timer.record("resume_wait", ms)
+    timer.record("reload", 3000)
+    timer.incr("reloads")
+    timer.incr("click_retries", 2)
+
+    summary = timer.summary()
+    wait = summary["phases"]["resume_wait"]
+    assert (wait["count"], wait["p50_ms"], wait["p95_ms"], wait["max_ms"]) == (100, 51, 95, 100)
+    assert wait["histogram"] == {"<=10ms": 10, "<=25ms": 15, "<=50ms": 25, "<=100ms": 50}
+    # 按累计耗时从高到低
+    assert list(summary["phases"]) == ["resume_wait", "reload"]
+    assert summary["counters"] == {"reloads": 1, "click_retries": 2}
+    assert "histogram" not in timer.summary(histogram=False)["phases"]["reload"]
+
+
+def test_nested_phases_record_self_time():
+    timer = PhaseTimer()
+    with timer.phase("button_lookup"):
+        time.sleep(0.01)
+        with timer.phase("human_delay"):
+            time.sleep(0.03)
+        timer.record("human_delay", 5)
+
+    phases = timer.summary()["phases"]
+    assert phases["human_delay"]["count"] == 2
+    assert 5 <= phases["button_lookup"]["total_ms"] < 30
+
+
+def test_phase_is_recorded_on_exception():
+    timer = PhaseTimer()
+    try:
+        with timer.phase("card_click"):
+            raise RuntimeError("intercepted")
+    except RuntimeError:
+        pass
+
+    assert timer.summary()["phases"]["card_click"]["count"] == 1
+    assert timer._stack == []
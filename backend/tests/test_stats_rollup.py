@@ -0,0 +1,87 @@
+"""
+测试统计汇总表的触发器维护
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.models.automation_task import AutomationTask, TaskStatus
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.greeting import GreetingOutcome, GreetingRecord
+from app.models.greeting_template import GreetingTemplate
+from app.services.stats_service import get_rollup_counters
+
+
+def test_rollup_follows_writes(session_maker):
+    yesterday = datetime.now() - timedelta(days=1)
+
+    async def _run():
+        async with session_maker() as session:
+            a = Candidate(boss_id="a", name="A", position="P")
+            b = Candidate(boss_id="b", name="B", position="P", created_at=yesterday)
+            task = AutomationTask(name="t", search_keywords="k")
+            template = GreetingTemplate(name="tpl", content="你好 {name}")
+            session.add_all([a, b, task, template])
+            await session.commit()
+
+            session.add_all([
+                GreetingRecord(candidate_id=a.id, message="hi", success=True),
+                GreetingRecord(candidate_id=b.id, message="hi", success=False, sent_at=yesterday),
+            ])
+            a.status = CandidateStatus.CONTACTED
+            task.status = TaskStatus.RUNNING
+            template.is_active = False
+            await session.commit()
+
+            await session.delete(b)
+            await session.commit()
+
+            return await get_rollup_counters(session, date.today())
+
+    counters = asyncio.run(_run())
+    totals, today = counters["all"], counters["day"]
+
+    assert totals["candidates.total"] == 1
+    assert totals["candidates.status.CONTACTED"] == 1
+    assert totals["candidates.status.NEW"] == 0
+    assert today["candidates.added"] == 1
+    assert totals["greetings.total"] == 2
+    assert totals["greetings.success"] == 1
+    assert today["greetings.sent"] == 1
+    assert totals["tasks.total"] == 1
+    assert totals["tasks.status.RUNNING"] == 1
+    assert totals["tasks.status.PENDING"] == 0
+    assert totals["templates.total"] == 1
+    assert totals["templates.active"] == 0
+
+
+def test_rebuild_matches_triggers(session_maker):
+    """迁移完成后全量重算的结果与触发器增量维护的值一致"""
+    from sqlalchemy import text
+
+    from app.migrations import rebuild_stats_rollup
+
+    async def _snapshot(session):
+        rows = await session.execute(text("SELECT bucket, metric, value FROM stats_rollup WHERE value != 0"))
+        return set(rows.all())
+
+    async def _run():
+        async with session_maker() as session:
+            a = Candidate(boss_id="a", name="A", position="P", status=CandidateStatus.CONTACTED)
+            session.add_all([a, AutomationTask(name="t", search_keywords="k"), GreetingTemplate(name="tpl", content="hi")])
+            await session.commit()
+            session.add_all([
+                GreetingRecord(candidate_id=a.id, message="hi", success=True),
+                GreetingRecord(candidate_id=a.id, message="hi", success=True, outcome=GreetingOutcome.GREETED.value),
+                GreetingRecord(candidate_id=a.id, message="", success=False, outcome=GreetingOutcome.SKIPPED_MISMATCH.value),
+                GreetingRecord(candidate_id=a.id, message="", success=False, outcome=GreetingOutcome.FAILED.value),
+            ])
+            await session.commit()
+            maintained = await _snapshot(session)
+
+            conn = await session.connection()
+            await conn.run_sync(rebuild_stats_rollup)
+            return maintained, await _snapshot(session)
+
+    maintained, rebuilt = asyncio.run(_run())
+    assert ("all", "greetings.total", 2) in maintained
+    assert rebuilt == maintained
@@ -0,0 +1,89 @@
+"""
+测试自动化任务断点续跑与清理
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import func, select
+
+from app.models.automation_task import AutomationTask, AutomationTaskCheckpoint, TaskStatus
+from app.models.greeting import GreetingRecord
+from app.routes import automation
+from app.services.task_checkpoint import gc_checkpoints, recover_interrupted_tasks
+from tests.test_task_control import FakeAutomation
+
+
+def test_resume_from_checkpoint_without_research(session_maker, monkeypatch):
+    async def _run():
+        async with session_maker() as session:
+            task = AutomationTask(name="t", search_keywords="k")
+            session.add(task)
+            await session.commit()
+            task_id = task.id
+
+        fake = FakeAutomation(task_id, total=12, pause_after=5)
+
+        async def _service():
+            return fake
+
+        monkeypatch.setattr(automation, "get_automation_service", _service)
+
+        await automation.run_automation_task(task_id, session_maker)
+        async with session_maker() as session:
+            paused = await session.get(AutomationTask, task_id)
+            checkpoint = await session.get(AutomationTaskCheckpoint, task_id)
+            paused_state = (paused.status, checkpoint.next_index)
+
+        fake.pause_after = None
+        await automation.run_automation_task(task_id, session_maker)
+
+        async with session_maker() as session:
+            task = await session.get(AutomationTask, task_id)
+            records = (await session.execute(select(func.count(GreetingRecord.id)))).scalar()
+            checkpoint = await session.get(AutomationTaskCheckpoint, task_id)
+            return fake, paused_state, task, records, checkpoint
+
+    fake, paused_state, task, records, checkpoint = asyncio.run(_run())
+
+    assert paused_state == (TaskStatus.PAUSED, 5)
+    assert fake.searches == 1
+    assert fake.sent == [f"g{i}" for i in range(12)]
+    assert task.status == TaskStatus.COMPLETED
+    assert task.total_success == 12
+    assert records == 12
+    assert checkpoint is None
+
+
+def test_recover_and_gc(session_maker):
+    async def _run():
+        async with session_maker() as session:
+            tasks = [
+                AutomationTask(name="running", search_keywords="k", status=TaskStatus.RUNNING),
+                AutomationTask(name="done", search_keywords="k", status=TaskStatus.COMPLETED),
+                AutomationTask(name="old", search_keywords="k", status=TaskStatus.PAUSED),
+            ]
+            session.add_all(tasks)
+            await session.commit()
+            running_id = tasks[0].id
+            session.add_all([
+                AutomationTaskCheckpoint(task_id=tasks[0].id, candidates="[]"),
+                AutomationTaskCheckpoint(task_id=tasks[1].id, candidates="[]"),
+                AutomationTaskCheckpoint(task_id=tasks[2].id, candidates="[]",
+                                         updated_at=datetime.now() - timedelta(days=30)),
+                AutomationTaskCheckpoint(task_id=999, candidates="[]"),
+            ])
+            await session.commit()
+
+            recovered = await recover_interrupted_tasks(session)
+            removed = await gc_checkpoints(session)
+            remaining = (await session.execute(select(AutomationTaskCheckpoint.task_id))).scalars().all()
+            session.expire_all()
+            status = (await session.get(AutomationTask, running_id)).status
+            return recovered, removed, remaining, status, running_id
+
+    recovered, removed, remaining, status, running_id = asyncio.run(_run())
+
+    assert recovered == 1
+    assert status == TaskStatus.PAUSED
+    assert removed == 3
+    assert remaining == [running_id]
@@ -0,0 +1,160 @@
+"""
+测试自动化任务的暂停信号与进度批量提交
+"""
+import asyncio
+
+from sqlmodel import func, select
+
+from app.models.automation_task import AutomationTask, TaskStatus
+from app.models.greeting import GreetingRecord
+from app.routes import automation
+from app.services.task_control import task_controls
+
+
+class FakeAutomation:
+    """模拟浏览器自动化：发送第 pause_after 条问候后请求暂停"""
+
+    is_logged_in = True
+
+    def __init__(self, task_id, total, pause_after=None):
+        self.task_id = task_id
+        self.total = total
+        self.pause_after = pause_after
+        self.sent = []
+        self.searches = 0
+
+    async def search_candidates(self, **kwargs):
+        self.searches += 1
+        return [
+            {"boss_id": f"g{i}", "name": f"N{i}", "position": "P", "active_time": "刚刚活跃"}
+            for i in range(self.total)
+        ]
+
+    async def send_greeting(self, candidate_boss_id, message, use_random_delay=True):
+        self.sent.append(candidate_boss_id)
+        if len(self.sent) == self.pause_after:
+            task_controls.signal(self.task_id, TaskStatus.PAUSED)
+        return True
+
+    async def check_for_issues(self):
+        return None
+
+
+def _run_task(session_maker, monkeypatch, total, pause_after=None):
+    async def _run():
+        async with session_maker() as session:
+            task = AutomationTask(name="t", search_keywords="k")
+            session.add(task)
+            await session.commit()
+            task_id = task.id
+
+        fake = FakeAutomation(task_id, total, pause_after)
+
+        async def _service():
+            return fake
+
+        monkeypatch.setattr(automation, "get_automation_service", _service)
+
+        await automation.run_automation_task(task_id, session_maker)
+
+        async with session_maker() as session:
+            task = await session.get(AutomationTask, task_id)
+            records = (await session.execute(select(func.count(GreetingRecord.id)))).scalar()
+            return fake, task, records
+
+    return asyncio.run(_run())
+
+
+def test_run_completes_and_flushes_all_records(session_maker, monkeypatch):
+    fake, task, records = _run_task(session_maker, monkeypatch, total=23)
+
+    assert task.status == TaskStatus.COMPLETED
+    assert records == 23
+    assert task.total_contacted == 23
+    assert task.total_success == 23
+    assert task.progress == 100
+    assert task_controls.get(task.id) is None
+
+
+def test_pause_signal_stops_loop_and_keeps_status(session_maker, monkeypatch):
+    fake, task, records = _run_task(session_maker, monkeypatch, total=30, pause_after=7)
+
+    assert len(fake.sent) == 7
+    assert task.status == TaskStatus.PAUSED
+    assert task.completed_at is None
+    # 未达到批量提交阈值的最后几条记录也已写入
+    assert records == 7
+    assert task.total_contacted == 7
+
+
+def test_failure_is_recorded_with_fresh_session(session_maker, monkeypatch):
+    async def _boom(self, **kwargs):
+        raise RuntimeError("搜索失败")
+
+    monkeypatch.setattr(FakeAutomation, "search_candidates", _boom)
+    fake, task, records = _run_task(session_maker, monkeypatch, total=3)
+
+    assert task.status == TaskStatus.FAILED
+    assert task.error_message == "搜索失败"
+    assert records == 0
+
+
+def test_sent_greetings_committed_before_next_send(session_maker, monkeypatch):
+    """进程在任意两次发送之间退出时，已发送的问候都有记录，断点指向下一个候选人"""
+    from app.models.automation_task import AutomationTaskCheckpoint
+
+    committed = []
+
+    async def _send(self, candidate_boss_id, message, use_random_delay=True):
+        async with session_maker() as other:
+            records = (await other.execute(select(func.count(GreetingRecord.id)))).scalar()
+            checkpoint = await other.get(AutomationTaskCheckpoint, self.task_id)
+            committed.append((len(self.sent), records, checkpoint.next_index))
+        self.sent.append(candidate_boss_id)
+        return True
+
+    monkeypatch.setattr(FakeAutomation, "send_greeting", _send)
+    fake, task, records = _run_task(session_maker, monkeypatch, total=4)
+
+    assert task.status == TaskStatus.COMPLETED
+    assert committed == [(0, 0, 0), (1, 1, 1), (2, 2, 2), (3, 3, 3)]
+
+
+def test_progress_written_in_batches(session_maker, monkeypatch):
+    """每条问候单独提交，任务进度每 PROGRESS_FLUSH_EVERY 条才写入一次"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.services.task_control import PROGRESS_FLUSH_EVERY
+
+    commits = []
+    progress_seen = []
+    original_commit = AsyncSession.commit
+
+    async def _commit(self):
+        commits.append(1)
+        await original_commit(self)
+
+    async def _send(self, candidate_boss_id, message, use_random_delay=True):
+        async with session_maker() as other:
+            stored = await other.get(AutomationTask, self.task_id)
+            progress_seen.append(stored.total_contacted)
+        self.sent.append(candidate_boss_id)
+        return True
+
+    monkeypatch.setattr(AsyncSession, "commit", _commit)
+    monkeypatch.setattr(FakeAutomation, "send_greeting", _send)
+
+    def _count(total):
+        commits.clear()
+        progress_seen.clear()
+        _run_task(session_maker, monkeypatch, total=total)
+        return len(commits)
+
+    # 扣除与候选人数无关的提交（创建任务、开始运行、结束等）
+    base = _count(0)
+    extra = _count(23) - base
+    # 23 条问候各提交一次，进度分 3 批写入
+    assert extra == 23 + 3
+    assert progress_seen == [
+        i // PROGRESS_FLUSH_EVERY * PROGRESS_FLUSH_EVERY for i in range(23)
+    ]
@@ -0,0 +1,50 @@
+"""
+测试问候模板编译与渲染
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.greeting_template import GreetingTemplate
+from app.utils.template_renderer import (
+    TemplateError,
+    compile_template,
+    get_renderer,
+    render_batch,
+    validate_template,
+)
+
+
+def test_fields_fallbacks_and_defaults():
+    render = compile_template("你好{name}，{company|expected_position|贵公司}的{position}岗位{{急招}}")
+
+    assert render({"name": "张三", "company": "字节", "position": "开发"}) == "你好张三，字节的开发岗位{急招}"
+    assert render({"name": "李四", "expected_position": "算法", "position": "开发"}) == "你好李四，算法的开发岗位{急招}"
+    assert render({"name": "王五", "company": None, "position": "开发"}) == "你好王五，贵公司的开发岗位{急招}"
+
+    candidate = Candidate(boss_id="x", name="赵六", position="测试")
+    assert compile_template("{name}-{company|}-{position}")(candidate) == "赵六--测试"
+
+
+def test_unknown_placeholders():
+    with pytest.raises(TemplateError):
+        validate_template("你好 {nmae}")
+    with pytest.raises(TemplateError):
+        validate_template("{贵公司|company}")
+
+    validate_template("你好 {name}，{company|贵公司}")
+    # 运行时不因历史模板中的未知变量失败，按原文输出
+    assert compile_template("{nmae} {name} {")({"name": "A"}) == "{nmae} A {"
+
+
+def test_renderer_cache_follows_updated_at():
+    now = datetime.now()
+    template = GreetingTemplate(id=1, name="t", content="你好{name}", updated_at=now)
+
+    first = get_renderer(template)
+    assert get_renderer(template) is first
+
+    template.content = "您好{name}"
+    template.updated_at = now + timedelta(seconds=1)
+    assert render_batch(template, [{"name": "A"}, {"name": "B"}]) == ["您好A", "您好B"]
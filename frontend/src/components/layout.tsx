@@ -2,7 +2,7 @@
  * 应用布局组件 - 左右分栏布局
  */
 import { Link, useLocation } from 'react-router-dom';
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useRef, useCallback } from 'react';
 import { LayoutDashboard, Zap, Settings, UserCog, Bell, ChevronDown, Check } from 'lucide-react';
 import { toast } from 'sonner';
 import { Badge } from '@/components/ui/badge';
@@ -18,6 +18,7 @@ import {
   DropdownMenuSeparator,
 } from '@/components/ui/dropdown-menu';
 import { useCurrentAccount } from '@/hooks/useCurrentAccount';
+import { useEventStream } from '@/hooks/useEventStream';
 
 const navigation = [
   { name: '快速启动', href: '/wizard', icon: Zap },
@@ -27,11 +28,15 @@ const navigation = [
   { name: '系统设置', href: '/settings', icon: Settings },
 ];
 
+// 日志区域显示的最近日志条数
+const MAX_LOGS = 100;
+
 interface LayoutProps {
   children: React.ReactNode;
 }
 
 interface GreetingLog {
+  seq: number;
   timestamp: string;
   level: string;
   message: string;
@@ -56,44 +61,58 @@ export function Layout({ children }: LayoutProps) {
   const [status, setStatus] = useState<GreetingStatus | null>(null);
   const [autoScroll, setAutoScroll] = useState(true);
   const logsEndRef = useRef<HTMLDivElement>(null);
-  const pollingIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
 
   // 账号管理
   const { currentAccount, allAccounts, switching, switchToAccount } = useCurrentAccount();
 
-  // 轮询日志和状态
-  useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const statusRes = await fetch('/api/greeting/status');
-        if (!statusRes.ok) {
-          // API不可用或没有任务运行，不报错
-          return;
-        }
-        const statusData = await statusRes.json();
-        setStatus(statusData);
-
-        const logsRes = await fetch('/api/greeting/logs?last_n=100');
-        if (logsRes.ok) {
-          const logsData = await logsRes.json();
-          setLogs(logsData.logs || []);
-        }
-      } catch (error) {
-        // 静默处理错误，避免控制台大量错误信息
-        // console.error('获取日志失败:', error);
+  // 拉取完整的状态和最近日志（首次连接事件流及收到 reset 时）
+  const fetchData = useCallback(async () => {
+    try {
+      const statusRes = await fetch('/api/greeting/status');
+      if (!statusRes.ok) {
+        // API不可用或没有任务运行，不报错
+        return;
       }
-    };
-
-    fetchData();
-    pollingIntervalRef.current = setInterval(fetchData, 2000); // 改为2秒轮询
+      const statusData = await statusRes.json();
+      setStatus(statusData);
 
-    return () => {
-      if (pollingIntervalRef.current) {
-        clearInterval(pollingIntervalRef.current);
+      const logsRes = await fetch(`/api/greeting/logs?last_n=${MAX_LOGS}`);
+      if (logsRes.ok) {
+        const logsData = await logsRes.json();
+        const fetched: GreetingLog[] = logsData.logs || [];
+        // 保留拉取期间通过事件流收到的更新的日志
+        setLogs((prev) => {
+          const last = fetched[fetched.length - 1];
+          const newer = last ? prev.filter((log) => log.seq > last.seq) : prev;
+          return [...fetched, ...newer].slice(-MAX_LOGS);
+        });
       }
-    };
+    } catch (error) {
+      // 静默处理错误，避免控制台大量错误信息
+      // console.error('获取日志失败:', error);
+    }
   }, []);
 
+  // 订阅状态变化和新日志（服务端只推送变化的字段和新增的日志行）
+  useEventStream(
+    'greeting',
+    {
+      'greeting.status': (delta: Partial<GreetingStatus>) => {
+        setStatus((prev) => (prev ? { ...prev, ...delta } : prev));
+      },
+      'greeting.log': (log: GreetingLog) => {
+        setLogs((prev) => {
+          const last = prev[prev.length - 1];
+          if (last && log.seq <= last.seq) {
+            return prev;
+          }
+          return [...prev, log].slice(-MAX_LOGS);
+        });
+      },
+    },
+    fetchData
+  );
+
   // 自动滚动到底部
   useEffect(() => {
     if (autoScroll && logsEndRef.current) {
@@ -200,8 +219,8 @@ export function Layout({ children }: LayoutProps) {
                   暂无日志记录
                 </div>
               ) : (
-                logs.map((log, index) => (
-                  <div key={index} className="flex items-start gap-2 hover:bg-gray-900 px-2 py-0.5 rounded">
+                logs.map((log) => (
+                  <div key={log.seq} className="flex items-start gap-2 hover:bg-gray-900 px-2 py-0.5 rounded">
                     <span className="text-gray-500 shrink-0 text-[10px]">
                       {formatTime(log.timestamp)}
                     </span>
@@ -0,0 +1,60 @@
+/**
+ * 服务端事件流 Hook（SSE）
+ *
+ * 浏览器断线后自动重连并带上 Last-Event-ID，服务端补发断线期间的事件；
+ * 无法补发时收到 reset 事件，此时调用 onReset 重新拉取完整状态
+ */
+import { useEffect, useRef } from 'react';
+import { API_BASE_URL } from '@/lib/api';
+
+export type EventHandlers = Record<string, (data: any) => void>;
+
+/**
+ * 订阅事件流
+ *
+ * @param topics 逗号分隔的事件前缀，如 'greeting' 或 'task'
+ * @param handlers 事件名到处理函数的映射，如 { 'greeting.log': (log) => ... }
+ * @param onReset 需要重新拉取完整状态时调用（首次连接时也会调用一次）
+ */
+export function useEventStream(topics: string, handlers: EventHandlers, onReset: () => void) {
+  // 处理函数放在 ref 中，重新渲染时不重建连接
+  const handlersRef = useRef(handlers);
+  const onResetRef = useRef(onReset);
+  handlersRef.current = handlers;
+  onResetRef.current = onReset;
+
+  useEffect(() => {
+    const source = new EventSource(`${API_BASE_URL}/events?topics=${encodeURIComponent(topics)}`);
+    // 是否收到过事件（收到过时重连由服务端补发，不需要重新拉取）
+    let received = false;
+
+    // 先建立连接再拉取完整状态，拉取期间产生的事件不会丢失
+    source.onopen = () => {
+      if (!received) {
+        onResetRef.current();
+      }
+    };
+    source.addEventListener('reset', () => {
+      received = true;
+      onResetRef.current();
+    });
+
+    const listeners = Object.keys(handlersRef.current).map((name) => {
+      const listener = (event: MessageEvent) => {
+        received = true;
+        try {
+          handlersRef.current[name]?.(JSON.parse(event.data));
+        } catch (error) {
+          console.error(`处理事件 ${name} 失败:`, error);
+        }
+      };
+      source.addEventListener(name, listener);
+      return [name, listener] as const;
+    });
+
+    return () => {
+      listeners.forEach(([name, listener]) => source.removeEventListener(name, listener));
+      source.close();
+    };
+  }, [topics]);
+}
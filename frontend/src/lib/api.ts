@@ -2,7 +2,7 @@
  * API 客户端配置
  */
 
-const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api';
+export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api';
 
 /**
  * 通用请求函数
@@ -9,6 +9,7 @@ import { ScrollArea } from '@/components/ui/scroll-area';
 import { Progress } from '@/components/ui/progress';
 
 interface GreetingLog {
+  seq: number;
   timestamp: string;
   level: string;
   message: string;
@@ -33,6 +34,8 @@ export default function Logs() {
   const [autoScroll, setAutoScroll] = useState(true);
   const logsEndRef = useRef<HTMLDivElement>(null);
   const pollingIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  // 已收到的最后一条日志序号，轮询时只获取之后的日志
+  const lastSeqRef = useRef<number | null>(null);
 
   // 轮询日志和状态
   useEffect(() => {
@@ -43,10 +46,19 @@ export default function Logs() {
         const statusData = await statusRes.json();
         setStatus(statusData);
 
-        // 获取日志
-        const logsRes = await fetch('/api/greeting/logs?last_n=100');
+        // 获取日志：首次取最近 100 条，之后只取新增的日志
+        const lastSeq = lastSeqRef.current;
+        const logsRes = await fetch(
+          lastSeq === null ? '/api/greeting/logs?last_n=100' : `/api/greeting/logs?since_seq=${lastSeq}`
+        );
         const logsData = await logsRes.json();
-        setLogs(logsData.logs || []);
+        const newLogs: GreetingLog[] = logsData.logs || [];
+        lastSeqRef.current = logsData.last_seq;
+        if (lastSeq === null || logsData.truncated) {
+          setLogs(newLogs.slice(-100));
+        } else if (newLogs.length > 0) {
+          setLogs((prev) => [...prev, ...newLogs].slice(-100));
+        }
       } catch (error) {
         console.error('获取日志失败:', error);
       }
@@ -142,8 +154,8 @@ export default function Logs() {
                       暂无日志记录
                     </div>
                   ) : (
-                    logs.map((log, index) => (
-                      <div key={index} className="flex items-start gap-2 hover:bg-gray-900 px-2 py-1 rounded">
+                    logs.map((log) => (
+                      <div key={log.seq} className="flex items-start gap-2 hover:bg-gray-900 px-2 py-1 rounded">
                         <span className="text-gray-500 shrink-0">
                           {formatTime(log.timestamp)}
                         </span>
@@ -1,7 +1,7 @@
 /**
  * 任务管理页面
  */
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { toast } from 'sonner';
 import { Plus, Play, Pause, X, Trash2 } from 'lucide-react';
 import { Button } from '@/components/ui/button';
@@ -42,6 +42,7 @@ import {
   SelectValue,
 } from '@/components/ui/select';
 import { useAutomation } from '@/hooks/useAutomation';
+import { useEventStream } from '@/hooks/useEventStream';
 import { useTemplates } from '@/hooks/useTemplates';
 import type { AutomationTask, AutomationTaskCreate, TaskStatus } from '@/types';
 
@@ -58,6 +59,8 @@ export function Tasks() {
   const { getActiveTemplates } = useTemplates();
 
   const [tasks, setTasks] = useState<AutomationTask[]>([]);
+  const tasksRef = useRef(tasks);
+  tasksRef.current = tasks;
   const [templates, setTemplates] = useState<any[]>([]);
   const [isCreateDialogOpen, setIsCreateDialogOpen] = useState(false);
   const [showDeleteDialog, setShowDeleteDialog] = useState(false);
@@ -90,14 +93,28 @@ export function Tasks() {
   };
 
   useEffect(() => {
-    loadTasks();
     loadTemplates();
-
-    // 每 5 秒刷新一次任务状态
-    const interval = setInterval(loadTasks, 5000);
-    return () => clearInterval(interval);
   }, []);
 
+  // 任务列表随事件流更新：状态和计数变化直接合并，新增、删除或未知任务时重新加载
+  useEventStream(
+    'task',
+    {
+      'task.updated': (update: Partial<AutomationTask> & { id: number }) => {
+        if (!tasksRef.current.some((task) => task.id === update.id)) {
+          loadTasks();
+          return;
+        }
+        setTasks((prev) => prev.map((task) => (task.id === update.id ? { ...task, ...update } : task)));
+      },
+      'task.created': () => loadTasks(),
+      'task.deleted': ({ id }: { id: number }) => {
+        setTasks((prev) => prev.filter((task) => task.id !== id));
+      },
+    },
+    loadTasks
+  );
+
   const handleCreateTask = async () => {
     try {
       await createTask(newTask);
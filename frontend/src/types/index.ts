@@ -52,10 +52,12 @@ export interface GreetingRecord {
   id: number;
   candidate_id: number;
   task_id?: number;
+  run_id?: number;
   template_id?: number;
   message: string;
   success: boolean;
   error_message?: string;
+  outcome?: 'greeted' | 'skipped_mismatch' | 'already_contacted' | 'failed';
   sent_at: string;
 }
 